@@ -1,15 +1,38 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException, BackgroundTasks
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException, BackgroundTasks, Query, Request, WebSocket
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse, Response, StreamingResponse
+from datetime import datetime
 from typing import List, Optional
 from pydantic import BaseModel
-import shutil
+from starlette.requests import ClientDisconnect
+import asyncio
+import hmac
+import json
 import os
+import time
 import uuid
 
 from storage.db import db
-from storage.models import Job, JobStatus
+from storage.cache import transcript_cache
+from storage.models import Job, JobChanges, JobPage, JobStatus, QueueEntry, SearchResults, TranscriptResult
+from storage.transcripts import decode_transcript
+from storage.uploads import UploadError, uploads
+from storage.words import materialize
 from config.manager import config
+from jobs.events import events
+from jobs.feed import job_feed
+from jobs.nodes import NODE_ID, node_owner, nodes
 from jobs.queue import job_manager
+from jobs.scheduler import scheduler
+from jobs.worker import complete_job, fail_job
+from transcription.chunking import SAMPLING_RATE
+from transcription.engine import engine
+from transcription.live import SAMPLE_FORMATS, live_streams
+from transcription.replicas import model_signature
+from transcription.utils import RENDER_FORMATS, render_transcript
+from utils.lazy import Lazy
 from utils.logger import app_logger
+from utils.lru import LRUCache
+from utils.metrics import metrics, observe_stages
 
 router = APIRouter()
 
@@ -17,13 +40,144 @@ class ConfigUpdate(BaseModel):
     section: str
     settings: dict
 
+class UploadCreate(BaseModel):
+    filename: str
+    size: Optional[int] = None
+    priority: int = 0
+
+class NodeRegistration(BaseModel):
+    concurrency: int = 1
+
+class NodeHeartbeat(BaseModel):
+    job_ids: List[str]
+
+class NodeProgress(BaseModel):
+    progress: Optional[float] = None
+    segments: List[dict] = []
+
+class NodeFailure(BaseModel):
+    error: str
+    processing_time: float = 0.0
+
+# Request bytes are gathered up to this size before each write, so one thread hop covers many ASGI messages
+UPLOAD_FLUSH_BYTES = 1024 * 1024
+
 @router.get("/status")
 def get_service_status():
-    return {"status": "running", "uptime": "todo"}
+    counts = db.count_jobs_by_status()
+    return {
+        "status": "running",
+        "uptime": round(metrics.uptime(), 1),
+        "started_at": datetime.fromtimestamp(metrics.started_at).isoformat(),
+        "queue_depth": counts.get(JobStatus.QUEUED.value, 0),
+        "active_jobs": len(job_manager.active_job_ids()),
+        "jobs": counts
+    }
+
+@router.get("/health")
+def get_health():
+    # Liveness: answers as soon as the API is up, whether or not a model is loaded yet
+    return {"status": "ok", "uptime": round(metrics.uptime(), 3), "model": engine.readiness()}
+
+@router.get("/ready")
+def get_readiness():
+    # Readiness: 503 until a job could start without waiting for a model load
+    readiness = engine.readiness()
+    return JSONResponse(readiness, status_code=200 if readiness["ready"] else 503)
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    # Prometheus text exposition format
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
 
-@router.get("/jobs", response_model=List[Job])
-def list_jobs(limit: int = 50):
-    return db.get_all_jobs(limit)
+def _version_etag(request: Request, version: int):
+    """ETag of a job listing at a change-feed version, and a 304 response if the client already has it."""
+    etag = f'"jobs-{version}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag in [tag.strip() for tag in request.headers.get("if-none-match", "").split(",")]:
+        return headers, Response(status_code=304, headers=headers)
+    return headers, None
+
+@router.get("/jobs", response_model=JobPage)
+def list_jobs(request: Request, response: Response, limit: int = Query(50, ge=1, le=500),
+              cursor: Optional[str] = None, status: Optional[JobStatus] = None):
+    # Summaries only; transcripts are loaded from /jobs/{job_id} or /jobs/{job_id}/transcript.
+    # The version is read first, so the page is at least as new as it and ?since=version misses nothing.
+    version = db.job_version()
+    headers, not_modified = _version_etag(request, version)
+    if not_modified:
+        return not_modified
+    try:
+        jobs, next_cursor = db.list_job_summaries(limit, cursor=cursor, status=status)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    response.headers.update(headers)
+    return JobPage(jobs=jobs, next_cursor=next_cursor, version=version)
+
+@router.get("/jobs/changes", response_model=JobChanges)
+def list_job_changes(request: Request, response: Response, since: int = Query(..., ge=0),
+                     limit: int = Query(500, ge=1, le=5000)):
+    # Jobs created or changed, and ids deleted, after version since; poll again with ?since=<version>
+    headers, not_modified = _version_etag(request, db.job_version())
+    if not_modified:
+        return not_modified
+    response.headers.update(headers)
+    return db.list_job_changes(since, limit)
+
+@router.get("/jobs/feed")
+async def stream_job_changes(request: Request, since: Optional[int] = Query(None, ge=0)):
+    """Server-Sent Events stream of job changes, as "changes" events shaped like /jobs/changes.
+
+    The first event brings the client from since (or the Last-Event-ID it
+    reconnects with) up to date; without either it is an empty delta at the
+    current version. Every event id is the version to resume from.
+    """
+    last_event_id = request.headers.get("last-event-id", "")
+    if last_event_id.isdigit():
+        since = int(last_event_id)
+    max_changes = job_feed.max_changes
+
+    async def catch_up(version: int):
+        # Reads this stream's own deltas, page by page, until they reach the current version
+        while True:
+            changes = await asyncio.to_thread(db.list_job_changes, version, max_changes)
+            version = changes.version
+            yield version, _sse("changes", changes.model_dump_json(), event_id=version)
+            if not changes.more:
+                return
+
+    async def event_stream():
+        # Subscribe before catching up so no change falls in between
+        queue = job_feed.subscribe()
+        try:
+            version = since if since is not None else await asyncio.to_thread(db.job_version)
+            async for version, event in catch_up(version):
+                yield event
+
+            while True:
+                try:
+                    message = await asyncio.wait_for(queue.get(), timeout=15)
+                except asyncio.TimeoutError:
+                    # Comment line keeps proxies from closing an idle stream
+                    yield ": keep-alive\n\n"
+                    continue
+                if message is None:
+                    # Dropped for lagging; the browser reconnects with Last-Event-ID
+                    return
+                start, end, data = message
+                if end <= version:
+                    continue
+                if start == version:
+                    version = end
+                    yield _sse("changes", data, event_id=version)
+                else:
+                    # The shared delta overlaps what this stream already sent: read its own
+                    async for version, event in catch_up(version):
+                        yield event
+        finally:
+            job_feed.unsubscribe(queue)
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
 
 @router.get("/jobs/{job_id}", response_model=Job)
 def get_job_details(job_id: str):
@@ -32,24 +186,356 @@ def get_job_details(job_id: str):
         raise HTTPException(status_code=404, detail="Job not found")
     return job
 
+@router.delete("/jobs/{job_id}")
+def delete_job(job_id: str):
+    job = db.get_job(job_id, with_transcript=False)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job.status == JobStatus.PROCESSING:
+        raise HTTPException(status_code=409, detail="Job is being processed")
+    # Removes the transcript and its search index entries with the job; output files are kept
+    db.delete_job(job_id)
+    return {"status": "deleted", "job_id": job_id}
+
+@router.get("/search", response_model=SearchResults)
+def search_transcripts(q: str = Query(..., min_length=1), limit: int = Query(20, ge=1, le=200),
+                       offset: int = Query(0, ge=0), job_id: Optional[str] = None):
+    # Ranked segment hits across all completed transcripts (or one job's)
+    return SearchResults(query=q, hits=db.search(q, limit=limit, offset=offset, job_id=job_id))
+
+@router.get("/jobs/{job_id}/transcript", response_model=TranscriptResult)
+def get_job_transcript(job_id: str):
+    transcript = db.get_transcript(job_id)
+    if not transcript:
+        raise HTTPException(status_code=404, detail="Transcript not found")
+    return materialize(transcript)
+
+TRANSCRIPT_MEDIA_TYPES = {
+    "json": "application/json",
+    "jsonl": "application/x-ndjson",
+    "txt": "text/plain; charset=utf-8",
+    "srt": "application/x-subrip; charset=utf-8",
+    "vtt": "text/vtt; charset=utf-8"
+}
+
+# Rendered bodies keyed by (job_id, format, transcript digest), so a re-transcribed job never serves stale output
+rendered_transcripts = Lazy(lambda: LRUCache(config.get("output", {}).get("render_cache_bytes", 64 * 1024 * 1024)))
+
+@router.get("/jobs/{job_id}/transcript.{fmt}")
+def render_job_transcript(job_id: str, fmt: str, request: Request):
+    if fmt not in RENDER_FORMATS:
+        raise HTTPException(status_code=404, detail=f"Unknown format: {fmt}")
+    digest = db.get_transcript_digest(job_id)
+    if not digest:
+        raise HTTPException(status_code=404, detail="Transcript not found")
+
+    etag = f'"{digest[:32]}-{fmt}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag in [tag.strip() for tag in request.headers.get("if-none-match", "").split(",")]:
+        return Response(status_code=304, headers=headers)
+
+    key = (job_id, fmt, digest)
+    body = rendered_transcripts.get(key)
+    if body is None:
+        body = render_transcript(db.get_transcript(job_id), fmt).encode("utf-8")
+        rendered_transcripts.put(key, body, len(body))
+    return Response(body, media_type=TRANSCRIPT_MEDIA_TYPES[fmt], headers=headers)
+
+def _sse(event_type: str, data, event_id=None) -> str:
+    # data is a dict, or JSON already encoded once for many streams
+    if not isinstance(data, str):
+        data = json.dumps(data, ensure_ascii=False)
+    id_line = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{id_line}event: {event_type}\ndata: {data}\n\n"
+
+@router.get("/jobs/{job_id}/events")
+async def stream_job_events(job_id: str):
+    """Server-Sent Events stream of a job's segments, progress and status changes."""
+    if not db.get_job(job_id, with_transcript=False):
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    finished = (JobStatus.COMPLETED.value, JobStatus.FAILED.value)
+
+    async def event_stream():
+        queue = events.subscribe(job_id)
+        try:
+            # Read the current state after subscribing so no transition falls in between
+            job = db.get_job(job_id, with_transcript=False)
+            yield _sse("status", {"job_id": job_id, "status": job.status.value, "progress": job.progress})
+            if job.status.value in finished:
+                return
+
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=15)
+                except asyncio.TimeoutError:
+                    # Comment line keeps proxies from closing an idle stream
+                    yield ": keep-alive\n\n"
+                    continue
+                yield _sse(event["type"], event)
+                if event["type"] == "status" and event["status"] in finished:
+                    return
+        finally:
+            events.unsubscribe(job_id, queue)
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
 @router.post("/transcribe")
-async def manual_upload(file: UploadFile = File(...)):
-    # Save uploaded file to a specific upload dir or just one of the watch dirs?
-    # Let's save to a dedicated uploads folder in media path to avoid circular watcher trigger if possible, 
-    # but watcher is configured on paths. If we drop it there, watcher picks it up.
-    # But if we want manual trigger, saving to a NON-watched folder and calling create_job is safer.
-    
-    upload_dir = "/workspace/uploads"
-    if not os.path.exists(upload_dir):
-        os.makedirs(upload_dir)
-        
-    file_path = os.path.join(upload_dir, file.filename)
-    
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
-    
-    job = job_manager.create_job(file_path)
-    return job
+async def manual_upload(file: UploadFile = File(...), priority: int = Form(0)):
+    # Uploads land in a non-watched folder and are enqueued directly, so the watcher never sees them.
+    # Starlette has already spooled the multipart body; copying and hashing it runs off the event loop.
+    # Very large files should use the resumable /uploads API, which streams straight to disk.
+    session = await asyncio.to_thread(uploads.create, file.filename, None, priority)
+    session.begin()
+    try:
+        while chunk := await file.read(UPLOAD_FLUSH_BYTES):
+            await asyncio.to_thread(session.append, chunk)
+    except BaseException:
+        await asyncio.to_thread(_abort_upload, session)
+        raise
+    return await _finish_upload(session)
+
+def _abort_upload(session):
+    session.end()
+    uploads.abort(session)
+
+async def _finish_upload(session) -> Job:
+    await asyncio.to_thread(session.end)
+    path, media_hash = await asyncio.to_thread(uploads.complete, session)
+    # Hash computed while streaming; create_job only probes the duration (off the loop too)
+    return await asyncio.to_thread(job_manager.create_job, path, media_hash=media_hash, priority=session.priority, source="upload")
+
+def _get_upload(upload_id: str):
+    session = uploads.get(upload_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    return session
+
+@router.post("/uploads", status_code=201)
+def create_upload(upload: UploadCreate):
+    # Resumable upload: create a session, PATCH chunks at Upload-Offset, HEAD/GET to find where to resume
+    if upload.size is not None and upload.size < 0:
+        raise HTTPException(status_code=400, detail="Invalid size")
+    session = uploads.create(upload.filename, upload.size, upload.priority)
+    return session.to_dict()
+
+@router.get("/uploads/{upload_id}")
+def get_upload(upload_id: str):
+    return _get_upload(upload_id).to_dict()
+
+@router.head("/uploads/{upload_id}")
+def head_upload(upload_id: str):
+    session = _get_upload(upload_id)
+    headers = {"Upload-Offset": str(session.offset), "Cache-Control": "no-store"}
+    if session.size is not None:
+        headers["Upload-Length"] = str(session.size)
+    return Response(headers=headers)
+
+@router.patch("/uploads/{upload_id}")
+async def append_upload(upload_id: str, request: Request, response: Response, final: bool = False):
+    """Appends the request body at Upload-Offset.
+
+    The job is enqueued once the declared size is reached, or with ?final=true
+    when the size was not known up front. A dropped connection keeps what
+    arrived; the client resumes from the offset HEAD reports.
+    """
+    session = await asyncio.to_thread(_get_upload, upload_id)
+    try:
+        offset = int(request.headers["upload-offset"])
+    except (KeyError, ValueError):
+        raise HTTPException(status_code=400, detail="Upload-Offset header required")
+    if not session.begin():
+        raise HTTPException(status_code=409, detail="Another request is writing to this upload")
+
+    buffer = bytearray()
+    try:
+        if offset != session.offset:
+            raise HTTPException(status_code=409, detail=f"Upload-Offset {offset} does not match {session.offset}",
+                                headers={"Upload-Offset": str(session.offset)})
+        try:
+            async for chunk in request.stream():
+                buffer += chunk
+                if len(buffer) >= UPLOAD_FLUSH_BYTES:
+                    await asyncio.to_thread(session.append, bytes(buffer))
+                    buffer.clear()
+        except ClientDisconnect:
+            app_logger.info(f"Upload {upload_id} interrupted at {session.offset + len(buffer)} bytes")
+        if buffer:
+            await asyncio.to_thread(session.append, bytes(buffer))
+    except UploadError as e:
+        await asyncio.to_thread(session.end)
+        raise HTTPException(status_code=413, detail=str(e), headers={"Upload-Offset": str(session.offset)})
+    except BaseException:
+        await asyncio.to_thread(session.end)
+        raise
+
+    if final or (session.size is not None and session.offset == session.size):
+        if session.size is not None and session.offset != session.size:
+            await asyncio.to_thread(session.end)
+            raise HTTPException(status_code=409, detail=f"Upload has {session.offset} of {session.size} bytes",
+                                headers={"Upload-Offset": str(session.offset)})
+        job = await _finish_upload(session)
+        response.headers["Upload-Offset"] = str(session.offset)
+        return dict(session.to_dict(), complete=True, job=job)
+    await asyncio.to_thread(session.end)
+    response.headers["Upload-Offset"] = str(session.offset)
+    return dict(session.to_dict(), complete=False)
+
+@router.delete("/uploads/{upload_id}", status_code=204)
+def delete_upload(upload_id: str):
+    session = _get_upload(upload_id)
+    if not session.begin():
+        raise HTTPException(status_code=409, detail="Another request is writing to this upload")
+    _abort_upload(session)
+    return Response(status_code=204)
+
+def _node_owner(request: Request, node_id: str) -> str:
+    """Checks that the node API is enabled and the shared token matches; returns the node's lease owner id."""
+    cluster_conf = config.get("cluster", {})
+    if not cluster_conf.get("enabled", False):
+        raise HTTPException(status_code=404, detail="Remote worker nodes are disabled")
+    token = cluster_conf.get("token")
+    if token and not hmac.compare_digest(request.headers.get("authorization", "").encode(), f"Bearer {token}".encode()):
+        raise HTTPException(status_code=401, detail="Invalid node token")
+    if not NODE_ID.match(node_id):
+        raise HTTPException(status_code=400, detail="Invalid node id")
+    nodes.seen(node_id)
+    return node_owner(node_id)
+
+def _node_settings() -> dict:
+    # Nodes run the service's model and transcription settings; device, compute type and threads are their own
+    queue_conf = config.get("queue", {})
+    return {
+        "lease_seconds": queue_conf.get("lease_seconds", 60),
+        "poll_interval": queue_conf.get("poll_interval", 1.0),
+        "model": config.get("model", {}).get("name"),
+        "transcription": config.get("transcription", {})
+    }
+
+def _leased_job(job_id: str, owner: str) -> Job:
+    # Renewing doubles as the ownership check: it fails once the lease was re-issued or the job finished
+    if not job_manager.renew_lease(job_id, owner):
+        raise HTTPException(status_code=409, detail="Lease lost")
+    return db.get_job(job_id, with_transcript=False)
+
+@router.get("/nodes")
+def get_nodes():
+    # Job counts and throughput per worker node; this service's own worker pool is "local"
+    return nodes.status()
+
+@router.post("/nodes/{node_id}")
+def register_node(node_id: str, registration: NodeRegistration, request: Request):
+    _node_owner(request, node_id)
+    nodes.seen(node_id, max(1, registration.concurrency))
+    app_logger.info(f"Worker node {node_id} registered with concurrency {registration.concurrency}")
+    return _node_settings()
+
+@router.post("/nodes/{node_id}/leases")
+def lease_job(node_id: str, request: Request):
+    """Leases the next job to a remote worker node; 204 when nothing is queued.
+
+    The node heartbeats the lease until it posts a result or a failure. If it
+    stops, the lease expires after queue.lease_seconds and the job is handed
+    to the next worker that asks, local or remote.
+    """
+    owner = _node_owner(request, node_id)
+    while True:
+        job = job_manager.claim_job(owner)
+        if job is None:
+            return Response(status_code=204)
+        # An identical file may have finished while this one was waiting in the queue
+        cached = transcript_cache.get(job_manager.cache_key(job.media_hash), count_miss=False) if job.media_hash else None
+        if not cached:
+            break
+        job_manager.complete_from_cache(job, cached)
+
+    nodes.leased(node_id)
+    events.publish(job.id, {"type": "status", "status": JobStatus.PROCESSING.value})
+    observe_stages({"queue_wait": max(0.0, time.time() - job.created_at.timestamp())})
+    try:
+        size = os.path.getsize(job.filepath)
+    except OSError:
+        size = None
+    return {
+        "job": dict(job.model_dump(mode="json", include={"id", "filename", "filepath", "media_hash", "media_duration", "attempts"}), size=size),
+        "settings": _node_settings()
+    }
+
+@router.post("/nodes/{node_id}/heartbeat")
+def node_heartbeat(node_id: str, heartbeat: NodeHeartbeat, request: Request):
+    owner = _node_owner(request, node_id)
+    renewed, lost = [], []
+    for job_id in heartbeat.job_ids:
+        (renewed if job_manager.renew_lease(job_id, owner) else lost).append(job_id)
+    if lost:
+        nodes.lost(node_id, len(lost))
+        app_logger.warning(f"Worker node {node_id} lost its lease on {', '.join(lost)}")
+    return {"renewed": renewed, "lost": lost}
+
+@router.get("/nodes/{node_id}/leases/{job_id}/media")
+def get_leased_media(node_id: str, job_id: str, request: Request):
+    # For nodes that do not see the service's storage
+    job = _leased_job(job_id, _node_owner(request, node_id))
+    if not os.path.isfile(job.filepath):
+        raise HTTPException(status_code=404, detail=f"File not found: {job.filepath}")
+    return FileResponse(job.filepath, filename=job.filename)
+
+@router.post("/nodes/{node_id}/leases/{job_id}/progress", status_code=204)
+def post_leased_progress(node_id: str, job_id: str, progress: NodeProgress, request: Request):
+    # Batched segments and progress, relayed to SSE subscribers like a local job's
+    _leased_job(job_id, _node_owner(request, node_id))
+    for seg in progress.segments:
+        events.publish(job_id, {"type": "segment", "start": seg.get("start"), "end": seg.get("end"), "text": seg.get("text")})
+    if progress.progress is not None:
+        events.publish(job_id, {"type": "progress", "progress": progress.progress})
+        db.update_job_progress(job_id, progress.progress)
+    return Response(status_code=204)
+
+@router.post("/nodes/{node_id}/leases/{job_id}/result")
+async def post_leased_result(node_id: str, job_id: str, request: Request):
+    """Completes a leased job with the node's transcript, sent in the stored encoding (storage.transcripts).
+
+    The service writes the outputs, the database row and the cache entry, as
+    for a local job. 409 if the lease was lost: the job was re-issued and the
+    result is dropped.
+    """
+    owner = _node_owner(request, node_id)
+    body = await request.body()
+    return await asyncio.to_thread(_complete_leased_job, node_id, owner, job_id, body)
+
+def _complete_leased_job(node_id: str, owner: str, job_id: str, body: bytes) -> dict:
+    job = _leased_job(job_id, owner)
+    try:
+        result = decode_transcript(body)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Invalid transcript: {e}")
+    processing_time = float(result.pop("processing_time", 0.0) or 0.0)
+    timings = result.pop("timings", None) or {}
+    signature = result.pop("model", None) or model_signature(config.get("model", {}))
+    try:
+        complete_job(job, result, signature, time.time() - processing_time, timings,
+                     config.get("output", {}).get("formats", ["json", "txt"]), node=node_id)
+    finally:
+        observe_stages(timings)
+    return {"status": JobStatus.COMPLETED.value, "job_id": job_id}
+
+@router.post("/nodes/{node_id}/leases/{job_id}/failure")
+def post_leased_failure(node_id: str, job_id: str, failure: NodeFailure, request: Request):
+    job = _leased_job(job_id, _node_owner(request, node_id))
+    fail_job(job, failure.error, time.time() - failure.processing_time, node=node_id)
+    return {"status": JobStatus.FAILED.value, "job_id": job_id}
+
+@router.get("/queue", response_model=List[QueueEntry])
+def get_queue():
+    # Queued jobs in the order workers will take them, with estimated start/finish
+    workers = config.get("worker", {}).get("concurrency", 1)
+    # Plus the slots of remote worker nodes that are still heartbeating
+    workers += nodes.remote_capacity(config.get("queue", {}).get("lease_seconds", 60))
+    return scheduler.estimate(max(1, workers))
+
+@router.get("/cache")
+def get_cache_stats():
+    return transcript_cache.stats()
 
 @router.get("/config/models")
 def get_available_models():
@@ -59,7 +545,12 @@ def get_available_models():
         "models": ["tiny", "base", "small", "medium", "large-v3"],
         "devices": ["cpu", "cuda"],
         "compute_types": ["int8", "int8_float16", "float16", "float32"],
-        "current": config.get("model")
+        "transcription_modes": ["sequential", "batched"],
+        "current": config.get("model"),
+        "current_transcription": {
+            "mode": config.get("transcription", {}).get("mode", "sequential"),
+            "batch_size": config.get("transcription", {}).get("batch_size", 8)
+        }
     }
 
 @router.get("/config")
@@ -74,10 +565,113 @@ def update_model_config(conf: dict):
     current_model_conf.update(conf)
     config.update({"model": current_model_conf})
     
-    # Trigger reload in engine? The worker imports 'engine'. 
-    # The 'engine' checks config on every 'transcribe' call, 
-    # but strictly speaking `reload_model()` is called inside `transcribe` only if not loaded?
-    # No, `transcribe` calls `reload_model` which checks config hash.
-    # So next job will pick up new model.
-    
+    # Load the new model in the background; jobs keep running on the current one until it is ready
+    engine.preload(current_model_conf)
     return {"status": "updated", "config": current_model_conf}
+
+@router.get("/models")
+def get_models_status():
+    # Resident models (most recently used first), loads in progress and failed loads
+    return engine.models_status()
+
+@router.post("/models/warm", status_code=202)
+def warm_model(conf: dict):
+    # Expects name, optionally device and compute_type (default: the configured ones)
+    model_conf = dict(config.get("model", {}), **conf)
+    engine.preload(model_conf)
+    return {"status": "loading", "model": model_signature(model_conf)}
+
+@router.get("/live")
+def get_live_streams():
+    return live_streams.status() if live_streams.created else {"max_streams": config.get("live", {}).get("max_streams", 2), "sessions": []}
+
+@router.websocket("/live")
+async def live_transcription(websocket: WebSocket, language: Optional[str] = None, format: str = "s16le", save: bool = True):
+    """Live captions: binary frames of 16 kHz mono PCM in, JSON events out.
+
+    Events are "ready", then "segment" (finalized) and "partial" (may still
+    change) as audio arrives. Sending {"type": "stop"} finalizes the stream:
+    the remaining audio is transcribed, the recording is saved as a completed
+    job with its outputs (unless save=false) and "completed" carries that job.
+    """
+    await websocket.accept()
+    if format not in SAMPLE_FORMATS:
+        await websocket.close(code=1003, reason=f"Unsupported format: {format}")
+        return
+    if not engine.readiness()["ready"]:
+        # Live windows never wait for a model load
+        await websocket.close(code=1013, reason="Model is not loaded yet")
+        return
+    session = await asyncio.to_thread(live_streams.open, format, language)
+    if session is None:
+        await websocket.close(code=1013, reason="Too many live streams")
+        return
+    await websocket.send_json({"type": "ready", "session": session.session_id, "sample_rate": SAMPLING_RATE, "format": format})
+
+    wake = asyncio.Event()
+    # Cleared while max_buffer_seconds of audio waits for the model; the socket is not read meanwhile
+    drained = asyncio.Event()
+    drained.set()
+    receiving = True
+
+    async def process():
+        try:
+            while receiving:
+                await wake.wait()
+                wake.clear()
+                if session.has_step():
+                    for event in await live_streams.run(session.advance):
+                        await websocket.send_json(event)
+                drained.set()
+        finally:
+            # Never leave the receiver waiting on a processor that stopped
+            drained.set()
+
+    processor = asyncio.create_task(process())
+    connected = True
+    settled = False
+    try:
+        try:
+            while not processor.done():
+                message = await websocket.receive()
+                if message["type"] == "websocket.disconnect":
+                    connected = False
+                    break
+                if message.get("bytes"):
+                    if not session.feed(message["bytes"]):
+                        drained.clear()
+                    wake.set()
+                    await drained.wait()
+                elif message.get("text") and json.loads(message["text"]).get("type") == "stop":
+                    break
+        except Exception as e:
+            app_logger.warning(f"Live session {session.session_id} receive failed: {e}")
+            connected = False
+        finally:
+            receiving = False
+            wake.set()
+        try:
+            await processor
+        except Exception as e:
+            app_logger.error(f"Live session {session.session_id} failed: {e}")
+            connected = False
+            save = False
+
+        settled = True
+        if not save or session.duration == 0:
+            await live_streams.run(live_streams.discard, session)
+            if connected:
+                await websocket.close()
+            return
+        # A stream that ends by disconnecting is saved too; there is just nobody to tell
+        final_events, job = await live_streams.run(live_streams.complete, session)
+        if connected:
+            for event in final_events:
+                await websocket.send_json(event)
+            await websocket.send_json({"type": "completed", "job": job.model_dump(mode="json")})
+            await websocket.close()
+    finally:
+        if not settled:
+            # Cancelled (e.g. server shutdown): queue the cleanup, it cannot be awaited here
+            processor.cancel()
+            live_streams.run(live_streams.discard, session)
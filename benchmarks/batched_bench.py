@@ -0,0 +1,70 @@
+"""Throughput of sequential vs batched transcription on the same audio.
+
+Loads the model once and transcribes each file with transcription.mode
+"sequential" and then "batched" at every requested batch size, reporting
+audio seconds processed per wall-clock second. Pass real speech recordings;
+silence is dropped by the batched pipeline's VAD and would flatter it.
+
+    python -m benchmarks.batched_bench media/*.wav --model tiny --batch-sizes 4 8 16
+"""
+import argparse
+import json
+import os
+import time
+
+from transcription.replicas import load_model, run_transcription
+
+def run(model, files, trans_config, runs):
+    audio_seconds = 0.0
+    segments = 0
+    elapsed = 0.0
+    for _ in range(runs):
+        for path in files:
+            start = time.perf_counter()
+            result = run_transcription(model, path, trans_config)
+            elapsed += time.perf_counter() - start
+            audio_seconds += result["duration"] or 0.0
+            segments += len(result["segments"])
+    return {
+        "seconds": round(elapsed, 3),
+        "audio_seconds": round(audio_seconds, 1),
+        "segments": segments,
+        "audio_seconds_per_sec": round(audio_seconds / elapsed, 2) if elapsed else None
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("files", nargs="+", help="audio/video files to transcribe")
+    parser.add_argument("--model", default="tiny")
+    parser.add_argument("--device", default="cpu")
+    parser.add_argument("--compute-type", default="int8")
+    parser.add_argument("--beam-size", type=int, default=5)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[8])
+    parser.add_argument("--runs", type=int, default=1)
+    parser.add_argument("--cpu-threads", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    model = load_model(
+        {"name": args.model, "device": args.device, "compute_type": args.compute_type},
+        cpu_threads=args.cpu_threads
+    )
+    # Warm up so the first measured run does not pay for lazy initialisation
+    run_transcription(model, args.files[0], {"beam_size": args.beam_size})
+
+    results = [dict(mode="sequential", **run(model, args.files, {"beam_size": args.beam_size}, args.runs))]
+    for batch_size in args.batch_sizes:
+        trans_config = {"beam_size": args.beam_size, "mode": "batched", "batch_size": batch_size}
+        results.append(dict(mode="batched", batch_size=batch_size, **run(model, args.files, trans_config, args.runs)))
+
+    baseline = results[0]["audio_seconds_per_sec"]
+    for result in results[1:]:
+        result["speedup"] = round(result["audio_seconds_per_sec"] / baseline, 2) if baseline else None
+
+    print(json.dumps({
+        "benchmark": "batched",
+        "params": vars(args),
+        "results": results
+    }, indent=2))
+
+if __name__ == "__main__":
+    main()
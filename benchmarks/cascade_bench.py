@@ -0,0 +1,106 @@
+"""Cost and accuracy of the model cascade against its two models run alone.
+
+Transcribes each file three ways through the engine: the cheap first-pass
+model alone, the large (configured) model alone, and the cascade. Reports
+wall-clock seconds and audio seconds per second for each, how much audio the
+cascade escalated, and the word error rate of the cheap model and of the
+cascade measured against the large model's transcript (no ground truth is
+needed; 0.0 means identical to running the large model on everything).
+Pass real speech recordings.
+
+    python -m benchmarks.cascade_bench media/*.wav --small base --large large-v3
+"""
+import argparse
+import json
+import re
+import time
+
+from config.manager import config
+from transcription.cascade import MAX_COMPRESSION_RATIO, MAX_NO_SPEECH_PROB, MIN_AVG_LOGPROB
+from transcription.engine import TranscriptionEngine
+
+def words(result) -> list:
+    text = " ".join(seg["text"] for seg in result["segments"]).lower()
+    return re.findall(r"[\w']+", text)
+
+def word_errors(reference: list, hypothesis: list) -> int:
+    """Word-level Levenshtein distance."""
+    previous = list(range(len(hypothesis) + 1))
+    for i, ref in enumerate(reference, 1):
+        current = [i]
+        for j, hyp in enumerate(hypothesis, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ref != hyp)))
+        previous = current
+    return previous[-1]
+
+def run(engine, files, model_config: dict, cascade: dict) -> tuple:
+    # In memory only: config.update() would also rewrite config.yaml
+    config._config["model"] = model_config
+    config._config.setdefault("transcription", {})["cascade"] = cascade
+    results = []
+    elapsed = 0.0
+    for path in files:
+        start = time.perf_counter()
+        results.append(engine.transcribe(path))
+        elapsed += time.perf_counter() - start
+    audio_seconds = sum(r["duration"] or 0.0 for r in results)
+    return results, {
+        "seconds": round(elapsed, 3),
+        "audio_seconds": round(audio_seconds, 1),
+        "audio_seconds_per_sec": round(audio_seconds / elapsed, 2) if elapsed else None
+    }
+
+def error_rate(references: list, hypotheses: list) -> float:
+    errors = sum(word_errors(words(ref), words(hyp)) for ref, hyp in zip(references, hypotheses))
+    total = sum(len(words(ref)) for ref in references)
+    return round(errors / total, 4) if total else None
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("files", nargs="+", help="audio/video files to transcribe")
+    parser.add_argument("--small", default="base", help="first-pass model")
+    parser.add_argument("--large", default="large-v3", help="escalation model")
+    parser.add_argument("--device", default="cpu")
+    parser.add_argument("--compute-type", default="int8")
+    parser.add_argument("--min-avg-logprob", type=float, default=MIN_AVG_LOGPROB)
+    parser.add_argument("--max-no-speech-prob", type=float, default=MAX_NO_SPEECH_PROB)
+    parser.add_argument("--max-compression-ratio", type=float, default=MAX_COMPRESSION_RATIO)
+    args = parser.parse_args()
+
+    large = {"name": args.large, "device": args.device, "compute_type": args.compute_type}
+    small = dict(large, name=args.small)
+    cascade = {
+        "enabled": True,
+        "model": args.small,
+        "min_avg_logprob": args.min_avg_logprob,
+        "max_no_speech_prob": args.max_no_speech_prob,
+        "max_compression_ratio": args.max_compression_ratio
+    }
+    config._config.setdefault("model_cache", {})["serve_previous_while_loading"] = False
+    engine = TranscriptionEngine()
+    # Load both models before anything is timed
+    engine.preload(small)
+    engine.preload(large)
+
+    small_results, small_stats = run(engine, args.files, small, {"enabled": False})
+    large_results, large_stats = run(engine, args.files, large, {"enabled": False})
+    cascade_results, cascade_stats = run(engine, args.files, large, cascade)
+
+    escalated = sum(r["cascade"]["escalated_seconds"] for r in cascade_results)
+    print(json.dumps({
+        "benchmark": "cascade",
+        "params": vars(args),
+        "small": dict(small_stats, wer_vs_large=error_rate(large_results, small_results)),
+        "large": large_stats,
+        "cascade": dict(
+            cascade_stats,
+            wer_vs_large=error_rate(large_results, cascade_results),
+            escalated_seconds=round(escalated, 1),
+            escalated_fraction=round(escalated / cascade_stats["audio_seconds"], 4) if cascade_stats["audio_seconds"] else None,
+            speedup_vs_large=round(large_stats["seconds"] / cascade_stats["seconds"], 2) if cascade_stats["seconds"] else None
+        )
+    }, indent=2))
+    engine.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+"""Throughput of one service with several remote worker nodes on localhost.
+
+Starts the service with the node API enabled (and --local-workers of its own,
+0 by default) and --nodes worker node processes (service.node's RemoteWorker),
+drops synthetic fixtures into the watched directory and waits until every job
+has finished. Reports wall-clock throughput overall and per node as the
+service counted it (GET /api/nodes), and how many jobs were re-issued after
+an expired lease.
+
+By default every process uses the fake engine from pipeline_bench (a segment
+every --segment-seconds, --fake-rtf seconds per audio second), so the run is
+offline and measures the lease protocol around the model; --engine real uses
+the configured Whisper model. --kill-after SECONDS kills the first node with
+SIGKILL mid-run: its jobs must come back after --lease-seconds and finish on
+the other nodes.
+
+    python -m benchmarks.cluster_bench --nodes 3 --files 30
+    python -m benchmarks.cluster_bench --nodes 3 --media download --kill-after 2 --lease-seconds 3
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+
+import yaml
+
+from benchmarks.fixtures import KINDS, fixture_plan, write_fixture
+from benchmarks.pipeline_bench import FakeEngine
+from benchmarks.startup_bench import free_port, get
+
+class FakeNodeEngine(FakeEngine):
+    """FakeEngine with the parts of the engine interface RemoteWorker calls."""
+
+    def preload(self, model_config: dict = None):
+        pass
+
+    def transcribe(self, audio_path: str, on_segment=None, on_progress=None, prefetched=None, model_config=None, trans_config=None,
+                   resume=None, on_start=None):
+        return dict(super().transcribe(audio_path, on_segment, on_progress, prefetched, resume, on_start), model="fake")
+
+def make_workdir(repo_root: str, args) -> str:
+    workdir = tempfile.mkdtemp(prefix="whisperwatch-cluster-")
+    os.makedirs(os.path.join(workdir, "config"))
+    settings = {
+        "watchKey": {"paths": [os.path.join(workdir, "media")], "extensions": [".wav"], "stability_check_seconds": 0.5},
+        "model_cache": {"preload_on_startup": args.engine == "real"},
+        "output": {"output_dir": os.path.join(workdir, "transcripts"), "formats": ["json", "srt"]},
+        "queue": {"lease_seconds": args.lease_seconds, "poll_interval": 0.2},
+        "cluster": {"enabled": True, "token": "cluster-bench", "download_dir": os.path.join(workdir, "downloads")},
+        "worker": {"concurrency": args.local_workers}
+    }
+    with open(os.path.join(workdir, "config", "config.yaml"), "w") as f:
+        yaml.safe_dump(settings, f)
+    os.symlink(os.path.join(repo_root, "ui"), os.path.join(workdir, "ui"))
+    return workdir
+
+def api(port: int, path: str):
+    with urllib.request.urlopen(f"http://127.0.0.1:{port}/api{path}", timeout=10) as response:
+        return json.loads(response.read())
+
+def fake_engine(args):
+    return FakeNodeEngine(args.fake_rtf, args.segment_seconds) if args.engine == "fake" else None
+
+def run_server(args):
+    """--role server: the service, with the fake engine plugged in unless --engine real."""
+    import uvicorn
+    from service.bootstrap import app
+
+    engine = fake_engine(args)
+    if engine:
+        from jobs import worker
+        worker.engine = engine
+    uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning")
+
+def run_node(args):
+    """--role node: one worker node until SIGTERM."""
+    import threading
+    from config.manager import config
+    from jobs.remote import NodeClient, RemoteWorker
+
+    cluster_conf = config.get("cluster", {})
+    client = NodeClient(f"http://127.0.0.1:{args.port}", args.node_id, token=cluster_conf.get("token"))
+    node = RemoteWorker(
+        client,
+        concurrency=args.node_concurrency,
+        media=args.media,
+        download_dir=os.path.join(cluster_conf["download_dir"], args.node_id),
+        progress_interval=0.5,
+        engine=fake_engine(args)
+    )
+    stopping = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stopping.set())
+    node.start()
+    stopping.wait()
+    node.stop(timeout=30)
+
+def spawn(args, workdir: str, env: dict, role: str, *extra) -> subprocess.Popen:
+    argv = [sys.executable, "-m", "benchmarks.cluster_bench", "--role", role, "--port", str(args.port),
+            "--engine", args.engine, "--fake-rtf", str(args.fake_rtf), "--segment-seconds", str(args.segment_seconds),
+            "--media", args.media, "--node-concurrency", str(args.node_concurrency), *extra]
+    return subprocess.Popen(argv, cwd=workdir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--nodes", type=int, default=3)
+    parser.add_argument("--node-concurrency", type=int, default=1)
+    parser.add_argument("--local-workers", type=int, default=0, help="workers in the service process itself")
+    parser.add_argument("--files", type=int, default=30)
+    parser.add_argument("--durations", type=float, nargs="+", default=[10, 30, 60, 120], help="fixture lengths in seconds")
+    parser.add_argument("--kinds", nargs="+", default=list(KINDS), choices=KINDS)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--media", default="auto", choices=["auto", "shared", "download"])
+    parser.add_argument("--engine", default="fake", choices=["fake", "real"])
+    parser.add_argument("--fake-rtf", type=float, default=0.02)
+    parser.add_argument("--segment-seconds", type=float, default=5.0)
+    parser.add_argument("--lease-seconds", type=float, default=10)
+    parser.add_argument("--kill-after", type=float, default=None, help="SIGKILL the first node this many seconds in")
+    parser.add_argument("--timeout", type=float, default=600)
+    parser.add_argument("--keep", action="store_true", help="keep the working directory")
+    parser.add_argument("--role", default="bench", choices=["bench", "server", "node"], help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, default=0, help=argparse.SUPPRESS)
+    parser.add_argument("--node-id", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.role == "server":
+        return run_server(args)
+    if args.role == "node":
+        return run_node(args)
+
+    repo_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [repo_root, os.environ.get("PYTHONPATH")])))
+    workdir = make_workdir(repo_root, args)
+    watch_dir = os.path.join(workdir, "media")
+    staging_dir = os.path.join(workdir, "staging")
+    os.makedirs(staging_dir)
+    plan = fixture_plan(args.files, args.durations, args.kinds, args.seed)
+    for name, kind, seconds, seed in plan:
+        write_fixture(os.path.join(staging_dir, name), kind, seconds, seed)
+    audio_seconds = sum(seconds for _, _, seconds, _ in plan)
+
+    args.port = free_port()
+    server = spawn(args, workdir, env, "server")
+    nodes = []
+    try:
+        deadline = time.time() + 60
+        while get(f"http://127.0.0.1:{args.port}/api/health") != 200:
+            if server.poll() is not None or time.time() > deadline:
+                raise RuntimeError("service did not start")
+            time.sleep(0.05)
+        nodes = [spawn(args, workdir, env, "node", "--node-id", f"node-{i}") for i in range(args.nodes)]
+        # Wait until every node has registered before the clock starts
+        while len([n for n in api(args.port, "/nodes")["nodes"] if n["node"] != "local"]) < args.nodes:
+            time.sleep(0.05)
+
+        start = time.time()
+        for name, _, _, _ in plan:
+            os.replace(os.path.join(staging_dir, name), os.path.join(watch_dir, name))
+
+        killed = None
+        finished = False
+        while time.time() - start < args.timeout:
+            if args.kill_after is not None and killed is None and time.time() - start >= args.kill_after:
+                nodes[0].kill()
+                killed = "node-0"
+            jobs = api(args.port, "/status")["jobs"]
+            if jobs.get("completed", 0) + jobs.get("failed", 0) >= len(plan):
+                finished = True
+                break
+            time.sleep(0.1)
+        wall = time.time() - start
+
+        summaries = api(args.port, "/jobs?limit=500")["jobs"]
+        reissued = sum(1 for job in summaries if api(args.port, f"/jobs/{job['id']}")["attempts"] > 1)
+        cluster = api(args.port, "/nodes")
+    finally:
+        for proc in nodes:
+            if proc.poll() is None:
+                proc.send_signal(signal.SIGTERM)
+        for proc in nodes:
+            try:
+                proc.wait(timeout=60)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+        server.send_signal(signal.SIGINT)
+        try:
+            server.wait(timeout=60)
+        except subprocess.TimeoutExpired:
+            server.kill()
+
+    print(json.dumps({
+        "benchmark": "cluster",
+        "params": {k: v for k, v in vars(args).items() if k not in ("role", "port", "node_id")},
+        "environment": {"python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count()},
+        "completed": finished,
+        "jobs": jobs,
+        "killed": killed,
+        "reissued_jobs": reissued,
+        "audio_seconds": audio_seconds,
+        "wall_seconds": round(wall, 3),
+        "throughput": {
+            "jobs_per_sec": round(len(plan) / wall, 3),
+            "audio_seconds_per_sec": round(audio_seconds / wall, 2)
+        },
+        "nodes": cluster["nodes"],
+        "total": cluster["total"]
+    }, indent=2))
+
+    if not args.keep:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
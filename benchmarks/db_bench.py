@@ -0,0 +1,145 @@
+"""Micro-benchmark for the job database under concurrent writers.
+
+Compares the previous connect-per-call access pattern (rollback journal, no
+indexes) with the pooled WAL JobDatabase and its group commits. Each writer
+thread runs the job lifecycle a worker produces (insert, processing, progress
+ticks, completed with result) while reader threads poll the job list the way
+dashboards do.
+
+    python -m benchmarks.db_bench --writers 8 --jobs 200
+"""
+import argparse
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+from datetime import datetime
+
+from storage.db import JobDatabase
+from storage.models import Job, JobStatus, TranscriptResult
+
+class LegacyJobDatabase:
+    """The original storage/db.py behaviour: a fresh connection and commit per call."""
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        conn = sqlite3.connect(self.db_path)
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY, filename TEXT, filepath TEXT, created_at TEXT, status TEXT,
+                result TEXT, error TEXT, model_used TEXT, processing_time REAL, progress REAL, media_hash TEXT
+            )
+        ''')
+        conn.commit()
+        conn.close()
+
+    def _execute(self, query, params):
+        conn = sqlite3.connect(self.db_path)
+        conn.execute(query, params)
+        conn.commit()
+        conn.close()
+
+    def add_job(self, job):
+        self._execute(
+            "INSERT INTO jobs (id, filename, filepath, created_at, status) VALUES (?, ?, ?, ?, ?)",
+            (job.id, job.filename, job.filepath, job.created_at.isoformat(), job.status.value)
+        )
+
+    def update_job_status(self, job_id, status, result=None, error=None, processing_time=None):
+        self._execute(
+            "UPDATE jobs SET status = ?, result = ?, processing_time = ? WHERE id = ?",
+            (status.value, result.model_dump_json() if result else None, processing_time, job_id)
+        )
+
+    def update_job_progress(self, job_id, progress):
+        self._execute("UPDATE jobs SET progress = ? WHERE id = ?", (progress, job_id))
+
+    def list_job_summaries(self, limit=50):
+        # The original dashboard read: full rows, results included, newest first
+        conn = sqlite3.connect(self.db_path)
+        rows = conn.execute("SELECT * FROM jobs ORDER BY created_at DESC LIMIT ?", (limit,)).fetchall()
+        conn.close()
+        return rows, None
+
+    def close(self):
+        pass
+
+def _writer(database, jobs, progress_ticks, result, counter):
+    ops = 0
+    for _ in range(jobs):
+        job = Job(id=str(uuid.uuid4()), filename="bench.wav", filepath="/tmp/bench.wav", created_at=datetime.now())
+        database.add_job(job)
+        database.update_job_status(job.id, JobStatus.PROCESSING)
+        for i in range(progress_ticks):
+            database.update_job_progress(job.id, (i + 1) / progress_ticks)
+        database.update_job_status(job.id, JobStatus.COMPLETED, result=result, processing_time=1.0)
+        ops += 3 + progress_ticks
+    counter.append(ops)
+
+def _reader(database, stop, counter):
+    ops = 0
+    while not stop.is_set():
+        database.list_job_summaries(50)
+        ops += 1
+    counter.append(ops)
+
+def run(name, database, writers, jobs, progress_ticks, readers):
+    result = TranscriptResult(
+        segments=[{"start": i * 2.0, "end": i * 2.0 + 2, "text": " benchmark segment text"} for i in range(50)],
+        language="en",
+        duration=100.0
+    )
+    write_ops, read_ops = [], []
+    stop = threading.Event()
+    reader_threads = [threading.Thread(target=_reader, args=(database, stop, read_ops)) for _ in range(readers)]
+    writer_threads = [
+        threading.Thread(target=_writer, args=(database, jobs, progress_ticks, result, write_ops))
+        for _ in range(writers)
+    ]
+
+    start = time.perf_counter()
+    for t in reader_threads + writer_threads:
+        t.start()
+    for t in writer_threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    stop.set()
+    for t in reader_threads:
+        t.join()
+    database.close()
+
+    return {
+        "name": name,
+        "seconds": round(elapsed, 3),
+        "write_ops": sum(write_ops),
+        "write_ops_per_sec": round(sum(write_ops) / elapsed, 1),
+        "read_ops_per_sec": round(sum(read_ops) / elapsed, 1)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--writers", type=int, default=8)
+    parser.add_argument("--jobs", type=int, default=100, help="jobs per writer")
+    parser.add_argument("--progress-ticks", type=int, default=10)
+    parser.add_argument("--readers", type=int, default=2)
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, factory in (("before", LegacyJobDatabase), ("after", JobDatabase)):
+            database = factory(os.path.join(tmp, f"{name}.db"))
+            results.append(run(name, database, args.writers, args.jobs, args.progress_ticks, args.readers))
+
+    before, after = results
+    print(json.dumps({
+        "benchmark": "db",
+        "params": vars(args),
+        "results": results,
+        "write_speedup": round(after["write_ops_per_sec"] / before["write_ops_per_sec"], 2)
+    }, indent=2))
+
+if __name__ == "__main__":
+    main()
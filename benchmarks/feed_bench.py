@@ -0,0 +1,208 @@
+"""API cost of keeping dashboards current: 5-second polling vs the /jobs/feed change stream.
+
+Starts the service (no workers, so jobs only change when the benchmark
+changes them), opens --dashboards clients and, for --duration seconds,
+writes a steady stream of job changes straight into the service's database:
+a new job, --progress-ticks progress updates, then completion with a
+--segments-segment transcript. Two modes, each against a fresh service:
+
+- poll: every client GETs /api/jobs?limit=50 every --interval seconds, as
+  the dashboard used to
+- feed: every client loads /api/jobs once and then reads the SSE stream of
+  /api/jobs/feed, as the dashboard does now
+
+Reports the service's CPU seconds during the measured window (read from
+/proc, so Linux only), bytes received by clients, and staleness: how long
+after a job completed each client first saw it completed.
+
+    python -m benchmarks.feed_bench --dashboards 30 --duration 30
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import signal
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+import uuid
+from datetime import datetime
+
+import yaml
+
+from benchmarks.startup_bench import free_port, get
+
+def make_workdir(repo_root: str) -> str:
+    workdir = tempfile.mkdtemp(prefix="whisperwatch-feed-")
+    os.makedirs(os.path.join(workdir, "config"))
+    settings = {
+        "watchKey": {"paths": [os.path.join(workdir, "media")], "extensions": [".wav"], "stability_check_seconds": 1},
+        "model_cache": {"preload_on_startup": False},
+        "output": {"output_dir": os.path.join(workdir, "transcripts"), "formats": ["json"]},
+        "worker": {"concurrency": 0}
+    }
+    with open(os.path.join(workdir, "config", "config.yaml"), "w") as f:
+        yaml.safe_dump(settings, f)
+    os.symlink(os.path.join(repo_root, "ui"), os.path.join(workdir, "ui"))
+    return workdir
+
+def cpu_seconds(pid: int) -> float:
+    with open(f"/proc/{pid}/stat") as f:
+        fields = f.read().rsplit(")", 1)[1].split()
+    # utime and stime, fields 14 and 15 of proc(5)
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+class Client(threading.Thread):
+    """One dashboard: records bytes received and when it first saw each job completed."""
+
+    def __init__(self, port: int, mode: str, interval: float, stop: threading.Event):
+        super().__init__(daemon=True)
+        self.base = f"http://127.0.0.1:{port}/api"
+        self.mode = mode
+        self.interval = interval
+        self.stop = stop
+        self.bytes = 0
+        self.requests = 0
+        self.seen_completed = {}
+
+    def _get(self, path: str):
+        with urllib.request.urlopen(self.base + path, timeout=30) as response:
+            body = response.read()
+        self.bytes += len(body)
+        self.requests += 1
+        return json.loads(body)
+
+    def _saw(self, jobs: list):
+        now = time.time()
+        for job in jobs:
+            if job["status"] == "completed":
+                self.seen_completed.setdefault(job["id"], now)
+
+    def run(self):
+        page = self._get("/jobs?limit=50")
+        self._saw(page["jobs"])
+        if self.mode == "poll":
+            while not self.stop.wait(self.interval):
+                self._saw(self._get("/jobs?limit=50")["jobs"])
+            return
+        with urllib.request.urlopen(f"{self.base}/jobs/feed?since={page['version']}", timeout=60) as stream:
+            self.requests += 1
+            for line in stream:
+                self.bytes += len(line)
+                if line.startswith(b"data:"):
+                    self._saw(json.loads(line[5:])["jobs"])
+                if self.stop.is_set():
+                    return
+
+def churn(db, args, stop: threading.Event, completed: dict):
+    """Writes job changes at a steady rate: create, progress ticks, complete with a transcript."""
+    from storage.models import Job, JobStatus
+
+    step = 1.0 / args.changes_per_sec
+    segments = [{"start": i * 2.0, "end": i * 2.0 + 2, "text": f"Segment number {i} of a benchmark transcript."}
+                for i in range(max(1, args.segments))]
+    next_at = time.time()
+    while not stop.is_set():
+        job_id = str(uuid.uuid4())
+        db.add_job(Job(id=job_id, filename=f"{job_id[:8]}.wav", filepath=f"/bench/{job_id}.wav", created_at=datetime.now()))
+        changes = [lambda p=(i + 1) / (args.progress_ticks + 1): db.update_job_progress(job_id, p) for i in range(args.progress_ticks)]
+        changes.append(lambda: db.update_job_status(
+            job_id, JobStatus.COMPLETED, result={"text": " ".join(s["text"] for s in segments), "segments": segments,
+                            "language": "en", "duration": segments[-1]["end"]},
+            processing_time=1.0
+        ))
+        for change in changes:
+            next_at += step
+            stop.wait(max(0.0, next_at - time.time()))
+            change()
+        completed[job_id] = time.time()
+
+def run(mode: str, args, repo_root: str, env: dict) -> dict:
+    workdir = make_workdir(repo_root)
+    port = free_port()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "service.bootstrap:app", "--port", str(port), "--log-level", "warning"],
+        cwd=workdir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        deadline = time.time() + 60
+        while get(f"http://127.0.0.1:{port}/api/health") != 200:
+            if server.poll() is not None or time.time() > deadline:
+                raise RuntimeError("service did not start")
+            time.sleep(0.05)
+
+        sys.path.insert(0, repo_root)
+        from storage.db import JobDatabase
+        db = JobDatabase(os.path.join(workdir, "whisperwatch.db"))
+
+        stop, clients_stop = threading.Event(), threading.Event()
+        clients = [Client(port, mode, args.interval, clients_stop) for _ in range(args.dashboards)]
+        for client in clients:
+            client.start()
+        time.sleep(1)
+
+        completed = {}
+        cpu_start = cpu_seconds(server.pid)
+        start = time.time()
+        writer = threading.Thread(target=churn, args=(db, args, stop, completed), daemon=True)
+        writer.start()
+        time.sleep(args.duration)
+        stop.set()
+        writer.join()
+        # Let the last completions reach every client before reading the counters
+        time.sleep(args.interval + 1 if mode == "poll" else 2)
+        cpu = cpu_seconds(server.pid) - cpu_start
+        wall = time.time() - start
+        clients_stop.set()
+        db.close()
+    finally:
+        server.send_signal(signal.SIGINT)
+        try:
+            server.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            server.kill()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    staleness = [client.seen_completed[job_id] - at for client in clients for job_id, at in completed.items()
+                 if job_id in client.seen_completed]
+    missed = sum(1 for client in clients for job_id in completed if job_id not in client.seen_completed)
+    return {
+        "server_cpu_seconds": round(cpu, 3),
+        "server_cpu_percent": round(100 * cpu / wall, 1),
+        "client_requests": sum(client.requests for client in clients),
+        "client_bytes": sum(client.bytes for client in clients),
+        "jobs_completed": len(completed),
+        "staleness_seconds": {
+            "mean": round(statistics.mean(staleness), 3) if staleness else None,
+            "max": round(max(staleness), 3) if staleness else None
+        },
+        "missed_completions": missed
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dashboards", type=int, default=30)
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--interval", type=float, default=5.0, help="poll mode: seconds between GET /api/jobs")
+    parser.add_argument("--changes-per-sec", type=float, default=5.0)
+    parser.add_argument("--progress-ticks", type=int, default=4)
+    parser.add_argument("--segments", type=int, default=200)
+    parser.add_argument("--modes", nargs="+", default=["poll", "feed"], choices=["poll", "feed"])
+    args = parser.parse_args()
+
+    repo_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [repo_root, os.environ.get("PYTHONPATH")])))
+    print(json.dumps({
+        "benchmark": "feed",
+        "params": vars(args),
+        "environment": {"python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count()},
+        "results": {mode: run(mode, args, repo_root, env) for mode in args.modes}
+    }, indent=2))
+
+if __name__ == "__main__":
+    main()
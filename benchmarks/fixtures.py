@@ -0,0 +1,67 @@
+"""Synthetic audio fixtures for the benchmarks.
+
+Every fixture is a 16 kHz mono 16-bit WAV generated from a seed, so the same
+arguments always produce byte-identical files (and distinct seeds never
+collide in the transcript cache). Kinds:
+
+- tone: a slow sine sweep from a seeded start frequency
+- speech: noise shaped by a ~4 Hz syllable envelope with short pauses
+- silence: digital silence with a little dither
+- mixed: speech with long silent stretches in between
+"""
+import wave
+import numpy as np
+
+SAMPLING_RATE = 16000
+KINDS = ("tone", "speech", "silence", "mixed")
+
+def _speech(rng, samples: int) -> np.ndarray:
+    noise = rng.standard_normal(samples)
+    # Crude low-pass so the noise sits roughly in the voice band
+    kernel = np.ones(8) / 8
+    noise = np.convolve(noise, kernel, mode="same")
+    t = np.arange(samples) / SAMPLING_RATE
+    syllables = 0.5 * (1 + np.sin(2 * np.pi * rng.uniform(3, 5) * t))
+    # Word pauses: zero the envelope for ~20% of 250 ms blocks
+    block = SAMPLING_RATE // 4
+    pauses = np.repeat(rng.random(samples // block + 1) < 0.2, block)[:samples]
+    syllables[pauses] = 0
+    return noise * syllables * 0.3
+
+def _generate(kind: str, seconds: float, seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    samples = int(seconds * SAMPLING_RATE)
+    t = np.arange(samples) / SAMPLING_RATE
+    if kind == "tone":
+        low = rng.uniform(150, 400)
+        freq = np.linspace(low, low * 8, samples)
+        audio = 0.3 * np.sin(2 * np.pi * np.cumsum(freq) / SAMPLING_RATE)
+    elif kind == "speech":
+        audio = _speech(rng, samples)
+    elif kind == "silence":
+        audio = rng.standard_normal(samples) * 1e-4
+    elif kind == "mixed":
+        audio = _speech(rng, samples)
+        # Alternate 20 s of speech with 40 s of silence
+        audio[(t % 60) >= 20] = 0
+    else:
+        raise ValueError(f"Unknown fixture kind: {kind}")
+    return np.clip(audio, -1, 1)
+
+def write_fixture(path: str, kind: str, seconds: float, seed: int) -> str:
+    audio = _generate(kind, seconds, seed)
+    with wave.open(path, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(SAMPLING_RATE)
+        f.writeframes((audio * 32767).astype(np.int16).tobytes())
+    return path
+
+def fixture_plan(count: int, durations, kinds=KINDS, seed: int = 0):
+    """(name, kind, seconds, seed) for count fixtures cycling through kinds and durations."""
+    plan = []
+    for i in range(count):
+        kind = kinds[i % len(kinds)]
+        seconds = durations[(i // len(kinds)) % len(durations)]
+        plan.append((f"{i:04d}-{kind}-{seconds:g}s.wav", kind, seconds, seed * 100003 + i))
+    return plan
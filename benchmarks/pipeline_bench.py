@@ -0,0 +1,273 @@
+"""End-to-end benchmark of the job pipeline on synthetic media.
+
+Generates fixtures (see benchmarks/fixtures.py), drops them into a watched
+directory and lets the real services handle them: WatcherService ->
+JobManager -> process_job -> save_transcript -> JobDatabase. Everything runs
+in a throwaway directory with default config plus the overrides below.
+
+By default a fake engine stands in for Whisper, so the run is offline and
+measures the pipeline around the model: it emits a segment every
+--segment-seconds of audio and sleeps --fake-rtf seconds per audio second.
+--engine real uses transcription.engine.engine and the configured model;
+--engine package.module:attr plugs in any object with the engine's
+transcribe() signature.
+
+    python -m benchmarks.pipeline_bench --files 40 --workers 2 > before.json
+
+Reports real-time factor, queue throughput, per-stage latency percentiles,
+database operations per second and peak RSS as JSON.
+"""
+import argparse
+import importlib
+import json
+import os
+import platform
+import resource
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from types import SimpleNamespace
+
+from benchmarks.fixtures import KINDS, fixture_plan, write_fixture
+
+DB_METHODS = (
+    "add_job", "update_job_status", "update_job_progress", "claim_next_job",
+    "get_job", "renew_leases", "list_jobs_by_status", "processing_counts_by_source"
+)
+
+class FakeEngine:
+    """Stand-in for TranscriptionEngine that produces evenly spaced segments at a fixed real-time factor."""
+
+    def __init__(self, rtf: float = 0.02, segment_seconds: float = 5.0):
+        self.rtf = rtf
+        self.segment_seconds = segment_seconds
+
+    def transcribe(self, audio_path: str, on_segment=None, on_progress=None, prefetched=None, resume=None, on_start=None):
+        from config.manager import config
+        from storage.words import materialize
+        from transcription.replicas import model_signature
+        from utils.files import probe_duration
+
+        duration = prefetched.duration if prefetched else (probe_duration(audio_path) or 0.0)
+        # A checkpoint's segments are kept and only the audio after its offset is "transcribed"
+        segments = materialize(resume)["segments"] if resume else []
+        start = resume["offset"] if resume else 0.0
+        # Passes for the configured model, so its checkpoints resume like a real job's
+        if on_start:
+            on_start(model_signature(config.get("model", {})), "en")
+        while start < duration:
+            end = min(duration, start + self.segment_seconds)
+            time.sleep((end - start) * self.rtf)
+            seg = {"start": start, "end": end, "text": f" segment {len(segments)}", "words": None}
+            segments.append(seg)
+            if on_segment:
+                on_segment(seg)
+            if on_progress:
+                on_progress(end / duration)
+            start = end
+        return {"segments": segments, "language": "en", "duration": duration}
+
+def percentiles(values) -> dict:
+    if not values:
+        return {"count": 0}
+    values = sorted(values)
+
+    def rank(p):
+        return values[min(len(values) - 1, max(0, int(round(p / 100 * len(values))) - 1))]
+
+    return {
+        "count": len(values),
+        "mean": round(sum(values) / len(values), 6),
+        "p50": round(rank(50), 6),
+        "p90": round(rank(90), 6),
+        "p99": round(rank(99), 6),
+        "max": round(values[-1], 6)
+    }
+
+class Recorder:
+    """Wraps callables to record when and for how long they ran."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.marks = {}    # (stage, key) -> timestamp
+        self.durations = {}  # stage -> [seconds]
+
+    def mark(self, stage, key, when=None):
+        with self.lock:
+            self.marks[(stage, key)] = when or time.time()
+
+    def add(self, stage, seconds):
+        with self.lock:
+            self.durations.setdefault(stage, []).append(seconds)
+
+    def timed(self, stage, fn, key=None, done_stage=None):
+        def wrapper(*args, **kwargs):
+            start = time.time()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                end = time.time()
+                self.add(stage, end - start)
+                if key:
+                    k = key(*args, **kwargs)
+                    self.mark(stage, k, start)
+                    if done_stage:
+                        self.mark(done_stage, k, end)
+        return wrapper
+
+def load_engine(spec: str, args):
+    if spec == "fake":
+        return FakeEngine(args.fake_rtf, args.segment_seconds)
+    if spec == "real":
+        spec = "transcription.engine:engine"
+    module, _, attr = spec.partition(":")
+    return getattr(importlib.import_module(module), attr)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=40)
+    parser.add_argument("--durations", type=float, nargs="+", default=[5, 15, 30, 60, 180], help="fixture lengths in seconds")
+    parser.add_argument("--kinds", nargs="+", default=list(KINDS), choices=KINDS)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--engine", default="fake", help="fake, real, or package.module:attr")
+    parser.add_argument("--fake-rtf", type=float, default=0.02)
+    parser.add_argument("--segment-seconds", type=float, default=5.0)
+    parser.add_argument("--stability-seconds", type=float, default=0.5)
+    parser.add_argument("--formats", nargs="+", default=["json", "txt", "srt", "vtt"])
+    parser.add_argument("--timeout", type=float, default=600)
+    parser.add_argument("--keep", action="store_true", help="keep the working directory")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="whisperwatch-bench-")
+    repo_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    sys.path.insert(0, repo_root)
+    # The service keeps its database, logs and config relative to the working
+    # directory, so move before importing it
+    os.chdir(workdir)
+
+    from config.manager import config
+    from utils.logger import app_logger
+    app_logger.setLevel("WARNING")
+
+    watch_dir = os.path.join(workdir, "media")
+    staging_dir = os.path.join(workdir, "staging")
+    os.makedirs(staging_dir)
+    config._config["watchKey"].update({"paths": [watch_dir], "stability_check_seconds": args.stability_seconds})
+    config._config["output"].update({"output_dir": os.path.join(workdir, "transcripts"), "formats": args.formats, "streaming": False})
+    config._config["worker"]["concurrency"] = args.workers
+
+    from jobs import worker
+    from jobs.queue import job_manager
+    from storage.db import db
+    from watcher.observer import WatcherService
+
+    recorder = Recorder()
+    job_paths = {}
+    create_job = job_manager.create_job
+
+    def tracked_create_job(filepath, *args, **kwargs):
+        job = create_job(filepath, *args, **kwargs)
+        job_paths[job.id] = filepath
+        return job
+
+    job_manager.create_job = recorder.timed("create_job", tracked_create_job, key=lambda filepath, *a, **kw: filepath)
+    # Duplicate media completes from the transcript cache without reaching process_job
+    job_manager.complete_from_cache = recorder.timed(
+        "cache_hit", job_manager.complete_from_cache, key=lambda job, result: job.id, done_stage="finished"
+    )
+    worker.process_job = recorder.timed("process", worker.process_job, key=lambda job: job.id, done_stage="finished")
+    engine = load_engine(args.engine, args)
+    worker.engine = SimpleNamespace(transcribe=recorder.timed("transcribe", engine.transcribe))
+    worker.save_transcript = recorder.timed("save", worker.save_transcript)
+    for name in DB_METHODS:
+        method = getattr(db, name)
+        setattr(db, name, recorder.timed(f"db.{name}", method))
+
+    plan = fixture_plan(args.files, args.durations, args.kinds, args.seed)
+    for name, kind, seconds, seed in plan:
+        write_fixture(os.path.join(staging_dir, name), kind, seconds, seed)
+    audio_seconds = sum(seconds for _, _, seconds, _ in plan)
+
+    watcher_service = WatcherService()
+    watcher_service.start()
+    pool = worker.WorkerPool(args.workers)
+    pool.start()
+
+    start = time.time()
+    for name, _, _, _ in plan:
+        target = os.path.join(watch_dir, name)
+        recorder.mark("dropped", target)
+        os.replace(os.path.join(staging_dir, name), target)
+
+    finished = False
+    while time.time() - start < args.timeout:
+        done = [job_id for job_id in job_paths if ("finished", job_id) in recorder.marks]
+        if len(done) >= len(plan):
+            finished = True
+            break
+        time.sleep(0.05)
+    wall = time.time() - start
+
+    watcher_service.stop()
+    pool.stop(timeout=30)
+
+    statuses = {}
+    for job_id in job_paths:
+        status = db.get_job(job_id, with_transcript=False).status.value
+        statuses[status] = statuses.get(status, 0) + 1
+    db.close()
+
+    marks = recorder.marks
+    stages = {"detect": [], "queue_wait": [], "end_to_end": []}
+    for job_id, path in job_paths.items():
+        dropped = marks.get(("dropped", path))
+        queued = marks.get(("create_job", path))
+        started = marks.get(("process", job_id))
+        ended = marks.get(("finished", job_id))
+        if dropped and queued:
+            stages["detect"].append(queued - dropped)
+        if queued and started:
+            stages["queue_wait"].append(started - queued)
+        if dropped and ended:
+            stages["end_to_end"].append(ended - dropped)
+    for stage in ("create_job", "cache_hit", "process", "transcribe", "save"):
+        stages[stage] = recorder.durations.get(stage, [])
+
+    db_ops = {name[3:]: percentiles(values) for name, values in recorder.durations.items() if name.startswith("db.")}
+    total_db_ops = sum(stats["count"] for stats in db_ops.values())
+    processing = sum(recorder.durations.get("process", []))
+    self_usage = resource.getrusage(resource.RUSAGE_SELF)
+    child_usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+
+    print(json.dumps({
+        "benchmark": "pipeline",
+        "params": vars(args),
+        "environment": {"python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count()},
+        "completed": finished,
+        "jobs": len(job_paths),
+        "statuses": statuses,
+        "audio_seconds": audio_seconds,
+        "wall_seconds": round(wall, 3),
+        "real_time_factor": round(processing / audio_seconds, 4) if audio_seconds else None,
+        "wall_real_time_factor": round(wall / audio_seconds, 4) if audio_seconds else None,
+        "throughput": {
+            "jobs_per_sec": round(len(job_paths) / wall, 3),
+            "audio_seconds_per_sec": round(audio_seconds / wall, 2)
+        },
+        "stages": {stage: percentiles(values) for stage, values in stages.items()},
+        "db": {"ops": total_db_ops, "ops_per_sec": round(total_db_ops / wall, 1), "methods": db_ops},
+        # ru_maxrss is in KiB on Linux
+        "peak_rss_mb": {
+            "self": round(self_usage.ru_maxrss / 1024, 1),
+            "children": round(child_usage.ru_maxrss / 1024, 1)
+        }
+    }, indent=2))
+
+    if not args.keep:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
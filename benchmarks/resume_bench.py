@@ -0,0 +1,163 @@
+"""Cost of a crash in the middle of a long file, with and without checkpoints.
+
+Drops one --duration second fixture into a fresh service, SIGKILLs the
+service --kill-after seconds into the transcription, starts it again and
+waits until the job completes. Runs once with checkpoints every
+--checkpoint-interval seconds and once with checkpoint.enabled off, where the
+restarted job starts over from zero. Reports per mode the wall-clock time from
+drop to completion, the audio the restarted service took from the checkpoint,
+and the audio that was transcribed twice.
+
+Uses the fake engine from pipeline_bench (a segment every --segment-seconds,
+--fake-rtf seconds per audio second) unless --engine real is given.
+
+    python -m benchmarks.resume_bench --duration 3600 --kill-after 20
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+import yaml
+
+from benchmarks.cluster_bench import api, fake_engine
+from benchmarks.fixtures import write_fixture
+from benchmarks.startup_bench import free_port, get
+
+def make_workdir(repo_root: str, args, checkpoint: bool) -> str:
+    workdir = tempfile.mkdtemp(prefix="whisperwatch-resume-")
+    os.makedirs(os.path.join(workdir, "config"))
+    settings = {
+        "watchKey": {"paths": [os.path.join(workdir, "media")], "extensions": [".wav"], "stability_check_seconds": 0.5},
+        "model_cache": {"preload_on_startup": args.engine == "real"},
+        "output": {"output_dir": os.path.join(workdir, "transcripts"), "formats": ["json", "srt"]},
+        "checkpoint": {"enabled": checkpoint, "interval": args.checkpoint_interval, "min_duration": 0},
+        "worker": {"concurrency": 1}
+    }
+    with open(os.path.join(workdir, "config", "config.yaml"), "w") as f:
+        yaml.safe_dump(settings, f)
+    os.symlink(os.path.join(repo_root, "ui"), os.path.join(workdir, "ui"))
+    return workdir
+
+def run_server(args):
+    """--role server: the service, with the fake engine plugged in unless --engine real."""
+    import uvicorn
+    from service.bootstrap import app
+
+    engine = fake_engine(args)
+    if engine:
+        from jobs import worker
+        worker.engine = engine
+    uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning")
+
+def start_server(args, workdir: str, env: dict) -> subprocess.Popen:
+    argv = [sys.executable, "-m", "benchmarks.resume_bench", "--role", "server", "--port", str(args.port),
+            "--engine", args.engine, "--fake-rtf", str(args.fake_rtf), "--segment-seconds", str(args.segment_seconds)]
+    server = subprocess.Popen(argv, cwd=workdir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + 60
+    while get(f"http://127.0.0.1:{args.port}/api/health") != 200:
+        if server.poll() is not None or time.time() > deadline:
+            raise RuntimeError("service did not start")
+        time.sleep(0.05)
+    return server
+
+def metric(port: int, name: str) -> float:
+    with urllib.request.urlopen(f"http://127.0.0.1:{port}/api/metrics", timeout=10) as response:
+        for line in response.read().decode("utf-8").splitlines():
+            if line.startswith(name + " "):
+                return float(line.split()[1])
+    return 0.0
+
+def run(args, repo_root: str, env: dict, fixture: str, checkpoint: bool) -> dict:
+    workdir = make_workdir(repo_root, args, checkpoint)
+    args.port = free_port()
+    server = start_server(args, workdir, env)
+    try:
+        start = time.time()
+        os.symlink(fixture, os.path.join(workdir, "media", os.path.basename(fixture)))
+
+        # Wait until the job is running, then until --kill-after seconds of transcription have passed
+        while True:
+            jobs = api(args.port, "/jobs")["jobs"]
+            if jobs and jobs[0]["status"] == "processing":
+                break
+            if jobs and jobs[0]["status"] == "failed":
+                raise RuntimeError(f"job failed: {jobs[0]['error']}")
+            time.sleep(0.05)
+        job_id = jobs[0]["id"]
+        time.sleep(args.kill_after)
+        progress_at_kill = api(args.port, f"/jobs/{job_id}")["progress"] or 0.0
+        server.kill()
+        server.wait()
+
+        server = start_server(args, workdir, env)
+        while True:
+            job = api(args.port, f"/jobs/{job_id}")
+            if job["status"] in ("completed", "failed"):
+                break
+            time.sleep(0.1)
+        wall = time.time() - start
+        resumed = metric(args.port, "whisperwatch_resumed_audio_seconds_total")
+    finally:
+        server.send_signal(signal.SIGINT)
+        try:
+            server.wait(timeout=60)
+        except subprocess.TimeoutExpired:
+            server.kill()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    # Progress in the DB is written at most once a second, so this is a lower bound of what was done before the kill
+    done_before_kill = progress_at_kill * args.duration
+    return {
+        "status": job["status"],
+        "wall_seconds": round(wall, 3),
+        "audio_done_before_kill": round(done_before_kill, 1),
+        "audio_resumed": round(resumed, 1),
+        "audio_transcribed_twice": round(max(0.0, done_before_kill - resumed), 1),
+        "segments": len(job["result"]["segments"]) if job.get("result") else None
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--duration", type=float, default=3600, help="fixture length in seconds")
+    parser.add_argument("--kind", default="speech", choices=["tone", "speech", "silence", "mixed"])
+    parser.add_argument("--kill-after", type=float, default=20, help="seconds of transcription before the SIGKILL")
+    parser.add_argument("--checkpoint-interval", type=float, default=5)
+    parser.add_argument("--engine", default="fake", choices=["fake", "real"])
+    parser.add_argument("--fake-rtf", type=float, default=0.01)
+    parser.add_argument("--segment-seconds", type=float, default=5.0)
+    parser.add_argument("--role", default="bench", choices=["bench", "server"], help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, default=0, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.role == "server":
+        return run_server(args)
+
+    repo_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [repo_root, os.environ.get("PYTHONPATH")])))
+    fixture_dir = tempfile.mkdtemp(prefix="whisperwatch-resume-media-")
+    fixture = write_fixture(os.path.join(fixture_dir, "long.wav"), args.kind, args.duration, 0)
+    try:
+        results = {
+            "checkpoint": run(args, repo_root, env, fixture, checkpoint=True),
+            "restart": run(args, repo_root, env, fixture, checkpoint=False)
+        }
+    finally:
+        shutil.rmtree(fixture_dir, ignore_errors=True)
+
+    print(json.dumps({
+        "benchmark": "resume",
+        "params": {k: v for k, v in vars(args).items() if k not in ("role", "port")},
+        "environment": {"python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count()},
+        "results": results
+    }, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+"""Startup-time benchmark: how fast the service imports, serves and gets a model ready.
+
+Each run starts from a fresh interpreter in a throwaway working directory
+(its own config, database, logs and watch path):
+
+- import: importing each top-level module, and which files or threads the
+  import left behind (there should be none: the application is wired in the
+  service.bootstrap lifespan, not at import time)
+- serve: launching uvicorn until GET /api/health answers
+- ready: until GET /api/ready returns 200, i.e. the configured model is
+  loaded (null if it is not within --ready-timeout)
+- shutdown: from SIGINT until the process exits
+
+    python -m benchmarks.startup_bench --model tiny --runs 3
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+
+import yaml
+
+MODULES = ("config.manager", "storage.db", "transcription.engine", "jobs.worker", "api.main", "service.bootstrap")
+
+IMPORT_PROBE = """
+import json, os, sys, threading, time
+before = set(os.listdir("."))
+start = time.perf_counter()
+__import__(sys.argv[1])
+seconds = time.perf_counter() - start
+created = sorted(set(os.listdir(".")) - before)
+threads = sorted(t.name for t in threading.enumerate() if t is not threading.main_thread())
+print(json.dumps({"seconds": seconds, "created": created, "threads": threads}))
+"""
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def make_workdir(repo_root: str, args) -> str:
+    workdir = tempfile.mkdtemp(prefix="whisperwatch-startup-")
+    os.makedirs(os.path.join(workdir, "config"))
+    settings = {
+        "watchKey": {"paths": [os.path.join(workdir, "media")], "extensions": [".wav"], "stability_check_seconds": 1},
+        "model": {"name": args.model, "device": args.device, "compute_type": args.compute_type},
+        "model_cache": {"preload_on_startup": not args.no_preload},
+        "output": {"output_dir": os.path.join(workdir, "transcripts"), "formats": ["json"]},
+        "worker": {"concurrency": 1, "mode": args.worker_mode}
+    }
+    with open(os.path.join(workdir, "config", "config.yaml"), "w") as f:
+        yaml.safe_dump(settings, f)
+    # api.main serves templates and static files relative to the working directory
+    os.symlink(os.path.join(repo_root, "ui"), os.path.join(workdir, "ui"))
+    return workdir
+
+def reset_workdir(workdir: str):
+    for name in os.listdir(workdir):
+        if name not in ("config", "ui"):
+            path = os.path.join(workdir, name)
+            if os.path.isdir(path):
+                shutil.rmtree(path)
+            else:
+                os.remove(path)
+
+def probe_import(module: str, workdir: str, env: dict) -> dict:
+    reset_workdir(workdir)
+    out = subprocess.run([sys.executable, "-c", IMPORT_PROBE, module], cwd=workdir, env=env,
+                         capture_output=True, text=True, check=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+def get(url: str, timeout: float = 1.0):
+    try:
+        with urllib.request.urlopen(url, timeout=timeout) as response:
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+    except (urllib.error.URLError, ConnectionError, socket.timeout):
+        return None
+
+def run_server(workdir: str, env: dict, args) -> dict:
+    reset_workdir(workdir)
+    port = free_port()
+    base = f"http://127.0.0.1:{port}/api"
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "service.bootstrap:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=workdir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    result = {"serve_seconds": None, "ready_seconds": None, "shutdown_seconds": None}
+    try:
+        while time.perf_counter() - start < args.serve_timeout and proc.poll() is None:
+            if get(f"{base}/health") == 200:
+                result["serve_seconds"] = time.perf_counter() - start
+                break
+            time.sleep(0.01)
+        if result["serve_seconds"] is not None:
+            while time.perf_counter() - start < args.ready_timeout and proc.poll() is None:
+                if get(f"{base}/ready") == 200:
+                    result["ready_seconds"] = time.perf_counter() - start
+                    break
+                time.sleep(0.05)
+    finally:
+        stop = time.perf_counter()
+        proc.send_signal(signal.SIGINT)
+        try:
+            proc.wait(timeout=60)
+            result["shutdown_seconds"] = time.perf_counter() - stop
+        except subprocess.TimeoutExpired:
+            proc.kill()
+    return result
+
+def summarize(values) -> dict:
+    values = [v for v in values if v is not None]
+    if not values:
+        return None
+    return {"min": round(min(values), 4), "median": round(statistics.median(values), 4), "max": round(max(values), 4)}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--model", default="tiny")
+    parser.add_argument("--device", default="cpu")
+    parser.add_argument("--compute-type", default="int8")
+    parser.add_argument("--worker-mode", default="thread", choices=["thread", "process"])
+    parser.add_argument("--no-preload", action="store_true", help="do not load the model at startup")
+    parser.add_argument("--serve-timeout", type=float, default=30)
+    parser.add_argument("--ready-timeout", type=float, default=300)
+    parser.add_argument("--keep", action="store_true", help="keep the working directory")
+    args = parser.parse_args()
+
+    repo_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [repo_root, os.environ.get("PYTHONPATH")])))
+    workdir = make_workdir(repo_root, args)
+
+    imports = {}
+    for module in MODULES:
+        probes = [probe_import(module, workdir, env) for _ in range(args.runs)]
+        imports[module] = {
+            "seconds": summarize([p["seconds"] for p in probes]),
+            "created": probes[-1]["created"],
+            "threads": probes[-1]["threads"]
+        }
+    servers = [run_server(workdir, env, args) for _ in range(args.runs)]
+
+    print(json.dumps({
+        "benchmark": "startup",
+        "params": vars(args),
+        "environment": {"python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count()},
+        "import": imports,
+        "serve_seconds": summarize([s["serve_seconds"] for s in servers]),
+        "ready_seconds": summarize([s["ready_seconds"] for s in servers]),
+        "shutdown_seconds": summarize([s["shutdown_seconds"] for s in servers])
+    }, indent=2))
+
+    if not args.keep:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+"""Upload benchmark: API latency while several large uploads stream in.
+
+Starts the service with uvicorn in a throwaway working directory, measures
+GET /api/status latency while idle, then again while --uploads concurrent
+uploads of --size-mb each are in flight, through either the multipart
+POST /api/transcribe or the resumable /api/uploads API (--chunk-mb per
+PATCH). Each upload is a WAV file of silence; the job it creates must carry
+the SHA-256 the client computed. Only ingestion is measured: the configured
+model does not exist, so the jobs fail instead of being transcribed.
+
+    python -m benchmarks.upload_bench --uploads 4 --size-mb 256 --api multipart
+    python -m benchmarks.upload_bench --uploads 4 --size-mb 256 --api resumable
+"""
+import argparse
+import hashlib
+import http.client
+import json
+import os
+import platform
+import shutil
+import signal
+import struct
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import yaml
+
+from benchmarks.startup_bench import free_port, get
+from benchmarks.pipeline_bench import percentiles
+
+BLOCK = 1024 * 1024
+
+def wav_header(data_bytes: int) -> bytes:
+    # 16 kHz mono 16-bit PCM
+    return b"RIFF" + struct.pack("<I", 36 + data_bytes) + b"WAVEfmt " + struct.pack("<IHHIIHH", 16, 1, 1, 16000, 32000, 2, 16) \
+        + b"data" + struct.pack("<I", data_bytes)
+
+def media_blocks(size: int):
+    """The upload's bytes, generated block by block: a WAV header, then silence."""
+    header = wav_header(size - 44)
+    yield header
+    remaining = size - len(header)
+    zeros = bytes(BLOCK)
+    while remaining:
+        n = min(remaining, BLOCK)
+        yield zeros[:n]
+        remaining -= n
+
+def media_digest(size: int) -> str:
+    digest = hashlib.sha256()
+    for block in media_blocks(size):
+        digest.update(block)
+    return digest.hexdigest()
+
+def make_workdir(repo_root: str) -> str:
+    workdir = tempfile.mkdtemp(prefix="whisperwatch-upload-")
+    os.makedirs(os.path.join(workdir, "config"))
+    settings = {
+        "watchKey": {"paths": [os.path.join(workdir, "media")], "extensions": [".wav"]},
+        # No such model: queued uploads fail at model load instead of competing with the uploads for CPU
+        "model": {"name": "upload-bench-no-model"},
+        "model_cache": {"preload_on_startup": False},
+        "output": {"output_dir": os.path.join(workdir, "transcripts"), "formats": ["json"]},
+        "upload": {"dir": os.path.join(workdir, "uploads")},
+        "worker": {"concurrency": 1}
+    }
+    with open(os.path.join(workdir, "config", "config.yaml"), "w") as f:
+        yaml.safe_dump(settings, f)
+    os.symlink(os.path.join(repo_root, "ui"), os.path.join(workdir, "ui"))
+    return workdir
+
+def upload_multipart(port: int, name: str, size: int) -> dict:
+    boundary = "whisperwatchbench"
+    head = (f"--{boundary}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"{name}\"\r\n"
+            f"Content-Type: audio/wav\r\n\r\n").encode()
+    tail = f"\r\n--{boundary}--\r\n".encode()
+
+    def body():
+        yield head
+        yield from media_blocks(size)
+        yield tail
+
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=600)
+    conn.request("POST", "/api/transcribe", body=body(), encode_chunked=True,
+                 headers={"Content-Type": f"multipart/form-data; boundary={boundary}", "Transfer-Encoding": "chunked"})
+    response = conn.getresponse()
+    job = json.loads(response.read())
+    conn.close()
+    return job
+
+def upload_resumable(port: int, name: str, size: int, chunk_bytes: int) -> dict:
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=600)
+    conn.request("POST", "/api/uploads", json.dumps({"filename": name, "size": size}), {"Content-Type": "application/json"})
+    upload_id = json.loads(conn.getresponse().read())["upload_id"]
+
+    blocks = media_blocks(size)
+    pending = b""
+    offset = 0
+    while offset < size:
+        length = min(chunk_bytes, size - offset)
+
+        def chunk(length=length):
+            nonlocal pending
+            sent = 0
+            while sent < length:
+                block = pending or next(blocks)
+                take = block[:length - sent]
+                pending = block[len(take):]
+                sent += len(take)
+                yield take
+
+        conn.request("PATCH", f"/api/uploads/{upload_id}", body=chunk(),
+                     headers={"Upload-Offset": str(offset), "Content-Length": str(length)})
+        reply = json.loads(conn.getresponse().read())
+        offset = reply["offset"]
+    conn.close()
+    return reply["job"]
+
+def probe(port: int, seconds: float, interval: float, stop: threading.Event = None) -> list:
+    latencies = []
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end and not (stop and stop.is_set()):
+        start = time.perf_counter()
+        get(f"http://127.0.0.1:{port}/api/status", timeout=30)
+        latencies.append(time.perf_counter() - start)
+        time.sleep(interval)
+    return latencies
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--uploads", type=int, default=4)
+    parser.add_argument("--size-mb", type=int, default=256)
+    parser.add_argument("--api", default="resumable", choices=["multipart", "resumable"])
+    parser.add_argument("--chunk-mb", type=int, default=64, help="bytes per PATCH for --api resumable")
+    parser.add_argument("--idle-seconds", type=float, default=3)
+    parser.add_argument("--probe-interval", type=float, default=0.02)
+    parser.add_argument("--keep", action="store_true", help="keep the working directory")
+    args = parser.parse_args()
+
+    repo_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [repo_root, os.environ.get("PYTHONPATH")])))
+    workdir = make_workdir(repo_root)
+    size = args.size_mb * BLOCK
+    expected = media_digest(size)
+
+    port = free_port()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "service.bootstrap:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=workdir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        deadline = time.perf_counter() + 30
+        while get(f"http://127.0.0.1:{port}/api/health") != 200:
+            if time.perf_counter() > deadline or proc.poll() is not None:
+                raise SystemExit("service did not start")
+            time.sleep(0.05)
+
+        idle = probe(port, args.idle_seconds, args.probe_interval)
+
+        jobs = [None] * args.uploads
+        def run(i):
+            name = f"upload-{i}.wav"
+            if args.api == "multipart":
+                jobs[i] = upload_multipart(port, name, size)
+            else:
+                jobs[i] = upload_resumable(port, name, size, args.chunk_mb * BLOCK)
+
+        done = threading.Event()
+        loaded = []
+        prober = threading.Thread(target=lambda: loaded.extend(probe(port, float("inf"), args.probe_interval, done)))
+        prober.start()
+        start = time.perf_counter()
+        threads = [threading.Thread(target=run, args=(i,)) for i in range(args.uploads)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        upload_seconds = time.perf_counter() - start
+        done.set()
+        prober.join()
+    finally:
+        proc.send_signal(signal.SIGINT)
+        try:
+            proc.wait(timeout=60)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+    print(json.dumps({
+        "benchmark": "upload",
+        "params": vars(args),
+        "environment": {"python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count()},
+        "upload_seconds": round(upload_seconds, 3),
+        "throughput_mb_s": round(args.uploads * args.size_mb / upload_seconds, 1),
+        "hashes_match": all(job and job.get("media_hash") == expected for job in jobs),
+        "status_latency_idle": percentiles(idle),
+        "status_latency_during_uploads": percentiles(loaded)
+    }, indent=2))
+
+    if not args.keep:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
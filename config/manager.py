@@ -1,6 +1,7 @@
 import yaml
 import os
 from typing import Any, Dict
+from utils.lazy import Lazy
 from utils.logger import app_logger
 
 class ConfigManager:
@@ -25,21 +26,113 @@ class ConfigManager:
             "watchKey": {
                 "paths": ["/workspace/media"],
                 "extensions": [".mp3", ".wav", ".mp4", ".mkv", ".mov", ".m4a"],
-                "stability_check_seconds": 2
+                "stability_check_seconds": 2,
+                "ingest_workers": 2 # threads hashing and probing stable files into jobs
             },
             "model": {
                 "name": "base",
                 "device": "cpu",  # or cuda
                 "compute_type": "int8" # float16, int8_float16
             },
+            "live": {
+                "max_streams": 2, # concurrent WebSocket sessions, each with a model slot of its own in thread mode; 0 = live off
+                "window_seconds": 15, # longest audio re-transcribed per step
+                "step_seconds": 1.0, # new audio between transcriptions (partial update rate)
+                "max_buffer_seconds": 30, # unprocessed audio per stream before the socket stops being read
+                "beam_size": 1,
+                "dir": "/workspace/live", # recordings of finished sessions
+                "formats": ["srt", "vtt"]
+            },
+            "model_cache": {
+                "max_bytes": 4294967296, # loaded models kept resident, least recently used dropped first
+                "preload_on_startup": True, # load the configured model in the background at startup
+                "serve_previous_while_loading": True # after a model switch, jobs use the old model until the new one is loaded
+            },
             "transcription": {
                 "language": None, # None = auto
                 "beam_size": 5,
-                "timestamp_granularity": "segment" # or word
+                "timestamp_granularity": "segment", # or word
+                "mode": "sequential", # or batched: decode batch_size 30s windows together
+                "batch_size": 8,
+                "chunking": {
+                    "enabled": False, # split long files at silences and transcribe chunks in parallel
+                    "min_duration": 1800, # seconds
+                    "chunk_seconds": 600,
+                    "parallel": 0 # chunks transcribed at once in thread mode, 0 = cores // cpu_threads (4 if unset)
+                },
+                "cascade": {
+                    "enabled": False, # first pass on a cheap model, weak segments re-done by the configured model
+                    "model": "base", # first-pass model (same device and compute type)
+                    "min_avg_logprob": -0.6, # segments below this are escalated...
+                    "max_no_speech_prob": 0.6, # ...or above this...
+                    "max_compression_ratio": 2.4, # ...or above this (repetitive text)
+                    "padding": 0.5 # seconds added around escalated regions, within the silence next to them
+                }
             },
             "output": {
                 "output_dir": "/workspace/transcripts",
-                "formats": ["json", "txt", "srt", "vtt"]
+                # Written to output_dir when a job finishes (empty = none); every format
+                # is also rendered on demand at /api/jobs/{id}/transcript.{fmt}
+                "formats": ["json", "txt", "srt", "vtt"], # also: jsonl
+                "streaming": False, # append txt/srt/vtt/jsonl while transcribing
+                "render_cache_bytes": 67108864 # LRU of formats rendered by the API
+            },
+            "cache": {
+                "enabled": True, # reuse results for identical media + model + parameters
+                "max_entries": 1000,
+                "max_bytes": 536870912
+            },
+            "checkpoint": {
+                "enabled": True, # save a running job's segments so a restart resumes instead of starting over
+                "interval": 60, # seconds of transcription between checkpoints
+                "min_duration": 600 # only files at least this long (seconds) are checkpointed
+            },
+            "cluster": {
+                "enabled": False, # serve the /api/nodes lease API to remote worker nodes (service.node)
+                "token": "", # shared secret nodes send as a Bearer token; "" = none
+                # The rest is read by worker nodes:
+                "server_url": "http://localhost:8000", # service to lease jobs from
+                "node_id": "", # "" = <hostname>-<pid>
+                "media": "auto", # "shared" reads the job's path, "download" fetches it, "auto" = shared if visible
+                "download_dir": "/tmp/whisperwatch-node",
+                "progress_interval": 1.0 # seconds between segment/progress posts
+            },
+            "feed": {
+                "poll_interval": 0.5, # seconds between job version checks while /jobs/feed streams are open
+                "max_changes": 500, # jobs per changes event; larger deltas arrive as several events
+                "max_queue": 100 # events a stream may fall behind before it is closed to reconnect
+            },
+            "prefetch": {
+                "enabled": False, # decode upcoming jobs to 16 kHz PCM while the model is busy
+                "depth": 2, # queued jobs decoded ahead
+                "workers": 1, # decoder processes
+                "memory_dir": "/dev/shm/whisperwatch", # tmpfs scratch, used first
+                "memory_bytes": 1073741824,
+                "scratch_dir": "/tmp/whisperwatch-scratch", # disk scratch once memory_bytes is used up
+                "disk_bytes": 4294967296
+            },
+            "queue": {
+                "lease_seconds": 60, # a job is re-issued if its worker stops heartbeating this long
+                "poll_interval": 1.0,
+                "max_attempts": 3 # interrupted jobs are failed after this many leases
+            },
+            "scheduler": {
+                "policy": "sjf", # shortest job first with aging, or "fifo"
+                "aging_factor": 1.0, # seconds of effective length removed per second waited
+                "priority_seconds": 3600, # head start per priority point
+                "default_duration": 600, # assumed length when probing fails
+                "paths": {} # per watch path: {"weight": 1.0, "max_concurrent": 0}
+            },
+            "upload": {
+                "dir": "/workspace/uploads", # not watched: uploads are enqueued directly
+                "expire_seconds": 86400 # unfinished resumable uploads idle this long are removed
+            },
+            "worker": {
+                "concurrency": 1, # number of jobs transcribed in parallel; 0 = only remote worker nodes transcribe
+                "mode": "thread", # or "process": model replicas in worker processes
+                "replicas": 0, # process mode only, 0 = one replica per worker
+                "cpu_threads": 0, # per-job threads, 0 = split cores across workers
+                "shutdown_timeout": 30
             }
         }
 
@@ -57,4 +150,5 @@ class ConfigManager:
         except Exception as e:
             app_logger.error(f"Failed to save config: {e}")
 
-config = ConfigManager()
+# Global config, read from config/config.yaml on first use
+config = Lazy(ConfigManager)
@@ -0,0 +1,51 @@
+import asyncio
+import threading
+from typing import Optional
+from utils.logger import app_logger
+
+class EventBroker:
+    """Fans job events out from worker threads to asyncio subscribers (SSE streams).
+
+    Workers call publish() from any thread; each subscriber owns a bounded
+    asyncio.Queue on the event loop it subscribed from. A subscriber that falls
+    too far behind loses events rather than blocking transcription.
+    """
+
+    def __init__(self, max_queue: int = 1000):
+        self.max_queue = max_queue
+        self._subscribers = {}  # job_id (None = all jobs) -> list of (loop, queue)
+        self._lock = threading.Lock()
+
+    def subscribe(self, job_id: Optional[str] = None) -> asyncio.Queue:
+        q = asyncio.Queue(maxsize=self.max_queue)
+        with self._lock:
+            self._subscribers.setdefault(job_id, []).append((asyncio.get_running_loop(), q))
+        return q
+
+    def unsubscribe(self, job_id: Optional[str], q: asyncio.Queue):
+        with self._lock:
+            subs = self._subscribers.get(job_id, [])
+            self._subscribers[job_id] = [s for s in subs if s[1] is not q]
+            if not self._subscribers[job_id]:
+                del self._subscribers[job_id]
+
+    def publish(self, job_id: str, event: dict):
+        event = dict(event, job_id=job_id)
+        with self._lock:
+            targets = self._subscribers.get(job_id, []) + self._subscribers.get(None, [])
+        for loop, q in targets:
+            try:
+                loop.call_soon_threadsafe(self._offer, q, event)
+            except RuntimeError:
+                # Event loop already closed (shutdown in progress)
+                pass
+
+    @staticmethod
+    def _offer(q: asyncio.Queue, event: dict):
+        try:
+            q.put_nowait(event)
+        except asyncio.QueueFull:
+            app_logger.warning(f"Event subscriber lagging, dropped {event.get('type')} event for job {event.get('job_id')}")
+
+# Global event broker
+events = EventBroker()
@@ -0,0 +1,82 @@
+import asyncio
+from storage.db import db
+from config.manager import config
+from utils.lazy import Lazy
+from utils.logger import app_logger
+from utils.metrics import metrics
+
+class JobFeed:
+    """Shares one poll of the jobs change feed between all /jobs/feed streams.
+
+    While anyone is subscribed, one task on the event loop checks the job
+    version every poll_interval (a single-row read) and, when it moved, reads
+    the delta once and fans the same message out to every subscriber, so the
+    cost per change does not grow with the number of open dashboards.
+
+    Subscribers receive (since, version, data) tuples: the delta from version
+    since up to version, JSON-encoded. A subscriber that falls max_queue
+    messages behind is dropped with a None; its client reconnects from the
+    last version it saw.
+    """
+
+    def __init__(self, poll_interval: float = 0.5, max_changes: int = 500, max_queue: int = 100):
+        self.poll_interval = poll_interval
+        self.max_changes = max_changes
+        self.max_queue = max_queue
+        self._subscribers = set()
+        self._task = None
+
+    def subscribe(self) -> asyncio.Queue:
+        q = asyncio.Queue(maxsize=self.max_queue)
+        self._subscribers.add(q)
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+        return q
+
+    def unsubscribe(self, q: asyncio.Queue):
+        self._subscribers.discard(q)
+
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    async def _run(self):
+        try:
+            version = await asyncio.to_thread(db.job_version)
+            while self._subscribers:
+                await asyncio.sleep(self.poll_interval)
+                try:
+                    if await asyncio.to_thread(db.job_version) == version:
+                        continue
+                    changes = await asyncio.to_thread(db.list_job_changes, version, self.max_changes)
+                except Exception as e:
+                    app_logger.error(f"Job feed poll failed: {e}")
+                    continue
+                # A delta cut at max_changes continues on the next poll
+                message = (version, changes.version, changes.model_dump_json())
+                version = changes.version
+                for q in list(self._subscribers):
+                    self._offer(q, message)
+        finally:
+            self._task = None
+
+    def _offer(self, q: asyncio.Queue, message: tuple):
+        try:
+            q.put_nowait(message)
+        except asyncio.QueueFull:
+            app_logger.warning("Job feed subscriber lagging, closing its stream")
+            self._subscribers.discard(q)
+            q.get_nowait()
+            q.put_nowait(None)
+
+def _create_feed() -> JobFeed:
+    feed_conf = config.get("feed", {})
+    return JobFeed(
+        poll_interval=feed_conf.get("poll_interval", 0.5),
+        max_changes=feed_conf.get("max_changes", 500),
+        max_queue=feed_conf.get("max_queue", 100)
+    )
+
+# Global job feed
+job_feed = Lazy(_create_feed)
+
+metrics.gauge("whisperwatch_feed_subscribers", "Open /jobs/feed streams.", callback=lambda: job_feed.subscriber_count())
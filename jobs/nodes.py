@@ -0,0 +1,140 @@
+import re
+import threading
+import time
+from storage.db import db
+from utils.metrics import metrics
+
+# The service's own worker pool; remote nodes report under the id they lease jobs with
+LOCAL_NODE = "local"
+NODE_ID = re.compile(r"^[\w.-]{1,64}$")
+# Lease owner prefix of remote nodes; local owners are "<host>:<instance>" (see JobManager)
+REMOTE_OWNER_PREFIX = "node/"
+
+def node_owner(node_id: str) -> str:
+    return f"{REMOTE_OWNER_PREFIX}{node_id}"
+
+class NodeRegistry:
+    """Per-node job counts and throughput of the workers taking jobs from this service.
+
+    Counters live in memory and start over with the service; how many leases
+    each node holds right now is read from the jobs table.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._nodes = {}
+
+    def _node(self, node_id: str) -> dict:
+        # Called with the lock held
+        node = self._nodes.get(node_id)
+        if node is None:
+            now = time.time()
+            node = self._nodes[node_id] = {
+                "concurrency": None,
+                "first_seen": now,
+                "last_seen": now,
+                "first_lease": None,
+                "last_finish": None,
+                "leased": 0,
+                "completed": 0,
+                "failed": 0,
+                "lost": 0,
+                "audio_seconds": 0.0,
+                "processing_seconds": 0.0
+            }
+        return node
+
+    def seen(self, node_id: str, concurrency: int = None):
+        with self._lock:
+            node = self._node(node_id)
+            node["last_seen"] = time.time()
+            if concurrency is not None:
+                node["concurrency"] = concurrency
+
+    def leased(self, node_id: str):
+        with self._lock:
+            node = self._node(node_id)
+            node["leased"] += 1
+            node["first_lease"] = node["first_lease"] or time.time()
+
+    def lost(self, node_id: str, count: int = 1):
+        """Leases a node was still heartbeating after they had been re-issued."""
+        with self._lock:
+            self._node(node_id)["lost"] += count
+
+    def finished(self, node_id: str, completed: bool, audio_seconds: float = 0.0, processing_seconds: float = 0.0):
+        with self._lock:
+            node = self._node(node_id)
+            node["last_finish"] = time.time()
+            node["completed" if completed else "failed"] += 1
+            node["audio_seconds"] += audio_seconds or 0.0
+            node["processing_seconds"] += processing_seconds or 0.0
+        NODE_JOBS_TOTAL.inc(node=node_id, status="completed" if completed else "failed")
+        if audio_seconds:
+            NODE_AUDIO_SECONDS.inc(audio_seconds, node=node_id)
+
+    def remote_capacity(self, max_age: float) -> int:
+        """Concurrency announced by remote nodes heard from in the last max_age seconds."""
+        cutoff = time.time() - max_age
+        with self._lock:
+            return sum(
+                node["concurrency"] or 0
+                for node_id, node in self._nodes.items()
+                if node_id != LOCAL_NODE and node["last_seen"] >= cutoff
+            )
+
+    def status(self) -> dict:
+        """Each node's counters and throughput, plus totals over all nodes.
+
+        Throughput is media seconds transcribed per wall-clock second between
+        the node's first lease and its last finished job.
+        """
+        active = {}
+        for owner, count in db.leases_by_owner().items():
+            node_id = owner[len(REMOTE_OWNER_PREFIX):] if owner.startswith(REMOTE_OWNER_PREFIX) else LOCAL_NODE
+            active[node_id] = active.get(node_id, 0) + count
+
+        with self._lock:
+            nodes = {node_id: dict(node) for node_id, node in self._nodes.items()}
+        for node_id in active:
+            nodes.setdefault(node_id, {})
+
+        entries = []
+        for node_id, node in sorted(nodes.items()):
+            entries.append(dict(
+                node,
+                node=node_id,
+                active_leases=active.get(node_id, 0),
+                **self._throughput(node.get("first_lease"), node.get("last_finish"), node.get("completed", 0),
+                                   node.get("audio_seconds", 0.0), node.get("processing_seconds", 0.0))
+            ))
+
+        firsts = [node["first_lease"] for node in nodes.values() if node.get("first_lease")]
+        lasts = [node["last_finish"] for node in nodes.values() if node.get("last_finish")]
+        total = self._throughput(
+            min(firsts) if firsts else None,
+            max(lasts) if lasts else None,
+            sum(node.get("completed", 0) for node in nodes.values()),
+            sum(node.get("audio_seconds", 0.0) for node in nodes.values()),
+            sum(node.get("processing_seconds", 0.0) for node in nodes.values())
+        )
+        total["active_leases"] = sum(active.values())
+        return {"nodes": entries, "total": total}
+
+    @staticmethod
+    def _throughput(first_lease, last_finish, completed: int, audio_seconds: float, processing_seconds: float) -> dict:
+        wall = last_finish - first_lease if first_lease and last_finish and last_finish > first_lease else None
+        return {
+            "completed": completed,
+            "audio_seconds": round(audio_seconds, 1),
+            "wall_seconds": round(wall, 3) if wall else None,
+            "audio_seconds_per_sec": round(audio_seconds / wall, 2) if wall else None,
+            "jobs_per_sec": round(completed / wall, 3) if wall else None,
+            "real_time_factor": round(processing_seconds / audio_seconds, 4) if audio_seconds else None
+        }
+
+# Global node registry
+nodes = NodeRegistry()
+
+NODE_JOBS_TOTAL = metrics.counter("whisperwatch_node_jobs_total", "Jobs finished, by worker node and outcome.", labels=("node", "status"))
+NODE_AUDIO_SECONDS = metrics.counter("whisperwatch_node_audio_seconds_total", "Seconds of media transcribed, by worker node.", labels=("node",))
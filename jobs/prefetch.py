@@ -0,0 +1,193 @@
+import glob
+import multiprocessing
+import os
+import threading
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from config.manager import config
+from jobs.queue import job_manager
+from jobs.scheduler import scheduler
+from storage.db import db
+from storage.models import JobStatus
+from transcription.prefetch import BYTES_PER_SECOND, PrefetchedAudio, decode_to_scratch
+from utils.lazy import Lazy
+from utils.logger import app_logger
+
+class _Entry:
+    def __init__(self, job_id: str, path: str, tier: str, reserved: int, future):
+        self.job_id = job_id
+        self.path = path
+        self.tier = tier
+        self.reserved = reserved
+        self.future = future
+        self.acquired = False
+
+class AudioPrefetcher:
+    """Decodes the next queued jobs in a process pool while the model is busy.
+
+    A planner thread follows the scheduler's order and keeps up to depth jobs
+    decoded ahead. Scratch files go to memory_dir (tmpfs) while memory_bytes
+    allows, then to scratch_dir up to disk_bytes; jobs that fit neither, or
+    whose duration is unknown, are decoded inline by the engine as before.
+    Files are removed when the job finishes or leaves the head of the queue.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._used = {"memory": 0, "disk": 0}
+        # Reentrant: cancelling a future under the lock runs its done callbacks inline
+        self._lock = threading.RLock()
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._executor = None
+        self._thread = None
+
+    def _settings(self) -> dict:
+        return config.get("prefetch", {})
+
+    def _tiers(self):
+        settings = self._settings()
+        return (
+            ("memory", settings.get("memory_dir", "/dev/shm/whisperwatch"), settings.get("memory_bytes", 1024 ** 3)),
+            ("disk", settings.get("scratch_dir", "/tmp/whisperwatch-scratch"), settings.get("disk_bytes", 4 * 1024 ** 3))
+        )
+
+    def start(self):
+        settings = self._settings()
+        for _, directory, budget in self._tiers():
+            if not budget:
+                continue
+            try:
+                os.makedirs(directory, exist_ok=True)
+                # Leftovers of a previous run are never reused
+                for path in glob.glob(os.path.join(directory, "*.f32*")):
+                    os.remove(path)
+            except OSError as e:
+                app_logger.warning(f"Prefetch scratch directory {directory} unavailable: {e}")
+
+        workers = max(1, int(settings.get("workers", 1)))
+        # spawn: see ReplicaPool; decoder processes must not inherit the server's threads
+        self._executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="audio-prefetch", daemon=True)
+        self._thread.start()
+        app_logger.info(f"Audio prefetch started: depth {settings.get('depth', 2)}, {workers} decoder process(es).")
+
+    def stop(self):
+        self._stop.set()
+        self._wakeup.set()
+        if self._thread:
+            self._thread.join()
+        if self._executor:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+        with self._lock:
+            entries = list(self._entries.values())
+            self._entries.clear()
+            self._used = {"memory": 0, "disk": 0}
+        for entry in entries:
+            self._remove_files(entry)
+
+    def acquire(self, job_id: str):
+        """Prefetched audio for a job about to be transcribed, or None to decode inline.
+
+        Waits for a decode that is already running; one that has not started yet
+        is cancelled, since decoding inline is no slower at that point.
+        """
+        with self._lock:
+            entry = self._entries.get(job_id)
+            if entry is None:
+                return None
+            if entry.future.cancel():
+                self._drop(entry)
+                return None
+            entry.acquired = True
+
+        try:
+            samples = entry.future.result()
+        except Exception as e:
+            app_logger.warning(f"Prefetch of job {job_id} failed, decoding inline: {e}")
+            self.release(job_id)
+            return None
+        return PrefetchedAudio(entry.path, samples)
+
+    def release(self, job_id: str):
+        """Frees the scratch file of a finished job."""
+        with self._lock:
+            entry = self._entries.get(job_id)
+            if entry is not None:
+                self._drop(entry)
+        self._wakeup.set()
+
+    def _drop(self, entry: _Entry):
+        # Called with the lock held. A running decode still owns its file, so it is
+        # removed once the decoder returns; the budget is returned at that point too.
+        self._entries.pop(entry.job_id, None)
+        if entry.future.done():
+            self._remove_files(entry)
+            self._used[entry.tier] -= entry.reserved
+        else:
+            entry.future.cancel()
+            entry.future.add_done_callback(lambda _: self._release_late(entry))
+
+    def _release_late(self, entry: _Entry):
+        self._remove_files(entry)
+        with self._lock:
+            self._used[entry.tier] -= entry.reserved
+        self._wakeup.set()
+
+    def _remove_files(self, entry: _Entry):
+        for path in (entry.path, f"{entry.path}.tmp"):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                app_logger.warning(f"Could not remove scratch file {path}: {e}")
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self._plan()
+            except Exception as e:
+                app_logger.error(f"Audio prefetch planning failed: {e}")
+            self._wakeup.wait(config.get("queue", {}).get("poll_interval", 1.0))
+            self._wakeup.clear()
+
+    def _plan(self):
+        depth = int(self._settings().get("depth", 2))
+        order_by, order_params = scheduler.order_by()
+        upcoming = db.list_jobs_by_status(JobStatus.QUEUED, order_by, order_params, limit=depth)
+        # Jobs this process has leased keep their buffers until release()
+        wanted = {job.id for job in upcoming} | set(job_manager.active_job_ids())
+
+        with self._lock:
+            for entry in list(self._entries.values()):
+                if entry.job_id not in wanted and not entry.acquired:
+                    self._drop(entry)
+
+            for job in upcoming:
+                if job.id in self._entries or not job.media_duration:
+                    continue
+                # Header durations can be slightly short; keep a small margin
+                needed = int(job.media_duration * 1.02 * BYTES_PER_SECOND) + BYTES_PER_SECOND
+                tier = self._reserve(needed)
+                if tier is None:
+                    # Later jobs in the order may be smaller, but must not overtake this one
+                    break
+                name, directory = tier
+                path = os.path.join(directory, f"{job.id}-{uuid.uuid4().hex[:8]}.f32")
+                # Summaries carry no filepath
+                future = self._executor.submit(decode_to_scratch, db.get_job(job.id, with_transcript=False).filepath, path)
+                self._entries[job.id] = _Entry(job.id, path, name, needed, future)
+                future.add_done_callback(lambda _: self._wakeup.set())
+
+    def _reserve(self, needed: int):
+        # Called with the lock held
+        for name, directory, budget in self._tiers():
+            if budget and self._used[name] + needed <= budget:
+                self._used[name] += needed
+                return name, directory
+        return None
+
+# Global prefetcher, created on first use and started by the worker pool when prefetch.enabled is set
+prefetcher = Lazy(AudioPrefetcher)
@@ -1,39 +1,209 @@
+import os
+import socket
 import threading
 import time
 import uuid
 from datetime import datetime
-from queue import Queue
 from storage.db import db
-from storage.models import Job, JobStatus
+from storage.cache import cache_key, transcript_cache
+from storage.models import Job, JobStatus, TranscriptResult
+from storage.words import materialize
+from config.manager import config
+from jobs.events import events
+from jobs.scheduler import scheduler
+from transcription.replicas import model_signature
+from transcription.utils import save_transcript
+from utils.files import hash_file, probe_duration
+from utils.lazy import Lazy
 from utils.logger import app_logger
+from utils.metrics import JOBS_TOTAL, metrics
 
 class JobManager:
+    """Job queue persisted in the jobs table.
+
+    Workers lease jobs with claim_next_job(); a heartbeat thread keeps the
+    leases of running jobs alive. If this process dies, its leases expire and
+    the jobs are handed out again, and recover() requeues them at startup.
+    """
+
     def __init__(self):
-        self.job_queue = Queue()
-        self.active_jobs = {} # Map job_id to thread/status if needed for monitoring
+        # Owner ids are "<host>:<instance>"; the host prefix lets startup recovery
+        # recognise leases left behind by an earlier process on this machine
+        self.host_id = socket.gethostname()
+        self.instance_id = f"{self.host_id}:{uuid.uuid4().hex[:8]}"
+        self.active_jobs = {} # Map job_id to the worker thread name processing it
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition()
+        self._stopping = threading.Event()
+        self._heartbeat_stopped = threading.Event()
+        self._heartbeat = None
+
+    def _queue_config(self):
+        queue_conf = config.get("queue", {})
+        return (
+            queue_conf.get("lease_seconds", 60),
+            queue_conf.get("poll_interval", 1.0),
+            queue_conf.get("max_attempts", 3)
+        )
+
+    def start(self):
+        self._stopping.clear()
+        self._heartbeat_stopped.clear()
+        self._heartbeat = threading.Thread(target=self._heartbeat_loop, name="lease-heartbeat", daemon=True)
+        self._heartbeat.start()
+
+    def stop(self):
+        """Wakes every waiting worker; get_next_job() returns None from now on."""
+        self._stopping.set()
+        with self._wakeup:
+            self._wakeup.notify_all()
 
-    def create_job(self, filepath: str) -> Job:
+    def stop_heartbeat(self):
+        """Stops lease renewal, for shutdown once no worker is running a job any more."""
+        self._heartbeat_stopped.set()
+        if self._heartbeat:
+            self._heartbeat.join()
+
+    def recover(self):
+        _, _, max_attempts = self._queue_config()
+        requeued, failed = db.recover_jobs(f"{self.host_id}:", max_attempts)
+        if requeued or failed:
+            app_logger.warning(f"Recovered interrupted jobs: {requeued} requeued, {failed} failed after {max_attempts} attempts")
+
+    def create_job(self, filepath: str, media_hash: str = None, priority: int = 0, source: str = None) -> Job:
         job_id = str(uuid.uuid4())
         filename = filepath.split('/')[-1]
-        
+
+        # Identical media already transcribed with the same model/settings completes right away
+        cached = None
+        if config.get("cache", {}).get("enabled", True):
+            try:
+                media_hash = media_hash or hash_file(filepath)
+                cached = transcript_cache.get(self.cache_key(media_hash))
+            except OSError as e:
+                app_logger.warning(f"Could not hash {filename} for cache lookup: {e}")
+
         job = Job(
             id=job_id,
             filename=filename,
             filepath=filepath,
             created_at=datetime.now(),
-            status=JobStatus.QUEUED
+            # A cache hit is inserted as processing so no worker can lease it meanwhile
+            status=JobStatus.PROCESSING if cached else JobStatus.QUEUED,
+            media_hash=media_hash,
+            priority=priority,
+            # Probed from the container header so the scheduler can run short files first
+            media_duration=None if cached else probe_duration(filepath),
+            source=source
         )
-        
+
         db.add_job(job)
-        self.job_queue.put(job)
+        if cached:
+            self.complete_from_cache(job, cached)
+            return job
+
+        with self._wakeup:
+            self._wakeup.notify()
         app_logger.info(f"Job created and queued: {job_id} for {filename}")
         return job
 
+    def cache_key(self, media_hash: str, signature: str = None) -> str:
+        """Cache key for media under a model (default: the configured one) and the current transcription parameters."""
+        return cache_key(media_hash, signature or model_signature(config.get("model", {})), config.get("transcription", {}))
+
+    def complete_from_cache(self, job: Job, result_data: dict):
+        """Marks a job completed from a cached result and re-emits its output files."""
+        start_time = time.time()
+        # The key includes the configured model's signature, so it stands in for entries stored without one
+        signature = result_data.pop("model", None) or model_signature(config.get("model", {}))
+        output_conf = config.get("output", {})
+        file_stem = os.path.splitext(job.filename)[0]
+        save_transcript(
+            result_data,
+            output_conf.get("output_dir", "/workspace/transcripts"),
+            file_stem,
+            output_conf.get("formats", ["json", "txt"])
+        )
+
+        job.status = JobStatus.COMPLETED
+        job.result = TranscriptResult(**materialize(result_data))
+        job.processing_time = time.time() - start_time
+        job.model_used = signature
+        db.update_job_status(job.id, JobStatus.COMPLETED, result=result_data, processing_time=job.processing_time,
+                             model_used=signature)
+        db.update_job_progress(job.id, 1.0)
+        events.publish(job.id, {"type": "status", "status": JobStatus.COMPLETED.value, "progress": 1.0})
+        JOBS_TOTAL.inc(status="cached")
+        app_logger.info(f"Job {job.id} for {job.filename} completed from transcript cache")
+
+    def claim_job(self, owner: str = None):
+        """Leases the next job in scheduled order to owner (default: this process), or returns None.
+
+        Jobs whose lease expired because their worker stopped heartbeating are
+        handed out again here, to whichever worker asks first.
+        """
+        lease_seconds, _, max_attempts = self._queue_config()
+        order_by, order_params = scheduler.order_by()
+        job = db.claim_next_job(
+            owner or self.instance_id,
+            lease_seconds,
+            max_attempts,
+            order_by=order_by,
+            order_params=order_params,
+            excluded_sources=scheduler.excluded_sources()
+        )
+        if job and job.attempts > 1:
+            app_logger.warning(f"Job {job.id} re-issued to {owner or self.instance_id} (attempt {job.attempts})")
+        return job
+
+    def renew_lease(self, job_id: str, owner: str) -> bool:
+        lease_seconds, _, _ = self._queue_config()
+        return db.renew_lease(job_id, owner, lease_seconds)
+
     def get_next_job(self):
-        return self.job_queue.get()
+        """Blocks until a job is leased to the calling worker, or returns None on shutdown."""
+        _, poll_interval, _ = self._queue_config()
+        while not self._stopping.is_set():
+            job = self.claim_job()
+            if job:
+                with self._lock:
+                    self.active_jobs[job.id] = threading.current_thread().name
+                return job
+            # Woken early by create_job(); the timeout also picks up expired leases
+            with self._wakeup:
+                self._wakeup.wait(poll_interval)
+        return None
+
+    def mark_done(self, job: Job):
+        with self._lock:
+            self.active_jobs.pop(job.id, None)
+
+    def active_job_ids(self):
+        with self._lock:
+            return list(self.active_jobs)
+
+    def _heartbeat_loop(self):
+        while not self._heartbeat_stopped.is_set():
+            lease_seconds, _, _ = self._queue_config()
+            job_ids = self.active_job_ids()
+            # Keep renewing during shutdown while workers finish their current jobs
+            if self._stopping.is_set() and not job_ids:
+                break
+            try:
+                db.renew_leases(job_ids, self.instance_id, lease_seconds)
+            except Exception as e:
+                app_logger.error(f"Lease heartbeat failed: {e}")
+            self._heartbeat_stopped.wait(lease_seconds / 3)
 
-    def mark_done(self):
-        self.job_queue.task_done()
+# Global Job Queue, created on first use
+job_manager = Lazy(JobManager)
 
-# Global Job Queue
-job_manager = JobManager()
+metrics.gauge(
+    "whisperwatch_jobs", "Jobs in the database, by status.", labels=("status",),
+    callback=lambda: {(status,): count for status, count in db.count_jobs_by_status().items()}
+)
+metrics.gauge(
+    "whisperwatch_queue_depth", "Jobs waiting to be leased.",
+    callback=lambda: db.count_jobs_by_status().get(JobStatus.QUEUED.value, 0)
+)
+metrics.gauge("whisperwatch_active_workers", "Workers of this process currently running a job.", callback=lambda: len(job_manager.active_job_ids()) if job_manager.created else 0)
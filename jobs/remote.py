@@ -0,0 +1,298 @@
+import json
+import os
+import shutil
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from typing import Optional
+from config.manager import config
+from storage.transcripts import encode_transcript
+from transcription.engine import engine as default_engine
+from utils.logger import app_logger
+
+class LeaseLost(Exception):
+    """The service no longer holds the job for this node: its lease expired and was re-issued, or it finished."""
+
+class NodeClient:
+    """Client for the /api/nodes lease API of a WhisperWatch service."""
+
+    def __init__(self, server_url: str, node_id: str, token: str = None, timeout: float = 30):
+        self.server_url = server_url.rstrip("/")
+        self.node_id = node_id
+        self.token = token
+        self.timeout = timeout
+        self._base = f"{self.server_url}/api/nodes/{urllib.parse.quote(node_id)}"
+
+    def _open(self, method: str, path: str = "", body=None, content_type: str = "application/json"):
+        headers = {}
+        if body is not None:
+            if content_type == "application/json":
+                body = json.dumps(body).encode("utf-8")
+            headers["Content-Type"] = content_type
+        if self.token:
+            headers["Authorization"] = f"Bearer {self.token}"
+        request = urllib.request.Request(self._base + path, data=body, method=method, headers=headers)
+        try:
+            return urllib.request.urlopen(request, timeout=self.timeout)
+        except urllib.error.HTTPError as e:
+            if e.code == 409:
+                raise LeaseLost(e.read().decode("utf-8", "replace")) from None
+            raise
+
+    def _call(self, method: str, path: str = "", body=None, content_type: str = "application/json") -> Optional[dict]:
+        with self._open(method, path, body, content_type) as response:
+            payload = response.read()
+        return json.loads(payload) if payload else None
+
+    def register(self, concurrency: int) -> dict:
+        """Announces the node; returns the service's lease settings, model and transcription settings."""
+        return self._call("POST", "", {"concurrency": concurrency})
+
+    def lease(self) -> Optional[dict]:
+        """{"job": ..., "settings": ...} for the next job, or None when nothing is queued."""
+        return self._call("POST", "/leases")
+
+    def heartbeat(self, job_ids: list) -> dict:
+        return self._call("POST", "/heartbeat", {"job_ids": job_ids})
+
+    def download(self, job_id: str, path: str):
+        with self._open("GET", f"/leases/{job_id}/media") as response, open(path, "wb") as f:
+            shutil.copyfileobj(response, f, 1024 * 1024)
+
+    def progress(self, job_id: str, progress: Optional[float], segments: list):
+        self._call("POST", f"/leases/{job_id}/progress", {"progress": progress, "segments": segments})
+
+    def complete(self, job_id: str, result: dict) -> dict:
+        # Same compact encoding the database stores, so word timestamps travel as typed arrays
+        return self._call("POST", f"/leases/{job_id}/result", encode_transcript(result), "application/octet-stream")
+
+    def fail(self, job_id: str, error: str, processing_time: float) -> dict:
+        return self._call("POST", f"/leases/{job_id}/failure", {"error": error, "processing_time": processing_time})
+
+class ProgressForwarder:
+    """Sends a remote job's streamed segments and progress to the service, at most one post per interval.
+
+    Once the lease is lost the next callback raises LeaseLost, which aborts
+    the transcription so the node can take a new lease instead of finishing
+    a result that would be dropped. A failed post only costs live viewers
+    some segments; the final result carries all of them.
+    """
+
+    def __init__(self, client: NodeClient, job_id: str, lost: threading.Event, interval: float = 1.0):
+        self.client = client
+        self.job_id = job_id
+        self.lost = lost
+        self.interval = interval
+        self._progress = None
+        self._segments = []
+        self._last_post = time.time()
+
+    def on_segment(self, seg):
+        self._check()
+        self._segments.append({"start": seg["start"], "end": seg["end"], "text": seg["text"]})
+        self._post()
+
+    def on_progress(self, fraction: float):
+        self._check()
+        self._progress = fraction
+        self._post()
+
+    def _check(self):
+        if self.lost.is_set():
+            raise LeaseLost(self.job_id)
+
+    def _post(self):
+        now = time.time()
+        if now - self._last_post < self.interval:
+            return
+        self._last_post = now
+        segments, self._segments = self._segments, []
+        try:
+            self.client.progress(self.job_id, self._progress, segments)
+        except LeaseLost:
+            self.lost.set()
+            raise
+        except Exception as e:
+            app_logger.warning(f"Progress post for job {self.job_id} failed: {e}")
+
+class RemoteWorker:
+    """Worker node: leases jobs from a WhisperWatch service over HTTP and transcribes them here.
+
+    Each of `concurrency` threads leases a job, reads its media from the path
+    the service reported when that file is visible here (shared storage) or
+    downloads it, transcribes it with the service's model and settings, and
+    posts the result; the service writes the outputs and the database row. A
+    heartbeat thread renews the leases of running jobs. If the node dies its
+    leases expire and the service hands the jobs to another worker.
+
+    media is "auto" (shared path if it exists with the right size, else
+    download), "shared" or "download".
+    """
+
+    def __init__(self, client: NodeClient, concurrency: int = 1, media: str = "auto",
+                 download_dir: str = "/tmp/whisperwatch-node", progress_interval: float = 1.0, engine=None):
+        self.client = client
+        self.concurrency = max(1, concurrency)
+        self.media = media
+        self.download_dir = download_dir
+        self.progress_interval = progress_interval
+        self.engine = engine or default_engine
+        self.settings = {}
+        self.threads = []
+        self._active = {} # job_id -> Event set when the lease is lost
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._heartbeat = None
+
+    def start(self):
+        """Registers with the service (waiting until it is reachable), loads the model and starts the threads."""
+        settings = self._register()
+        if settings is None or self._stopping.is_set():
+            return
+        self.settings = settings
+        os.makedirs(self.download_dir, exist_ok=True)
+        self.engine.preload(self._model_config(self.settings))
+
+        self._heartbeat = threading.Thread(target=self._heartbeat_loop, name="node-heartbeat", daemon=True)
+        self._heartbeat.start()
+        for i in range(self.concurrency):
+            t = threading.Thread(target=self._worker_loop, name=f"node-worker-{i}", daemon=True)
+            t.start()
+            self.threads.append(t)
+        app_logger.info(f"Worker node {self.client.node_id} started with {self.concurrency} worker(s) against {self.client.server_url}.")
+
+    def stop(self, timeout: float = None):
+        """Lets each worker finish its current job; nothing new is leased."""
+        self._stopping.set()
+        deadline = time.time() + timeout if timeout is not None else None
+        for t in self.threads:
+            t.join(max(0, deadline - time.time()) if deadline is not None else None)
+            if t.is_alive():
+                app_logger.warning(f"{t.name} did not finish its current job before shutdown timeout.")
+        self.threads = [t for t in self.threads if t.is_alive()]
+        app_logger.info(f"Worker node {self.client.node_id} stopped.")
+
+    def _register(self) -> Optional[dict]:
+        delay = 1.0
+        while not self._stopping.is_set():
+            try:
+                return self.client.register(self.concurrency)
+            except urllib.error.HTTPError:
+                raise
+            except OSError as e:
+                app_logger.warning(f"Service at {self.client.server_url} not reachable ({e}); retrying in {delay:.0f}s")
+                self._stopping.wait(delay)
+                delay = min(delay * 2, 30)
+        return None
+
+    def _model_config(self, settings: dict) -> dict:
+        model_config = dict(config.get("model", {}))
+        if settings.get("model"):
+            model_config["name"] = settings["model"]
+        return model_config
+
+    def _worker_loop(self):
+        while not self._stopping.is_set():
+            try:
+                lease = self.client.lease()
+            except Exception as e:
+                app_logger.error(f"Lease request failed: {e}")
+                lease = None
+            if lease is None:
+                self._stopping.wait(self.settings.get("poll_interval", 1.0))
+                continue
+            self.settings = lease["settings"]
+            self.run_job(lease["job"], lease["settings"])
+
+    def run_job(self, job: dict, settings: dict):
+        job_id = job["id"]
+        lost = threading.Event()
+        with self._lock:
+            self._active[job_id] = lost
+        start_time = time.time()
+        timings = {}
+        downloaded = None
+        try:
+            fetch_start = time.perf_counter()
+            path = self._media_path(job)
+            if path != job["filepath"]:
+                downloaded = path
+                timings["download"] = time.perf_counter() - fetch_start
+
+            forwarder = ProgressForwarder(self.client, job_id, lost, self.progress_interval)
+            result = self.engine.transcribe(
+                path,
+                on_segment=forwarder.on_segment,
+                on_progress=forwarder.on_progress,
+                model_config=self._model_config(settings),
+                trans_config=settings["transcription"]
+            )
+            for stage, seconds in result.pop("timings", {}).items():
+                timings[stage] = timings.get(stage, 0.0) + seconds
+            result["timings"] = timings
+            result["processing_time"] = time.time() - start_time
+            self._retry(self.client.complete, job_id, result)
+            app_logger.info(f"Job {job_id} completed in {time.time() - start_time:.2f}s")
+        except LeaseLost:
+            app_logger.warning(f"Lease on job {job_id} was lost; it was re-issued, so this node stopped working on it")
+        except Exception as e:
+            app_logger.error(f"Job {job_id} failed: {e}")
+            try:
+                self._retry(self.client.fail, job_id, str(e), time.time() - start_time)
+            except Exception as post_error:
+                # The lease runs out and the service re-issues the job
+                app_logger.error(f"Could not report failure of job {job_id}: {post_error}")
+        finally:
+            with self._lock:
+                self._active.pop(job_id, None)
+            if downloaded:
+                try:
+                    os.remove(downloaded)
+                except OSError:
+                    pass
+
+    def _media_path(self, job: dict) -> str:
+        filepath = job["filepath"]
+        if self.media != "download" and os.path.isfile(filepath) and job.get("size") in (None, os.path.getsize(filepath)):
+            return filepath
+        if self.media == "shared":
+            raise FileNotFoundError(f"File not found on shared storage: {filepath}")
+        path = os.path.join(self.download_dir, job["id"] + os.path.splitext(job["filename"])[1])
+        self._retry(self.client.download, job["id"], path)
+        return path
+
+    def _retry(self, call, *args):
+        """Retries through connection errors for up to one lease period; the lease is gone after that anyway."""
+        deadline = time.time() + self.settings.get("lease_seconds", 60)
+        delay = 1.0
+        while True:
+            try:
+                return call(*args)
+            except urllib.error.HTTPError:
+                raise
+            except OSError as e:
+                if time.time() + delay > deadline:
+                    raise
+                app_logger.warning(f"Service at {self.client.server_url} not reachable ({e}); retrying in {delay:.0f}s")
+                time.sleep(delay)
+                delay = min(delay * 2, 10)
+
+    def _heartbeat_loop(self):
+        while True:
+            with self._lock:
+                job_ids = list(self._active)
+            # Keep renewing during shutdown while workers finish their current jobs
+            if self._stopping.is_set() and not job_ids:
+                break
+            if job_ids:
+                try:
+                    for job_id in self.client.heartbeat(job_ids)["lost"]:
+                        with self._lock:
+                            lost = self._active.get(job_id)
+                        if lost:
+                            lost.set()
+                except Exception as e:
+                    app_logger.error(f"Lease heartbeat failed: {e}")
+            time.sleep(self.settings.get("lease_seconds", 60) / 3)
@@ -0,0 +1,100 @@
+import heapq
+import os
+import time
+from datetime import datetime
+from typing import List
+from config.manager import config
+from storage.db import db
+from storage.models import JobStatus, QueueEntry
+
+class Scheduler:
+    """Decides which queued job a worker leases next.
+
+    The "sjf" policy runs the shortest media first, so a 4-hour file does not
+    hold up hundreds of short clips. Every second spent waiting removes
+    aging_factor seconds from a job's effective length, so long jobs still
+    start eventually. Each priority point is worth priority_seconds of head
+    start, and per-watch-path weights scale effective length (weight 2 = treated
+    as half as long). Per-path max_concurrent caps how many jobs from one path
+    run at once. The "fifo" policy keeps plain arrival order.
+    """
+
+    def _settings(self) -> dict:
+        return config.get("scheduler", {})
+
+    def _path_settings(self) -> dict:
+        return {os.path.normpath(path): conf or {} for path, conf in self._settings().get("paths", {}).items()}
+
+    def order_by(self, now: float = None):
+        """SQL ORDER BY clause and its parameters for the configured policy."""
+        settings = self._settings()
+        if settings.get("policy", "sjf") == "fifo":
+            return "created_at, id", ()
+
+        now = now or time.time()
+        weights = [(path, float(conf.get("weight", 1.0))) for path, conf in self._path_settings().items()]
+        weight_sql = "1.0"
+        weight_params = []
+        if weights:
+            weight_sql = "CASE source " + " ".join("WHEN ? THEN ?" for _ in weights) + " ELSE 1.0 END"
+            for path, weight in weights:
+                weight_params.extend([path, weight])
+
+        order = (
+            f"COALESCE(media_duration, ?) / ({weight_sql})"
+            " - (? - COALESCE(enqueued_at, ?)) * ?"
+            " - COALESCE(priority, 0) * ?"
+            ", created_at, id"
+        )
+        params = (
+            settings.get("default_duration", 600),
+            *weight_params,
+            now, now, settings.get("aging_factor", 1.0),
+            settings.get("priority_seconds", 3600)
+        )
+        return order, params
+
+    def excluded_sources(self) -> List[str]:
+        """Watch paths that already run as many jobs as their max_concurrent quota allows."""
+        quotas = {path: conf.get("max_concurrent", 0) for path, conf in self._path_settings().items()}
+        quotas = {path: limit for path, limit in quotas.items() if limit}
+        if not quotas:
+            return []
+        running = db.processing_counts_by_source()
+        return [path for path, limit in quotas.items() if running.get(path, 0) >= limit]
+
+    def estimate(self, workers: int) -> List[QueueEntry]:
+        """Queued jobs in scheduled order with estimated start and completion times.
+
+        Simulates the workers draining the queue at the recent real-time factor.
+        Quotas and future aging are not modelled, so this is a snapshot estimate.
+        """
+        now = time.time()
+        default_duration = self._settings().get("default_duration", 600)
+        rtf = db.recent_real_time_factor() or self._settings().get("default_rtf", 0.5)
+
+        # Worker availability: running jobs finish after their remaining media is decoded
+        free_at = []
+        for job in db.list_jobs_by_status(JobStatus.PROCESSING):
+            remaining = (job.media_duration or default_duration) * (1 - (job.progress or 0.0))
+            free_at.append(now + remaining * rtf)
+        free_at = sorted(free_at)[:workers]
+        free_at += [now] * (workers - len(free_at))
+        heapq.heapify(free_at)
+
+        order, params = self.order_by(now)
+        entries = []
+        for position, job in enumerate(db.list_jobs_by_status(JobStatus.QUEUED, order, params), 1):
+            start = max(now, heapq.heappop(free_at))
+            finish = start + (job.media_duration or default_duration) * rtf
+            heapq.heappush(free_at, finish)
+            entries.append(QueueEntry(
+                job=job,
+                position=position,
+                estimated_start=datetime.fromtimestamp(start),
+                estimated_completion=datetime.fromtimestamp(finish)
+            ))
+        return entries
+
+# Global scheduler
+scheduler = Scheduler()
@@ -1,81 +1,306 @@
 import threading
 import time
 import os
+from jobs.events import events
+from jobs.nodes import LOCAL_NODE, nodes
+from jobs.prefetch import prefetcher
 from jobs.queue import job_manager
 from transcription.engine import engine
-from transcription.utils import save_transcript
+from transcription.replicas import model_signature
+from transcription.utils import TranscriptWriter, save_transcript
 from storage.db import db
-from storage.models import JobStatus, TranscriptResult
+from storage.cache import transcript_cache
+from storage.models import JobStatus
+from storage.words import materialize
 from config.manager import config
 from utils.logger import app_logger
+from utils.metrics import AUDIO_SECONDS_TOTAL, JOBS_TOTAL, REAL_TIME_FACTOR, RESUMED_AUDIO_SECONDS, StageTimer, metrics, observe_stages
 
 def worker_loop():
-    app_logger.info("Worker thread started.")
+    app_logger.info(f"Worker thread started: {threading.current_thread().name}")
     while True:
         try:
             job = job_manager.get_next_job()
             if job is None:
+                # Queue stopped by WorkerPool.stop()
                 break
             
-            process_job(job)
-            job_manager.mark_done()
+            try:
+                process_job(job)
+            finally:
+                job_manager.mark_done(job)
         except Exception as e:
             app_logger.error(f"Worker loop error: {e}")
+    app_logger.info(f"Worker thread stopped: {threading.current_thread().name}")
+
+class Checkpointer:
+    """Saves the segments a job has streamed so far, at most every interval seconds, so a restart resumes after them.
+
+    The checkpoint's offset is the end of the last segment. It is keyed on
+    the model that produced the segments, which start() reports, and only
+    resumes a job whose media, configured model and transcription settings
+    are still the ones it was taken with.
+    """
+
+    def __init__(self, job, interval: float = 60.0, timings: dict = None):
+        self.job_id = job.id
+        self.interval = interval
+        self.timings = timings if timings is not None else {}
+        self.media = job.media_hash or job.filepath
+        self.settings = None
+        self.language = None
+        self.segments = []
+        self._last_save = time.time()
+
+    def resume(self):
+        """The job's checkpoint if it can be resumed, or None; its segments start the next checkpoint."""
+        checkpoint = db.get_checkpoint(self.job_id)
+        if checkpoint is None:
+            return None
+        if checkpoint["settings"] != job_manager.cache_key(self.media):
+            app_logger.info(f"Discarding checkpoint of job {self.job_id}: media, model or settings changed")
+            db.delete_checkpoint(self.job_id)
+            return None
+        self.settings = checkpoint["settings"]
+        self.language = checkpoint.get("language")
+        self.segments = materialize(checkpoint)["segments"]
+        return checkpoint
+
+    def start(self, signature: str, language: str):
+        """Engine on_start callback: the model and language the segments that follow come from."""
+        self.settings = job_manager.cache_key(self.media, signature)
+        self.language = language or self.language
+
+    def add(self, seg):
+        self.segments.append({"start": seg["start"], "end": seg["end"], "text": seg["text"], "words": seg.get("words")})
+        if time.time() - self._last_save >= self.interval:
+            self.save()
+
+    def save(self):
+        self._last_save = time.time()
+        offset = self.segments[-1]["end"]
+        try:
+            with StageTimer("db_update", self.timings):
+                db.save_checkpoint(self.job_id, offset, self.settings,
+                                   {"segments": self.segments, "language": self.language, "duration": offset})
+        except Exception as e:
+            # Only costs a longer redo after a crash
+            app_logger.warning(f"Checkpoint of job {self.job_id} failed: {e}")
+
+class ProgressReporter:
+    """Forwards streamed segments and progress of one job to the event broker and the job row.
+
+    DB progress writes are throttled; SSE subscribers get every segment.
+    """
+
+    def __init__(self, job_id: str, writer: TranscriptWriter = None, interval: float = 1.0, timings: dict = None,
+                 checkpointer: Checkpointer = None):
+        self.job_id = job_id
+        self.writer = writer
+        self.interval = interval
+        self.timings = timings if timings is not None else {}
+        self.checkpointer = checkpointer
+        self._last_write = 0.0
+
+    def on_segment(self, seg):
+        self._emit(seg)
+        if self.checkpointer:
+            self.checkpointer.add(seg)
+
+    def replay(self, segments):
+        """Re-emits segments restored from a checkpoint; this run's output files and subscribers have not seen them."""
+        for seg in segments:
+            self._emit(seg)
+
+    def _emit(self, seg):
+        if self.writer:
+            with StageTimer("output", self.timings):
+                self.writer.write_segment(seg)
+        events.publish(self.job_id, {"type": "segment", "start": seg["start"], "end": seg["end"], "text": seg["text"]})
+
+    def on_progress(self, fraction: float):
+        events.publish(self.job_id, {"type": "progress", "progress": fraction})
+        now = time.time()
+        if now - self._last_write >= self.interval:
+            self._last_write = now
+            db.update_job_progress(self.job_id, fraction)
 
 def process_job(job):
     app_logger.info(f"Processing job {job.id}: {job.filename}")
-    db.update_job_status(job.id, JobStatus.PROCESSING)
-    
     start_time = time.time()
+    timings = {"queue_wait": max(0.0, start_time - job.created_at.timestamp())}
+    with StageTimer("db_update", timings):
+        db.update_job_status(job.id, JobStatus.PROCESSING)
+    events.publish(job.id, {"type": "status", "status": JobStatus.PROCESSING.value})
+
+    writer = None
     try:
         if not os.path.exists(job.filepath):
              raise FileNotFoundError(f"File not found: {job.filepath}")
 
-        # Run transcription
-        result_data = engine.transcribe(job.filepath)
-        
-        # Save Outputs
+        # An identical file may have finished while this one was waiting in the queue
+        if job.media_hash:
+            cached = transcript_cache.get(job_manager.cache_key(job.media_hash), count_miss=False)
+            if cached:
+                job_manager.complete_from_cache(job, cached)
+                return
+
         output_conf = config.get("output", {})
         output_dir = output_conf.get("output_dir", "/workspace/transcripts")
         formats = output_conf.get("formats", ["json", "txt"])
         
         # Use filename without extension for output
         file_stem = os.path.splitext(job.filename)[0]
-        save_transcript(result_data, output_dir, file_stem, formats)
-        
-        processing_time = time.time() - start_time
-        
-        # Convert to Pydantic model for consistency with DB but retain dict structure for saving
-        # Simplification: we might just store the dict in DB as JSON
-        
-        # Update DB
-        # Construct TranscriptResult object
-        trans_result = TranscriptResult(
-            segments=result_data['segments'],
-            language=result_data['language'],
-            duration=result_data['duration']
+
+        # Long files checkpoint their segments; after a crash or restart they resume at the last one
+        checkpointer = None
+        resume = None
+        checkpoint_conf = config.get("checkpoint", {})
+        if checkpoint_conf.get("enabled", True) and (job.media_duration or float("inf")) >= checkpoint_conf.get("min_duration", 600):
+            checkpointer = Checkpointer(job, checkpoint_conf.get("interval", 60), timings)
+            resume = checkpointer.resume()
+
+        # Streaming mode appends TXT/SRT/VTT/JSONL as segments are decoded
+        if output_conf.get("streaming", False):
+            writer = TranscriptWriter(output_dir, file_stem, formats)
+        reporter = ProgressReporter(job.id, writer, timings=timings, checkpointer=checkpointer)
+        if resume:
+            RESUMED_AUDIO_SECONDS.inc(resume["offset"])
+            reporter.replay(checkpointer.segments)
+
+        # Run transcription, on audio the prefetch stage already decoded if there is any
+        result_data = engine.transcribe(
+            job.filepath,
+            on_segment=reporter.on_segment,
+            on_progress=reporter.on_progress,
+            prefetched=prefetcher.acquire(job.id),
+            resume=resume,
+            on_start=checkpointer.start if checkpointer else None
         )
+        for stage, seconds in result_data.pop("timings", {}).items():
+            timings[stage] = timings.get(stage, 0.0) + seconds
+        # The model that actually ran, which differs from the configured one while a switch is loading
+        signature = result_data.pop("model", None) or model_signature(config.get("model", {}))
+
+        if writer:
+            with StageTimer("output", timings):
+                writer.close()
+            writer = None
+            # Only the whole-document formats are left to write
+            formats = [fmt for fmt in formats if fmt not in TranscriptWriter.STREAMING_FORMATS]
+        complete_job(job, result_data, signature, start_time, timings, formats)
+
+    except Exception as e:
+        if writer:
+            writer.abort()
+        fail_job(job, e, start_time)
+    finally:
+        prefetcher.release(job.id)
+        observe_stages(timings)
 
+def complete_job(job, result_data: dict, signature: str, start_time: float, timings: dict, formats: list,
+                 node: str = LOCAL_NODE):
+    """Writes a transcribed job's outputs, stores its result and updates the cache and metrics.
+
+    Used for jobs run by the local workers and for results posted by remote
+    worker nodes (node is the node's id).
+    """
+    output_dir = config.get("output", {}).get("output_dir", "/workspace/transcripts")
+    with StageTimer("output", timings):
+        save_transcript(result_data, output_dir, os.path.splitext(job.filename)[0], formats)
+
+    processing_time = time.time() - start_time
+
+    # The result dict goes to the DB as is: word timestamps stay in their
+    # WordTable and are encoded without building a model per word
+    with StageTimer("db_update", timings):
         db.update_job_status(
-            job.id, 
-            JobStatus.COMPLETED, 
-            result=trans_result,
+            job.id,
+            JobStatus.COMPLETED,
+            result=result_data,
             processing_time=processing_time,
-            error=None
+            error=None,
+            model_used=signature
         )
-        app_logger.info(f"Job {job.id} completed in {processing_time:.2f}s")
-        
-    except Exception as e:
-        app_logger.error(f"Job {job.id} failed: {e}")
-        processing_time = time.time() - start_time
-        db.update_job_status(
-            job.id, 
-            JobStatus.FAILED, 
-            error=str(e),
-            processing_time=processing_time
+        db.update_job_progress(job.id, 1.0)
+    events.publish(job.id, {"type": "status", "status": JobStatus.COMPLETED.value, "progress": 1.0})
+    app_logger.info(f"Job {job.id} completed in {processing_time:.2f}s" + (f" on node {node}" if node != LOCAL_NODE else ""))
+
+    JOBS_TOTAL.inc(status=JobStatus.COMPLETED.value)
+    if result_data['duration']:
+        AUDIO_SECONDS_TOTAL.inc(result_data['duration'], model=signature)
+        REAL_TIME_FACTOR.observe(processing_time / result_data['duration'], model=signature)
+    nodes.finished(node, True, result_data['duration'], processing_time)
+
+    if job.media_hash and config.get("cache", {}).get("enabled", True):
+        transcript_cache.put(
+            job_manager.cache_key(job.media_hash, signature),
+            job.media_hash,
+            signature,
+            result_data
         )
 
-def start_worker():
-    t = threading.Thread(target=worker_loop, daemon=True)
-    t.start()
-    return t
+def fail_job(job, error, start_time: float, node: str = LOCAL_NODE):
+    app_logger.error(f"Job {job.id} failed" + (f" on node {node}" if node != LOCAL_NODE else "") + f": {error}")
+    processing_time = time.time() - start_time
+    db.update_job_status(
+        job.id,
+        JobStatus.FAILED,
+        error=str(error),
+        processing_time=processing_time
+    )
+    events.publish(job.id, {"type": "status", "status": JobStatus.FAILED.value, "error": str(error)})
+    JOBS_TOTAL.inc(status=JobStatus.FAILED.value)
+    nodes.finished(node, False, processing_seconds=processing_time)
+
+WORKERS = metrics.gauge("whisperwatch_workers", "Worker threads in the pool.")
+
+class WorkerPool:
+    """Fixed set of worker threads leasing jobs from the persistent JobManager queue.
+
+    The engine is loaded with a num_workers slot per worker (plus those for
+    chunks and live captions) and a matching cpu_threads slice (see
+    transcription.engine.thread_budget), so concurrent jobs run side by side
+    on the same model instead of competing for all cores.
+    """
+
+    def __init__(self, size: int):
+        # 0 leaves transcription to remote worker nodes (see jobs.remote)
+        self.size = max(0, size)
+        self.threads = []
+
+    def start(self):
+        job_manager.start()
+        if config.get("prefetch", {}).get("enabled", False):
+            prefetcher.start()
+        for i in range(self.size):
+            # daemon=True is only a backstop: stop() drains the pool, but a job that is
+            # still mid-transcription after the timeout must not block interpreter exit
+            t = threading.Thread(target=worker_loop, name=f"worker-{i}", daemon=True)
+            t.start()
+            self.threads.append(t)
+        WORKERS.set(self.size)
+        app_logger.info(f"Worker pool started with {self.size} worker(s).")
+
+    def stop(self, timeout: float = None):
+        # Each worker finishes its current job, then gets None from the queue and exits.
+        # Jobs still queued stay in the database for the next start.
+        job_manager.stop()
+
+        deadline = time.time() + timeout if timeout is not None else None
+        for t in self.threads:
+            remaining = max(0, deadline - time.time()) if deadline is not None else None
+            t.join(remaining)
+            if t.is_alive():
+                app_logger.warning(f"{t.name} did not finish its current job before shutdown timeout.")
+        self.threads = [t for t in self.threads if t.is_alive()]
+        WORKERS.set(len(self.threads))
+        if prefetcher.created:
+            prefetcher.stop()
+        app_logger.info("Worker pool stopped.")
+
+def start_workers():
+    worker_config = config.get("worker", {})
+    pool = WorkerPool(int(worker_config.get("concurrency", 1)))
+    pool.start()
+    return pool
@@ -1,27 +1,47 @@
 import uvicorn
 from api.main import app
 from watcher.observer import WatcherService
-from jobs.worker import start_worker
+from jobs.queue import job_manager
+from jobs.worker import start_workers
+from transcription.engine import engine
+from transcription.live import live_streams
+from storage.cache import transcript_cache
+from storage.db import db
+from config.manager import config
 from utils.logger import app_logger
 import contextlib
+import time
 
-# Global service instances
-watcher_service = WatcherService()
-worker_thread = None
+# Global service instances, created in lifespan() so importing this module starts nothing
+watcher_service = None
+worker_pool = None
 
 @contextlib.asynccontextmanager
 async def lifespan(app):
-    # Startup
+    # Startup: the application is wired here, in dependency order; the model
+    # loads in the background so the API serves right away (see /api/ready)
+    start = time.perf_counter()
     app_logger.info("Starting WhisperWatch services...")
-    
+
+    # Opens and migrates the database before anything queries it
+    db.resolve()
+    transcript_cache.resolve()
+    engine.resolve()
+
     # Start Watcher
+    global watcher_service, worker_pool
+    watcher_service = WatcherService()
     watcher_service.start()
     
-    # Start Worker
-    # We keep a reference but threading.Thread object isn't easily "stopped" 
-    # unless we implemented a stop flag in the loop (which we did implicitly with None check but we need to send it)
-    global worker_thread
-    worker_thread = start_worker()
+    # Requeue jobs a previous run left queued or processing, before workers start leasing
+    job_manager.recover()
+
+    # Start Worker pool (size from config["worker"]["concurrency"])
+    worker_pool = start_workers()
+
+    if config.get("model_cache", {}).get("preload_on_startup", True):
+        engine.preload()
+    app_logger.info(f"WhisperWatch services started in {time.perf_counter() - start:.2f}s.")
     
     yield
     
@@ -29,8 +49,18 @@ async def lifespan(app):
     app_logger.info("Shutting down WhisperWatch services...")
     watcher_service.stop()
     
-    # In a real app we would signal the worker to stop cleanly
-    # For now we rely on daemon=True in worker.py
+    # Stop accepting new work first (watcher), then let workers finish in-flight jobs
+    worker_pool.stop(timeout=config.get("worker", {}).get("shutdown_timeout", 30))
+    # Only wait on replica processes if no job is still running in them
+    engine.shutdown(wait=not worker_pool.threads)
+    if live_streams.created:
+        live_streams.shutdown()
+    if worker_pool.threads:
+        # Their status and progress writes would fail against a closed writer; the process exits around them
+        app_logger.warning(f"{len(worker_pool.threads)} worker(s) still running a job; leaving the database open.")
+    else:
+        job_manager.stop_heartbeat()
+        db.close()
 
 # Assign lifespan to app (Monkey patch or re-init? Re-init is better but app is already creating in api/main)
 # Better to do this in api/main.py or just import app here and assign lifespan.
@@ -0,0 +1,57 @@
+"""Remote worker node: transcribes jobs leased from a WhisperWatch service over HTTP.
+
+    python -m service.node --server http://whisperwatch:8000 --concurrency 2
+
+The node reads its own config/config.yaml for the device, compute type and
+worker settings (worker.concurrency, worker.mode, cpu_threads) and the
+cluster section; the model name and transcription settings come from the
+service. Several nodes, also several on one host, can pull from one service.
+"""
+import argparse
+import os
+import signal
+import socket
+import threading
+from config.manager import config
+from jobs.remote import NodeClient, RemoteWorker
+from transcription.engine import engine
+from utils.logger import app_logger
+
+def main():
+    cluster_conf = config.get("cluster", {})
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--server", default=cluster_conf.get("server_url", "http://localhost:8000"))
+    parser.add_argument("--node-id", default=cluster_conf.get("node_id") or f"{socket.gethostname()}-{os.getpid()}")
+    parser.add_argument("--concurrency", type=int, default=None, help="default: worker.concurrency")
+    parser.add_argument("--media", choices=("auto", "shared", "download"), default=cluster_conf.get("media", "auto"))
+    args = parser.parse_args()
+
+    if args.concurrency is not None:
+        # In memory only: the thread budget and replica count read worker.concurrency
+        config._config.setdefault("worker", {})["concurrency"] = args.concurrency
+    concurrency = max(1, int(config.get("worker", {}).get("concurrency", 1)))
+
+    client = NodeClient(args.server, args.node_id, token=cluster_conf.get("token") or None)
+    node = RemoteWorker(
+        client,
+        concurrency=concurrency,
+        media=args.media,
+        download_dir=cluster_conf.get("download_dir", "/tmp/whisperwatch-node"),
+        progress_interval=cluster_conf.get("progress_interval", 1.0)
+    )
+
+    stopping = threading.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: stopping.set())
+
+    engine.resolve()
+    # Registration waits for the service to come up; a signal meanwhile stops the node before it starts
+    threading.Thread(target=node.start, name="node-start", daemon=True).start()
+    stopping.wait()
+
+    app_logger.info("Shutting down worker node...")
+    node.stop(timeout=config.get("worker", {}).get("shutdown_timeout", 30))
+    engine.shutdown(wait=not node.threads)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+import json
+import hashlib
+import threading
+from datetime import datetime
+from typing import Optional
+from config.manager import config
+from storage.sqlite import get_pool
+from storage.transcripts import decode_transcript, encode_transcript
+from utils.lazy import Lazy
+from utils.logger import app_logger
+
+def cache_key(media_hash: str, model_signature: str, trans_config: dict) -> str:
+    """Identifies a transcript by media content, model and transcription parameters."""
+    params = json.dumps(trans_config, sort_keys=True, default=str)
+    return hashlib.sha256(f"{media_hash}|{model_signature}|{params}".encode("utf-8")).hexdigest()
+
+class TranscriptCache:
+    """Content-addressed store of finished transcription results.
+
+    Entries are evicted least-recently-used first once either max_entries or
+    max_bytes (size of the stored encoding, see storage.transcripts) is exceeded.
+    """
+
+    def __init__(self, db_path: str = "whisperwatch.db", max_entries: int = 1000, max_bytes: int = 512 * 1024 * 1024):
+        self.db_path = db_path
+        self._pool = get_pool(db_path)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._init_db()
+
+    def _init_db(self):
+        with self._pool.transaction() as c:
+            c.execute('''
+                CREATE TABLE IF NOT EXISTS transcript_cache (
+                    key TEXT PRIMARY KEY,
+                    media_hash TEXT,
+                    model_signature TEXT,
+                    result TEXT,
+                    size INTEGER,
+                    created_at TEXT,
+                    last_used TEXT
+                )
+            ''')
+            c.execute("CREATE INDEX IF NOT EXISTS idx_transcript_cache_last_used ON transcript_cache (last_used)")
+
+    def get(self, key: str, count_miss: bool = True) -> Optional[dict]:
+        """The cached result, with the signature of the model that produced it under "model", or None."""
+        try:
+            with self._pool.transaction() as c:
+                c.execute("SELECT result, model_signature FROM transcript_cache WHERE key = ?", (key,))
+                row = c.fetchone()
+                if row:
+                    c.execute("UPDATE transcript_cache SET last_used = ? WHERE key = ?", (datetime.now().isoformat(), key))
+        except Exception as e:
+            app_logger.error(f"Cache Error get: {e}")
+            row = None
+
+        with self._lock:
+            if row:
+                self.hits += 1
+            elif count_miss:
+                self.misses += 1
+        if not row:
+            return None
+        # Columnar form; entries written by older versions are JSON text
+        return dict(decode_transcript(row[0]), model=row[1])
+
+    def put(self, key: str, media_hash: str, model_signature: str, result_data: dict):
+        payload = encode_transcript(result_data)
+        now = datetime.now().isoformat()
+        try:
+            with self._pool.transaction() as c:
+                c.execute('''
+                    INSERT OR REPLACE INTO transcript_cache (key, media_hash, model_signature, result, size, created_at, last_used)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                ''', (key, media_hash, model_signature, payload, len(payload), now, now))
+                self._evict(c)
+        except Exception as e:
+            app_logger.error(f"Cache Error put: {e}")
+
+    def _evict(self, cursor):
+        cursor.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM transcript_cache")
+        count, total = cursor.fetchone()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+
+        cursor.execute("SELECT key, size FROM transcript_cache ORDER BY last_used ASC")
+        evicted = []
+        for key, size in cursor.fetchall():
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            evicted.append((key,))
+            count -= 1
+            total -= size
+        cursor.executemany("DELETE FROM transcript_cache WHERE key = ?", evicted)
+        app_logger.info(f"Transcript cache evicted {len(evicted)} entries.")
+
+    def stats(self) -> dict:
+        c = self._pool.connection().execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM transcript_cache")
+        count, total = c.fetchone()
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        lookups = hits + misses
+        return {
+            "entries": count,
+            "bytes": total,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / lookups if lookups else 0.0
+        }
+
+def _create_cache() -> TranscriptCache:
+    cache_config = config.get("cache", {})
+    return TranscriptCache(
+        max_entries=cache_config.get("max_entries", 1000),
+        max_bytes=cache_config.get("max_bytes", 512 * 1024 * 1024)
+    )
+
+# Global transcript cache, created on first use
+transcript_cache = Lazy(_create_cache)
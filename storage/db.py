@@ -1,102 +1,620 @@
-import sqlite3
+import base64
 import json
-from typing import List, Optional
+import sqlite3
+import time
+from typing import List, Optional, Tuple
 from datetime import datetime
-from storage.models import Job, JobStatus
+from storage.models import Job, JobChanges, JobStatus, JobSummary, SearchHit
+from storage.sqlite import GroupCommitter, get_pool
+from storage.transcripts import decode_transcript, encode_transcript, transcript_digest
+from storage.words import materialize
+from utils.lazy import Lazy
 from utils.logger import app_logger
 
 class JobDatabase:
+    SUMMARY_COLUMNS = ("id, filename, created_at, status, error, model_used, processing_time, progress, "
+                       "language, duration, priority, media_duration, source, version")
+    # Changes to these bump a job's version; lease renewals and the transcript body do not
+    VERSIONED_COLUMNS = ("filename, status, error, model_used, processing_time, progress, "
+                         "language, duration, priority, media_duration, source")
+
     def __init__(self, db_path: str = "whisperwatch.db"):
         self.db_path = db_path
+        self._pool = get_pool(db_path)
         self._init_db()
+        # Status transitions and progress from all workers are committed together
+        self._writer = GroupCommitter(self._pool)
 
     def _init_db(self):
-        conn = sqlite3.connect(self.db_path)
-        c = conn.cursor()
+        with self._pool.transaction() as c:
+            c.execute('''
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    filename TEXT,
+                    filepath TEXT,
+                    created_at TEXT,
+                    status TEXT,
+                    error TEXT,
+                    model_used TEXT,
+                    processing_time REAL,
+                    progress REAL,
+                    media_hash TEXT
+                )
+            ''')
+            self._add_missing_columns(c, "jobs", {
+                "progress": "REAL",
+                "media_hash": "TEXT",
+                "language": "TEXT",
+                "duration": "REAL",
+                "lease_owner": "TEXT",
+                "lease_expires": "REAL",
+                "attempts": "INTEGER DEFAULT 0",
+                "priority": "INTEGER DEFAULT 0",
+                "media_duration": "REAL",
+                "source": "TEXT",
+                "enqueued_at": "REAL",
+                "version": "INTEGER"
+            })
+            # Transcript bodies live apart from job metadata so list queries never touch them.
+            # result holds the storage.transcripts encoding (legacy rows: JSON text),
+            # digest its sha256, which serves as the ETag of rendered formats
+            c.execute('''
+                CREATE TABLE IF NOT EXISTS transcripts (
+                    job_id TEXT PRIMARY KEY,
+                    result TEXT,
+                    digest TEXT
+                )
+            ''')
+            self._add_missing_columns(c, "transcripts", {"digest": "TEXT"})
+            # Move results written by older versions out of the jobs table
+            c.execute("PRAGMA table_info(jobs)")
+            if "result" in {row[1] for row in c.fetchall()}:
+                c.execute("INSERT OR IGNORE INTO transcripts (job_id, result) SELECT id, result FROM jobs WHERE result IS NOT NULL")
+                c.execute('''
+                    UPDATE jobs SET language = json_extract(result, '$.language'), duration = json_extract(result, '$.duration')
+                    WHERE result IS NOT NULL
+                ''')
+                c.execute("UPDATE jobs SET result = NULL WHERE result IS NOT NULL")
+
+            # (created_at, id) backs keyset pagination; (status, created_at, id) the filtered variant
+            c.execute("CREATE INDEX IF NOT EXISTS idx_jobs_created_at ON jobs (created_at, id)")
+            c.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, created_at, id)")
+            c.execute("CREATE INDEX IF NOT EXISTS idx_jobs_lease ON jobs (status, lease_expires)")
+            c.execute("CREATE INDEX IF NOT EXISTS idx_jobs_filepath ON jobs (filepath)")
+            self._init_versions(c)
+            # Segments a running job has transcribed so far (storage.transcripts encoding), so a restart
+            # resumes at offset seconds; settings identifies the media, model and parameters they came from
+            c.execute('''
+                CREATE TABLE IF NOT EXISTS checkpoints (
+                    job_id TEXT PRIMARY KEY,
+                    offset REAL NOT NULL,
+                    settings TEXT,
+                    result BLOB NOT NULL,
+                    updated_at REAL
+                )
+            ''')
+
+            # One row per transcript segment, indexed by the transcript_search FTS5 table
+            # (external content, kept in sync by the triggers below)
+            c.execute('''
+                CREATE TABLE IF NOT EXISTS transcript_segments (
+                    id INTEGER PRIMARY KEY,
+                    job_id TEXT,
+                    seq INTEGER,
+                    start_time REAL,
+                    end_time REAL,
+                    text TEXT
+                )
+            ''')
+            c.execute("CREATE INDEX IF NOT EXISTS idx_transcript_segments_job ON transcript_segments (job_id)")
+            try:
+                c.execute('''
+                    CREATE VIRTUAL TABLE IF NOT EXISTS transcript_search USING fts5(
+                        text, content='transcript_segments', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+                    )
+                ''')
+                self.search_enabled = True
+            except sqlite3.OperationalError as e:
+                app_logger.warning(f"Full-text search disabled, SQLite lacks FTS5: {e}")
+                self.search_enabled = False
+                return
+            c.execute('''
+                CREATE TRIGGER IF NOT EXISTS transcript_segments_ai AFTER INSERT ON transcript_segments BEGIN
+                    INSERT INTO transcript_search (rowid, text) VALUES (new.id, new.text);
+                END
+            ''')
+            c.execute('''
+                CREATE TRIGGER IF NOT EXISTS transcript_segments_ad AFTER DELETE ON transcript_segments BEGIN
+                    INSERT INTO transcript_search (transcript_search, rowid, text) VALUES ('delete', old.id, old.text);
+                END
+            ''')
+
+    def _init_versions(self, c):
+        """Change feed: every insert, summary change or delete of a job takes the next value of one sequence.
+
+        Triggers assign it, so no write path can forget to; each row gets its
+        own version even when one statement changes many. Deleted jobs leave
+        a tombstone carrying the version of their deletion.
+        """
+        c.execute("CREATE TABLE IF NOT EXISTS job_version (value INTEGER NOT NULL)")
+        c.execute("CREATE TABLE IF NOT EXISTS deleted_jobs (id TEXT PRIMARY KEY, version INTEGER)")
+        if c.execute("SELECT COUNT(*) FROM job_version").fetchone()[0] == 0:
+            # Rows written by older versions get one in insertion order
+            c.execute("UPDATE jobs SET version = rowid WHERE version IS NULL")
+            c.execute("INSERT INTO job_version (value) SELECT COALESCE(MAX(version), 0) FROM jobs")
+        c.execute("CREATE INDEX IF NOT EXISTS idx_jobs_version ON jobs (version)")
+        c.execute("CREATE INDEX IF NOT EXISTS idx_deleted_jobs_version ON deleted_jobs (version)")
         c.execute('''
-            CREATE TABLE IF NOT EXISTS jobs (
-                id TEXT PRIMARY KEY,
-                filename TEXT,
-                filepath TEXT,
-                created_at TEXT,
-                status TEXT,
-                result TEXT,
-                error TEXT,
-                model_used TEXT,
-                processing_time REAL
-            )
+            CREATE TRIGGER IF NOT EXISTS jobs_version_ai AFTER INSERT ON jobs BEGIN
+                UPDATE job_version SET value = value + 1;
+                UPDATE jobs SET version = (SELECT value FROM job_version) WHERE rowid = new.rowid;
+            END
+        ''')
+        c.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS jobs_version_au AFTER UPDATE OF {self.VERSIONED_COLUMNS} ON jobs BEGIN
+                UPDATE job_version SET value = value + 1;
+                UPDATE jobs SET version = (SELECT value FROM job_version) WHERE rowid = new.rowid;
+            END
+        ''')
+        c.execute('''
+            CREATE TRIGGER IF NOT EXISTS jobs_version_ad AFTER DELETE ON jobs BEGIN
+                UPDATE job_version SET value = value + 1;
+                INSERT OR REPLACE INTO deleted_jobs (id, version) VALUES (old.id, (SELECT value FROM job_version));
+            END
         ''')
-        conn.commit()
-        conn.close()
+
+    def _add_missing_columns(self, cursor, table: str, columns: dict):
+        """Brings databases created by older versions up to the current schema."""
+        cursor.execute(f"PRAGMA table_info({table})")
+        existing = {row[1] for row in cursor.fetchall()}
+        for name, col_type in columns.items():
+            if name not in existing:
+                cursor.execute(f"ALTER TABLE {table} ADD COLUMN {name} {col_type}")
 
     def add_job(self, job: Job):
+        statements = [('''
+            INSERT INTO jobs (id, filename, filepath, created_at, status, error, model_used, processing_time, media_hash,
+                              language, duration, priority, media_duration, source, enqueued_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (
+            job.id,
+            job.filename,
+            job.filepath,
+            job.created_at.isoformat(),
+            job.status.value,
+            job.error,
+            job.model_used,
+            job.processing_time,
+            job.media_hash,
+            job.result.language if job.result else None,
+            job.result.duration if job.result else None,
+            job.priority,
+            job.media_duration,
+            job.source,
+            job.created_at.timestamp()
+        ))]
+        if job.result:
+            statements.extend(self._transcript_statements(job.id, job.result))
         try:
-            conn = sqlite3.connect(self.db_path)
-            c = conn.cursor()
-            c.execute('''
-                INSERT INTO jobs (id, filename, filepath, created_at, status, result, error, model_used, processing_time)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                job.id, 
-                job.filename, 
-                job.filepath, 
-                job.created_at.isoformat(), 
-                job.status.value, 
-                job.result.model_dump_json() if job.result else None, 
-                job.error,
-                job.model_used,
-                job.processing_time
-            ))
-            conn.commit()
-            conn.close()
+            self._writer.submit_many(statements)
         except Exception as e:
             app_logger.error(f"DB Error add_job: {e}")
+            raise
 
-    def update_job_status(self, job_id: str, status: JobStatus, result=None, error=None, processing_time=None):
+    def update_job_status(self, job_id: str, status: JobStatus, result=None, error=None, processing_time=None,
+                          model_used: str = None):
+        updates = ["status = ?"]
+        params = [status.value]
+        statements = []
+
+        if result:
+            # result is a TranscriptResult or a result dict (nested or columnar words)
+            if hasattr(result, "model_dump"):
+                result = result.model_dump()
+            updates.append("language = ?")
+            params.append(result["language"])
+            updates.append("duration = ?")
+            params.append(result["duration"])
+            statements.extend(self._transcript_statements(job_id, result))
+        if error:
+            updates.append("error = ?")
+            params.append(str(error))
+        if processing_time:
+            updates.append("processing_time = ?")
+            params.append(processing_time)
+        if model_used:
+            updates.append("model_used = ?")
+            params.append(model_used)
+        if status in (JobStatus.COMPLETED, JobStatus.FAILED):
+            # Finished jobs release their queue lease and drop their checkpoint
+            updates.append("lease_owner = NULL")
+            updates.append("lease_expires = NULL")
+            statements.append(("DELETE FROM checkpoints WHERE job_id = ?", (job_id,)))
+
+        params.append(job_id)
+
+        query = f"UPDATE jobs SET {', '.join(updates)} WHERE id = ?"
+        # Transcript and status land in the same commit, so a completed job always has its result
+        statements.insert(0, (query, params))
         try:
-            conn = sqlite3.connect(self.db_path)
-            c = conn.cursor()
-            updates = ["status = ?"]
-            params = [status.value]
-
-            if result:
-                updates.append("result =?")
-                params.append(result.model_dump_json())
-            if error:
-                updates.append("error = ?")
-                params.append(str(error))
-            if processing_time:
-                updates.append("processing_time = ?")
-                params.append(processing_time)
-            
-            params.append(job_id)
-            
-            query = f"UPDATE jobs SET {', '.join(updates)} WHERE id = ?"
-            c.execute(query, params)
-            conn.commit()
-            conn.close()
+            self._writer.submit_many(statements)
         except Exception as e:
             app_logger.error(f"DB Error update_job_status: {e}")
+            raise
+
+    def update_job_progress(self, job_id: str, progress: float):
+        # Fire-and-forget: progress is advisory, the worker should not wait on the commit
+        self._writer.submit("UPDATE jobs SET progress = ? WHERE id = ?", (progress, job_id), wait=False)
+
+    def claim_next_job(self, owner: str, lease_seconds: float, max_attempts: int, order_by: str = "created_at, id",
+                       order_params: tuple = (), excluded_sources: List[str] = ()) -> Optional[Job]:
+        """Atomically leases the first runnable job, in order_by order, to owner.
+
+        Runnable means queued, or processing under a lease that has expired
+        because its worker stopped heartbeating. Jobs from excluded_sources
+        (sources at their concurrency quota) are skipped. Expired jobs that
+        already used max_attempts are failed in the same transaction, as
+        recover_jobs() does at startup, instead of being handed out again.
+        """
+        now = time.time()
+        source_filter = ""
+        if excluded_sources:
+            source_filter = f"AND (source IS NULL OR source NOT IN ({', '.join('?' * len(excluded_sources))}))"
+        with self._pool.transaction() as c:
+            c.execute('''
+                UPDATE jobs SET status = ?, error = ?, lease_owner = NULL, lease_expires = NULL
+                WHERE status = ? AND lease_expires < ? AND COALESCE(attempts, 0) >= ?
+                RETURNING id
+            ''', (JobStatus.FAILED.value, f"Abandoned after {max_attempts} attempts",
+                  JobStatus.PROCESSING.value, now, max_attempts))
+            abandoned = [row['id'] for row in c.fetchall()]
+            if abandoned:
+                c.execute(f"DELETE FROM checkpoints WHERE job_id IN ({', '.join('?' * len(abandoned))})", abandoned)
+            c.execute(f'''
+                UPDATE jobs SET status = ?, lease_owner = ?, lease_expires = ?, attempts = COALESCE(attempts, 0) + 1
+                WHERE id = (
+                    SELECT id FROM jobs
+                    WHERE (status = ? OR (status = ? AND lease_expires < ? AND COALESCE(attempts, 0) < ?)) {source_filter}
+                    ORDER BY {order_by} LIMIT 1
+                )
+                RETURNING id
+            ''', (
+                JobStatus.PROCESSING.value, owner, now + lease_seconds,
+                JobStatus.QUEUED.value, JobStatus.PROCESSING.value, now, max_attempts,
+                *excluded_sources, *order_params
+            ))
+            row = c.fetchone()
+        if abandoned:
+            app_logger.warning(f"Failed {len(abandoned)} job(s) whose lease expired after {max_attempts} attempts")
+        return self.get_job(row['id'], with_transcript=False) if row else None
+
+    def processing_counts_by_source(self) -> dict:
+        rows = self._pool.connection().execute(
+            "SELECT source, COUNT(*) AS n FROM jobs WHERE status = ? AND source IS NOT NULL GROUP BY source",
+            (JobStatus.PROCESSING.value,)
+        ).fetchall()
+        return {row['source']: row['n'] for row in rows}
+
+    def list_jobs_by_status(self, status: JobStatus, order_by: str = "created_at, id", order_params: tuple = (), limit: int = -1) -> List[JobSummary]:
+        rows = self._pool.connection().execute(f'''
+            SELECT {self.SUMMARY_COLUMNS} FROM jobs WHERE status = ? ORDER BY {order_by} LIMIT ?
+        ''', (status.value, *order_params, limit)).fetchall()
+        return [self._row_to_summary(row) for row in rows]
+
+    def count_jobs_by_status(self) -> dict:
+        rows = self._pool.connection().execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status").fetchall()
+        return {row['status']: row['n'] for row in rows}
+
+    def filepaths_with_jobs(self, filepaths: List[str]) -> set:
+        """Subset of filepaths that already have a job row, in any status."""
+        known = set()
+        conn = self._pool.connection()
+        # Stay well below SQLite's bound-parameter limit
+        for i in range(0, len(filepaths), 500):
+            batch = filepaths[i:i + 500]
+            rows = conn.execute(
+                f"SELECT DISTINCT filepath FROM jobs WHERE filepath IN ({', '.join('?' * len(batch))})", batch
+            ).fetchall()
+            known.update(row['filepath'] for row in rows)
+        return known
+
+    def recent_real_time_factor(self, sample: int = 50) -> Optional[float]:
+        """Mean processing_time / media duration over the latest completed jobs."""
+        row = self._pool.connection().execute('''
+            SELECT AVG(processing_time / duration) AS rtf FROM (
+                SELECT processing_time, duration FROM jobs
+                WHERE status = ? AND duration > 0 AND processing_time > 0
+                ORDER BY created_at DESC LIMIT ?
+            )
+        ''', (JobStatus.COMPLETED.value, sample)).fetchone()
+        return row['rtf']
+
+    def renew_leases(self, job_ids: List[str], owner: str, lease_seconds: float):
+        if not job_ids:
+            return
+        expires = time.time() + lease_seconds
+        self._writer.submit_many([
+            ("UPDATE jobs SET lease_expires = ? WHERE id = ? AND lease_owner = ?", (expires, job_id, owner))
+            for job_id in job_ids
+        ])
+
+    def renew_lease(self, job_id: str, owner: str, lease_seconds: float) -> bool:
+        """Extends one job's lease if owner still holds it.
+
+        False once the job finished or its lease expired and was re-issued to
+        another worker; committed before returning, so a True result fences
+        the job for lease_seconds.
+        """
+        with self._pool.transaction() as c:
+            c.execute(
+                "UPDATE jobs SET lease_expires = ? WHERE id = ? AND lease_owner = ? AND status = ?",
+                (time.time() + lease_seconds, job_id, owner, JobStatus.PROCESSING.value)
+            )
+            return c.rowcount == 1
+
+    def leases_by_owner(self) -> dict:
+        """Unexpired leases held by each lease owner."""
+        rows = self._pool.connection().execute(
+            "SELECT lease_owner, COUNT(*) AS n FROM jobs WHERE status = ? AND lease_expires >= ? GROUP BY lease_owner",
+            (JobStatus.PROCESSING.value, time.time())
+        ).fetchall()
+        return {row['lease_owner']: row['n'] for row in rows}
 
-    def get_job(self, job_id: str) -> Optional[Job]:
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        c = conn.cursor()
-        c.execute("SELECT * FROM jobs WHERE id = ?", (job_id,))
+    def recover_jobs(self, owner_prefix: str, max_attempts: int) -> Tuple[int, int]:
+        """Startup recovery of jobs left processing by a previous run.
+
+        Jobs leased by owner_prefix (this host's earlier process), with an expired
+        lease, or with no lease at all (written before leases existed) go back to
+        queued; their original created_at keeps them in order, and a checkpoint
+        lets them resume where they stopped. Jobs that already
+        used max_attempts are failed instead of crashing the service again.
+        Returns (requeued, failed).
+        """
+        # A prefix compare rather than LIKE, where _ and % in a hostname would match other hosts' leases
+        abandoned = "status = ? AND (substr(lease_owner, 1, length(?)) = ? OR lease_expires IS NULL OR lease_expires < ?)"
+        params = (JobStatus.PROCESSING.value, owner_prefix, owner_prefix, time.time())
+        with self._pool.transaction() as c:
+            c.execute(f'''
+                UPDATE jobs SET status = ?, error = ?, lease_owner = NULL, lease_expires = NULL
+                WHERE {abandoned} AND COALESCE(attempts, 0) >= ?
+            ''', (JobStatus.FAILED.value, f"Abandoned after {max_attempts} attempts", *params, max_attempts))
+            failed = c.rowcount
+            c.execute(f'''
+                UPDATE jobs SET status = ?, progress = NULL, lease_owner = NULL, lease_expires = NULL
+                WHERE {abandoned}
+            ''', (JobStatus.QUEUED.value, *params))
+            requeued = c.rowcount
+            # Requeued jobs keep their checkpoints to resume from; jobs that just failed drop theirs
+            c.execute(
+                "DELETE FROM checkpoints WHERE job_id NOT IN (SELECT id FROM jobs WHERE status IN (?, ?))",
+                (JobStatus.QUEUED.value, JobStatus.PROCESSING.value)
+            )
+        return requeued, failed
+
+    def _transcript_statements(self, job_id: str, result) -> list:
+        """Stores a job's transcript and (re)indexes its segments for search, as one atomic write."""
+        if hasattr(result, "model_dump"):
+            result = result.model_dump()
+        encoded = encode_transcript(result)
+        statements = [(
+            "INSERT OR REPLACE INTO transcripts (job_id, result, digest) VALUES (?, ?, ?)",
+            (job_id, encoded, transcript_digest(encoded))
+        )]
+        if self.search_enabled:
+            statements.extend(self._index_statements(job_id, result["segments"]))
+        return statements
+
+    def _index_statements(self, job_id: str, segments) -> list:
+        # All segments go in with one INSERT ... SELECT over a JSON array instead of a statement per segment
+        rows = json.dumps([[seg["start"], seg["end"], seg["text"].strip()] for seg in segments], ensure_ascii=False)
+        return [
+            ("DELETE FROM transcript_segments WHERE job_id = ?", (job_id,)),
+            ('''
+                INSERT INTO transcript_segments (job_id, seq, start_time, end_time, text)
+                SELECT ?, key, json_extract(value, '$[0]'), json_extract(value, '$[1]'), json_extract(value, '$[2]')
+                FROM json_each(?)
+            ''', (job_id, rows))
+        ]
+
+    def delete_job(self, job_id: str):
+        """Removes a job, its transcript and its search index entries."""
+        statements = [
+            ("DELETE FROM jobs WHERE id = ?", (job_id,)),
+            ("DELETE FROM transcripts WHERE job_id = ?", (job_id,)),
+            ("DELETE FROM checkpoints WHERE job_id = ?", (job_id,))
+        ]
+        if self.search_enabled:
+            statements.append(("DELETE FROM transcript_segments WHERE job_id = ?", (job_id,)))
+        try:
+            self._writer.submit_many(statements)
+        except Exception as e:
+            app_logger.error(f"DB Error delete_job: {e}")
+            raise
+
+    def search(self, query: str, limit: int = 20, offset: int = 0, job_id: Optional[str] = None) -> List[SearchHit]:
+        """Segments matching query, best bm25 rank first.
+
+        Every whitespace-separated term must occur; terms are matched as
+        literal words, so user input never hits FTS5 query syntax.
+        """
+        terms = ['"' + term.replace('"', '""') + '"' for term in query.split()]
+        if not terms or not self.search_enabled:
+            return []
+        job_filter = "AND s.job_id = ?" if job_id else ""
+        params = [" ".join(terms)] + ([job_id] if job_id else []) + [limit, offset]
+        rows = self._pool.connection().execute(f'''
+            SELECT s.job_id, j.filename, s.start_time, s.end_time, s.text,
+                   snippet(transcript_search, 0, '<mark>', '</mark>', '…', 16) AS snippet,
+                   transcript_search.rank AS score
+            FROM transcript_search
+            JOIN transcript_segments s ON s.id = transcript_search.rowid
+            JOIN jobs j ON j.id = s.job_id
+            WHERE transcript_search MATCH ? {job_filter}
+            ORDER BY transcript_search.rank
+            LIMIT ? OFFSET ?
+        ''', params).fetchall()
+        return [
+            SearchHit(
+                job_id=row['job_id'], filename=row['filename'], start=row['start_time'], end=row['end_time'],
+                text=row['text'], snippet=row['snippet'], score=-row['score']
+            )
+            for row in rows
+        ]
+
+    def backfill_search_index(self, rebuild: bool = False, batch_size: int = 100) -> int:
+        """Indexes transcripts that have no search rows yet (all of them with rebuild=True).
+
+        Returns the number of transcripts indexed.
+        """
+        if not self.search_enabled:
+            return 0
+        if rebuild:
+            self._writer.submit("DELETE FROM transcript_segments")
+        conn = self._pool.connection()
+        indexed = 0
+        last_id = ""
+        while True:
+            # Keyset on job_id so transcripts without segments are not picked up again
+            rows = conn.execute('''
+                SELECT job_id, result FROM transcripts
+                WHERE job_id > ? AND job_id NOT IN (SELECT job_id FROM transcript_segments)
+                ORDER BY job_id LIMIT ?
+            ''', (last_id, batch_size)).fetchall()
+            if not rows:
+                break
+            statements = []
+            for row in rows:
+                statements.extend(self._index_statements(row['job_id'], decode_transcript(row['result'])["segments"]))
+            self._writer.submit_many(statements)
+            indexed += len(rows)
+            last_id = rows[-1]['job_id']
+        self._writer.submit("INSERT INTO transcript_search (transcript_search) VALUES ('optimize')")
+        return indexed
+
+    def get_job(self, job_id: str, with_transcript: bool = True) -> Optional[Job]:
+        """Loads a job; with_transcript=False skips reading and decoding its result."""
+        if with_transcript:
+            query = '''
+                SELECT jobs.*, transcripts.result AS transcript
+                FROM jobs LEFT JOIN transcripts ON transcripts.job_id = jobs.id
+                WHERE jobs.id = ?
+            '''
+        else:
+            query = "SELECT jobs.*, NULL AS transcript FROM jobs WHERE id = ?"
+        c = self._pool.connection().execute(query, (job_id,))
         row = c.fetchone()
-        conn.close()
         if row:
             return self._row_to_job(row)
         return None
 
-    def get_all_jobs(self, limit=50) -> List[Job]:
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        c = conn.cursor()
-        c.execute("SELECT * FROM jobs ORDER BY created_at DESC LIMIT ?", (limit,))
-        rows = c.fetchall()
-        conn.close()
-        return [self._row_to_job(row) for row in rows]
+    def get_transcript(self, job_id: str) -> Optional[dict]:
+        """A job's result in the columnar form of storage.words (see materialize())."""
+        c = self._pool.connection().execute("SELECT result FROM transcripts WHERE job_id = ?", (job_id,))
+        row = c.fetchone()
+        return decode_transcript(row['result']) if row else None
+
+    def save_checkpoint(self, job_id: str, offset: float, settings: str, result: dict):
+        """Replaces a job's checkpoint with result, the transcript of its audio up to offset seconds."""
+        try:
+            self._writer.submit(
+                "INSERT OR REPLACE INTO checkpoints (job_id, offset, settings, result, updated_at) VALUES (?, ?, ?, ?, ?)",
+                (job_id, offset, settings, encode_transcript(result), time.time())
+            )
+        except Exception as e:
+            app_logger.error(f"DB Error save_checkpoint: {e}")
+            raise
+
+    def get_checkpoint(self, job_id: str) -> Optional[dict]:
+        """A job's checkpoint: its decoded result plus "offset" and "settings", or None."""
+        row = self._pool.connection().execute(
+            "SELECT offset, settings, result FROM checkpoints WHERE job_id = ?", (job_id,)
+        ).fetchone()
+        if not row:
+            return None
+        return dict(decode_transcript(row['result']), offset=row['offset'], settings=row['settings'])
+
+    def delete_checkpoint(self, job_id: str):
+        self._writer.submit("DELETE FROM checkpoints WHERE job_id = ?", (job_id,))
+
+    def get_transcript_digest(self, job_id: str) -> Optional[str]:
+        """Content hash of a job's transcript without loading it (except for legacy rows)."""
+        row = self._pool.connection().execute(
+            "SELECT digest, CASE WHEN digest IS NULL THEN result END AS result FROM transcripts WHERE job_id = ?", (job_id,)
+        ).fetchone()
+        if not row:
+            return None
+        return row['digest'] or transcript_digest(row['result'])
+
+    def list_job_summaries(self, limit: int = 50, cursor: Optional[str] = None,
+                           status: Optional[JobStatus] = None) -> Tuple[List[JobSummary], Optional[str]]:
+        """Newest-first page of job summaries plus the cursor for the next page.
+
+        Keyset pagination on (created_at, id): each page is an index range scan,
+        so its cost does not grow with the page number or the transcript sizes.
+        """
+        where = []
+        params = []
+        if status:
+            where.append("status = ?")
+            params.append(status.value)
+        if cursor:
+            created_at, job_id = self._decode_cursor(cursor)
+            where.append("(created_at < ? OR (created_at = ? AND id < ?))")
+            params.extend([created_at, created_at, job_id])
+        params.append(limit)
+
+        query = f'''
+            SELECT {self.SUMMARY_COLUMNS}
+            FROM jobs {"WHERE " + " AND ".join(where) if where else ""}
+            ORDER BY created_at DESC, id DESC LIMIT ?
+        '''
+        rows = self._pool.connection().execute(query, params).fetchall()
+        summaries = [self._row_to_summary(row) for row in rows]
+
+        next_cursor = None
+        if len(rows) == limit:
+            next_cursor = self._encode_cursor(rows[-1]['created_at'], rows[-1]['id'])
+        return summaries, next_cursor
+
+    def job_version(self) -> int:
+        """Current change-feed version: the highest version of any job insert, change or delete."""
+        return self._pool.connection().execute("SELECT value FROM job_version").fetchone()['value']
+
+    def list_job_changes(self, since: int, limit: int = 500) -> JobChanges:
+        """Jobs inserted or changed, and ids deleted, after version since, oldest change first.
+
+        At most limit entries; with more=True, ask again from the returned
+        version. Otherwise version is the feed version the delta is complete up to.
+        """
+        current = self.job_version()
+        tombstone_columns = ", ".join(["id"] + ["NULL"] * (self.SUMMARY_COLUMNS.count(",") - 1) + ["version"])
+        rows = self._pool.connection().execute(f'''
+            SELECT {self.SUMMARY_COLUMNS}, 0 AS deleted FROM jobs WHERE version > ?
+            UNION ALL
+            SELECT {tombstone_columns}, 1 AS deleted FROM deleted_jobs WHERE version > ?
+            ORDER BY version LIMIT ?
+        ''', (since, since, limit)).fetchall()
+        more = len(rows) == limit
+        return JobChanges(
+            version=rows[-1]['version'] if more else max([current, since] + [row['version'] for row in rows[-1:]]),
+            jobs=[self._row_to_summary(row) for row in rows if not row['deleted']],
+            deleted=[row['id'] for row in rows if row['deleted']],
+            more=more
+        )
+
+    @staticmethod
+    def _encode_cursor(created_at: str, job_id: str) -> str:
+        return base64.urlsafe_b64encode(f"{created_at}|{job_id}".encode("utf-8")).decode("ascii")
+
+    @staticmethod
+    def _decode_cursor(cursor: str) -> Tuple[str, str]:
+        created_at, job_id = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8").split("|", 1)
+        return created_at, job_id
+
+    def close(self):
+        """Flushes pending writes and closes all pooled connections."""
+        self._writer.close()
+        self._pool.close_all()
 
     def _row_to_job(self, row) -> Job:
         return Job(
@@ -105,11 +623,35 @@ class JobDatabase:
             filepath=row['filepath'],
             created_at=datetime.fromisoformat(row['created_at']),
             status=JobStatus(row['status']),
-            result=json.loads(row['result']) if row['result'] else None,
+            result=materialize(decode_transcript(row['transcript'])) if row['transcript'] else None,
+            error=row['error'],
+            model_used=row['model_used'],
+            processing_time=row['processing_time'],
+            progress=row['progress'],
+            media_hash=row['media_hash'],
+            attempts=row['attempts'] or 0,
+            priority=row['priority'] or 0,
+            media_duration=row['media_duration'],
+            source=row['source']
+        )
+
+    def _row_to_summary(self, row) -> JobSummary:
+        return JobSummary(
+            id=row['id'],
+            filename=row['filename'],
+            created_at=datetime.fromisoformat(row['created_at']),
+            status=JobStatus(row['status']),
             error=row['error'],
             model_used=row['model_used'],
-            processing_time=row['processing_time']
+            processing_time=row['processing_time'],
+            progress=row['progress'],
+            language=row['language'],
+            duration=row['duration'],
+            priority=row['priority'] or 0,
+            media_duration=row['media_duration'],
+            source=row['source'],
+            version=row['version']
         )
 
-# Global DB instance
-db = JobDatabase()
+# Global DB instance, opened (and migrated) on first use
+db = Lazy(JobDatabase)
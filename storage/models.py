@@ -9,15 +9,23 @@ class JobStatus(str, Enum):
     COMPLETED = "completed"
     FAILED = "failed"
 
+class Word(BaseModel):
+    start: float
+    end: float
+    word: str
+    probability: float
+
 class TranscriptionSegment(BaseModel):
     start: float
     end: float
     text: str
+    words: Optional[List[Word]] = None # present with timestamp_granularity "word"
 
 class TranscriptResult(BaseModel):
     segments: List[TranscriptionSegment]
     language: str
     duration: float
+    cascade: Optional[dict] = None # model cascade stats: first-pass model and how much audio was escalated
 
 class Job(BaseModel):
     id: str
@@ -29,3 +37,59 @@ class Job(BaseModel):
     error: Optional[str] = None
     model_used: Optional[str] = None
     processing_time: Optional[float] = None
+    progress: Optional[float] = None # fraction of the media decoded so far
+    media_hash: Optional[str] = None # sha256 of the media file, used by the transcript cache
+    attempts: int = 0 # times the job has been leased to a worker
+    priority: int = 0 # higher runs earlier
+    media_duration: Optional[float] = None # probed at enqueue time, drives scheduling
+    source: Optional[str] = None # watch path the file arrived in, or "upload"
+
+class JobSummary(BaseModel):
+    """Job metadata without the transcript body, for list views."""
+    id: str
+    filename: str
+    created_at: datetime
+    status: JobStatus
+    error: Optional[str] = None
+    model_used: Optional[str] = None
+    processing_time: Optional[float] = None
+    progress: Optional[float] = None
+    language: Optional[str] = None
+    duration: Optional[float] = None
+    priority: int = 0
+    media_duration: Optional[float] = None
+    source: Optional[str] = None
+    version: Optional[int] = None # change-feed version of the job's last insert or change
+
+class JobPage(BaseModel):
+    jobs: List[JobSummary]
+    next_cursor: Optional[str] = None # pass as ?cursor= to fetch the next (older) page
+    version: Optional[int] = None # change-feed version the page reflects; pass as ?since= to /jobs/changes
+
+class JobChanges(BaseModel):
+    """Job summaries changed, and job ids deleted, after a change-feed version."""
+    version: int # pass as ?since= for the next delta
+    jobs: List[JobSummary]
+    deleted: List[str]
+    more: bool = False # the delta was cut at the limit; ask again from version
+
+class SearchHit(BaseModel):
+    """A transcript segment matching a full-text search."""
+    job_id: str
+    filename: str
+    start: float
+    end: float
+    text: str
+    snippet: str # segment text with the matched terms wrapped in <mark></mark>
+    score: float # bm25 relevance, higher is better
+
+class SearchResults(BaseModel):
+    query: str
+    hits: List[SearchHit]
+
+class QueueEntry(BaseModel):
+    """A queued job in scheduled order with its estimated start and completion."""
+    job: JobSummary
+    position: int
+    estimated_start: datetime
+    estimated_completion: datetime
@@ -0,0 +1,30 @@
+"""Backfills the full-text search index from stored transcripts.
+
+New transcripts are indexed when they are saved; this is for transcripts
+written before the index existed, or to rebuild it from scratch:
+
+    python -m storage.reindex [--rebuild]
+
+Run it from the service's working directory (where whisperwatch.db is).
+Prints the number of indexed transcripts as JSON.
+"""
+import argparse
+import json
+import time
+from storage.db import db
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rebuild", action="store_true", help="drop and re-create every index entry")
+    parser.add_argument("--batch-size", type=int, default=100)
+    args = parser.parse_args()
+
+    start = time.time()
+    try:
+        indexed = db.backfill_search_index(rebuild=args.rebuild, batch_size=args.batch_size)
+    finally:
+        db.close()
+    print(json.dumps({"indexed": indexed, "rebuild": args.rebuild, "seconds": round(time.time() - start, 3)}))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+import contextlib
+import queue
+import sqlite3
+import threading
+from utils.logger import app_logger
+
+# Applied to every connection. WAL lets readers (dashboard, API) run concurrently
+# with the single writer; synchronous=NORMAL is crash-safe in WAL mode and only
+# fsyncs on checkpoints instead of on every commit.
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-16384",
+    "PRAGMA mmap_size=134217728",
+)
+
+class ConnectionPool:
+    """One long-lived, pre-configured connection per thread for a database file."""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+
+    def connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # check_same_thread=False only so close_all() can close it; each thread uses its own
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            for pragma in PRAGMAS:
+                conn.execute(pragma)
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    @contextlib.contextmanager
+    def transaction(self):
+        """Yields a cursor; commits on success, rolls back on error."""
+        conn = self.connection()
+        with conn:
+            yield conn.cursor()
+
+    def close_all(self):
+        with self._lock:
+            for conn in self._connections:
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+            self._connections = []
+        self._local = threading.local()
+
+class _PendingWrite:
+    __slots__ = ("statements", "done", "error")
+
+    def __init__(self, statements):
+        self.statements = statements
+        self.done = threading.Event()
+        self.error = None
+
+class GroupCommitter:
+    """Single writer thread that commits statements queued by many threads together.
+
+    While one transaction is being committed, new writes pile up in the queue and
+    are all applied in the next transaction, so N concurrent writers cost roughly
+    one commit instead of N.
+    """
+
+    def __init__(self, pool: ConnectionPool, max_batch: int = 256):
+        self._pool = pool
+        self.max_batch = max_batch
+        self._queue = queue.Queue()
+        self._closed = False
+        # Orders submissions against close(), so nothing is queued behind the stop sentinel
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="db-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, sql: str, params=(), wait: bool = True):
+        """Queues a write. With wait=True, blocks until it is committed and re-raises its error."""
+        self.submit_many([(sql, params)], wait=wait)
+
+    def submit_many(self, statements, wait: bool = True):
+        """Like submit(), for a list of (sql, params) that must be applied atomically.
+
+        Raises RuntimeError once the writer is closed.
+        """
+        item = _PendingWrite(statements)
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Database writer is closed")
+            self._queue.put(item)
+        if wait:
+            item.done.wait()
+            if item.error:
+                raise item.error
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            batch = [item]
+            stop = False
+            while len(batch) < self.max_batch:
+                try:
+                    nxt = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if nxt is None:
+                    stop = True
+                    break
+                batch.append(nxt)
+            self._commit(batch)
+            if stop:
+                break
+        # Anything queued behind the sentinel is failed rather than left waiting forever
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not None:
+                item.error = RuntimeError("Database writer is closed")
+                item.done.set()
+
+    def _commit(self, batch):
+        conn = self._pool.connection()
+        try:
+            with conn:
+                for item in batch:
+                    for sql, params in item.statements:
+                        conn.execute(sql, params)
+        except Exception:
+            # Replay one by one so a bad statement only fails its own caller
+            for item in batch:
+                try:
+                    with conn:
+                        for sql, params in item.statements:
+                            conn.execute(sql, params)
+                except Exception as e:
+                    item.error = e
+                    app_logger.error(f"DB Error in group commit: {e}")
+        for item in batch:
+            item.done.set()
+
+    def close(self):
+        """Commits everything already queued, then stops the writer thread; later submits raise."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(None)
+        self._thread.join()
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+def get_pool(db_path: str) -> ConnectionPool:
+    """Shared pool per database file, so all stores on one file reuse the same connections."""
+    with _pools_lock:
+        if db_path not in _pools:
+            _pools[db_path] = ConnectionPool(db_path)
+        return _pools[db_path]
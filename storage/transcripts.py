@@ -0,0 +1,45 @@
+import hashlib
+import json
+import struct
+import zlib
+from storage.words import WordTable, to_columnar
+
+# Stored transcripts start with a one-byte format tag; rows written by older
+# versions are plain JSON text and have none
+ZLIB_JSON = b"\x01"
+COLUMNAR = b"\x02"
+
+def encode_transcript(result: dict) -> bytes:
+    """Canonical stored form of a transcript.
+
+    Segment metadata is compact JSON; word timestamps follow as a WordTable
+    buffer instead of one JSON object per word. The whole payload is
+    zlib-compressed.
+    """
+    result = to_columnar(result)
+    header = {k: v for k, v in result.items() if k != "words"}
+    header_bytes = json.dumps(header, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    table = result["words"].to_bytes() if result["words"] is not None else b""
+    return COLUMNAR + zlib.compress(struct.pack("<I", len(header_bytes)) + header_bytes + table, 6)
+
+def decode_transcript(value) -> dict:
+    """Decodes a stored transcript into the columnar form (words as a WordTable, or None)."""
+    if isinstance(value, str):
+        return to_columnar(json.loads(value))
+    tag, body = value[:1], value[1:]
+    if tag == ZLIB_JSON:
+        return to_columnar(json.loads(zlib.decompress(body)))
+    if tag == COLUMNAR:
+        payload = zlib.decompress(body)
+        (header_len,) = struct.unpack_from("<I", payload, 0)
+        result = json.loads(payload[4:4 + header_len])
+        table = payload[4 + header_len:]
+        result["words"] = WordTable.from_bytes(table) if table else None
+        return result
+    raise ValueError(f"Unknown transcript encoding {tag!r}")
+
+def transcript_digest(value) -> str:
+    """Content hash of a stored transcript, used as its ETag."""
+    if isinstance(value, str):
+        value = value.encode("utf-8")
+    return hashlib.sha256(value).hexdigest()
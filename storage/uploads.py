@@ -0,0 +1,182 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import uuid
+from typing import Optional, Tuple
+from config.manager import config
+from utils.lazy import Lazy
+from utils.logger import app_logger
+
+class UploadError(Exception):
+    pass
+
+class UploadSession:
+    """One upload in progress: a partial file that grows by append() and its running SHA-256.
+
+    append() does blocking file I/O and is meant to run off the event loop.
+    Only one request may write to a session at a time (begin()/end()).
+    """
+
+    def __init__(self, upload_id: str, filename: str, size: Optional[int], priority: int, path: str):
+        self.upload_id = upload_id
+        self.filename = filename
+        self.size = size
+        self.priority = priority
+        self.path = path
+        self.offset = os.path.getsize(path) if os.path.exists(path) else 0
+        # sha256 of bytes [0, offset); rebuilt from the partial file for sessions resumed after a restart
+        self._digest = None if self.offset else hashlib.sha256()
+        self._file = None
+        self._writing = threading.Lock()
+
+    def begin(self) -> bool:
+        return self._writing.acquire(blocking=False)
+
+    def end(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+        self._writing.release()
+
+    def _running_digest(self):
+        if self._digest is None:
+            self._digest = hashlib.sha256()
+            with open(self.path, "rb") as f:
+                for block in iter(lambda: f.read(1024 * 1024), b""):
+                    self._digest.update(block)
+        return self._digest
+
+    def append(self, data: bytes):
+        if self.size is not None and self.offset + len(data) > self.size:
+            raise UploadError(f"Upload exceeds its declared size of {self.size} bytes")
+        digest = self._running_digest()
+        if self._file is None:
+            self._file = open(self.path, "ab")
+        self._file.write(data)
+        digest.update(data)
+        self.offset += len(data)
+
+    def hexdigest(self) -> str:
+        return self._running_digest().hexdigest()
+
+    def to_dict(self) -> dict:
+        return {"upload_id": self.upload_id, "filename": self.filename, "size": self.size, "offset": self.offset}
+
+class UploadStore:
+    """Resumable uploads, kept as "<id>.part" files plus a "<id>.json" sidecar in <upload_dir>/.partial.
+
+    Completed uploads move to upload_dir under their (de-duplicated) file
+    name. Sessions survive a restart; ones untouched for expire_seconds are
+    removed when new sessions are created.
+    """
+
+    ID_PATTERN = re.compile(r"[0-9a-f]{32}")
+
+    def __init__(self, upload_dir: str, expire_seconds: float = 86400):
+        self.upload_dir = upload_dir
+        self.partial_dir = os.path.join(upload_dir, ".partial")
+        self.expire_seconds = expire_seconds
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def _paths(self, upload_id: str) -> Tuple[str, str]:
+        base = os.path.join(self.partial_dir, upload_id)
+        return f"{base}.part", f"{base}.json"
+
+    def create(self, filename: str, size: Optional[int] = None, priority: int = 0) -> UploadSession:
+        # Never trust client paths: keep only the final component
+        filename = os.path.basename((filename or "").replace("\\", "/")) or "upload"
+        os.makedirs(self.partial_dir, exist_ok=True)
+        self.expire()
+        upload_id = uuid.uuid4().hex
+        part_path, meta_path = self._paths(upload_id)
+        with open(meta_path, "w") as f:
+            json.dump({"filename": filename, "size": size, "priority": priority}, f)
+        open(part_path, "wb").close()
+        session = UploadSession(upload_id, filename, size, priority, part_path)
+        with self._lock:
+            self._sessions[upload_id] = session
+        return session
+
+    def get(self, upload_id: str) -> Optional[UploadSession]:
+        if not self.ID_PATTERN.fullmatch(upload_id):
+            return None
+        with self._lock:
+            session = self._sessions.get(upload_id)
+            if session is None:
+                part_path, meta_path = self._paths(upload_id)
+                try:
+                    with open(meta_path) as f:
+                        meta = json.load(f)
+                except (OSError, ValueError):
+                    return None
+                session = UploadSession(upload_id, meta["filename"], meta["size"], meta.get("priority", 0), part_path)
+                self._sessions[upload_id] = session
+            return session
+
+    def complete(self, session: UploadSession) -> Tuple[str, str]:
+        """Moves a finished upload into upload_dir; returns (path, sha256)."""
+        if session.size is not None and session.offset != session.size:
+            raise UploadError(f"Upload has {session.offset} of {session.size} bytes")
+        digest = session.hexdigest()
+        stem, ext = os.path.splitext(session.filename)
+        path = os.path.join(self.upload_dir, session.filename)
+        n = 1
+        # O_EXCL claim, so two uploads of the same name never overwrite each other
+        while True:
+            try:
+                os.close(os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                break
+            except FileExistsError:
+                path = os.path.join(self.upload_dir, f"{stem}-{n}{ext}")
+                n += 1
+        os.replace(session.path, path)
+        self._forget(session)
+        return path, digest
+
+    def abort(self, session: UploadSession):
+        try:
+            os.remove(session.path)
+        except OSError:
+            pass
+        self._forget(session)
+
+    def _forget(self, session: UploadSession):
+        try:
+            os.remove(self._paths(session.upload_id)[1])
+        except OSError:
+            pass
+        with self._lock:
+            self._sessions.pop(session.upload_id, None)
+
+    def expire(self):
+        cutoff = time.time() - self.expire_seconds
+        try:
+            names = os.listdir(self.partial_dir)
+        except OSError:
+            return
+        for name in names:
+            upload_id, ext = os.path.splitext(name)
+            if ext != ".json":
+                continue
+            part_path, meta_path = self._paths(upload_id)
+            try:
+                last_write = os.path.getmtime(part_path) if os.path.exists(part_path) else os.path.getmtime(meta_path)
+            except OSError:
+                continue
+            if last_write < cutoff:
+                session = self.get(upload_id)
+                if session and session.begin():
+                    session.end()
+                    self.abort(session)
+                    app_logger.info(f"Expired abandoned upload {upload_id} ({session.filename})")
+
+def _create_store() -> UploadStore:
+    upload_config = config.get("upload", {})
+    return UploadStore(upload_config.get("dir", "/workspace/uploads"), upload_config.get("expire_seconds", 86400))
+
+# Global upload store, created on first use
+uploads = Lazy(_create_store)
@@ -0,0 +1,163 @@
+import struct
+from array import array
+import numpy as np
+
+class WordTable:
+    """Word-level timestamps of a whole transcript in columnar form.
+
+    Instead of a dict (or pydantic model) per word, words are held in typed
+    arrays: start/end in integer milliseconds, probability as float32, the
+    word texts in one UTF-8 buffer with offsets, and seg_offsets[i]:seg_offsets[i+1]
+    selecting the words of segment i. Dicts are only built by words_for() and
+    materialize() when a caller needs them.
+    """
+
+    __slots__ = ("starts", "ends", "probs", "seg_offsets", "text", "text_offsets")
+
+    def __init__(self, starts, ends, probs, seg_offsets, text: bytes, text_offsets):
+        self.starts = starts
+        self.ends = ends
+        self.probs = probs
+        self.seg_offsets = seg_offsets
+        self.text = text
+        self.text_offsets = text_offsets
+
+    @classmethod
+    def from_segment_words(cls, segment_words) -> "WordTable":
+        """Builds a table from one list of words per segment (dicts or objects with start/end/word/probability)."""
+        builder = WordTableBuilder()
+        for words in segment_words:
+            builder.add_segment(words)
+        return builder.build()
+
+    @classmethod
+    def concat(cls, tables) -> "WordTable":
+        tables = list(tables)
+        if not tables:
+            return cls.from_segment_words([])
+        seg_offsets = [np.zeros(1, dtype=np.uint32)]
+        text_offsets = [np.zeros(1, dtype=np.uint32)]
+        words = text_len = 0
+        for table in tables:
+            seg_offsets.append(table.seg_offsets[1:] + words)
+            text_offsets.append(table.text_offsets[1:] + text_len)
+            words += len(table)
+            text_len += len(table.text)
+        return cls(
+            np.concatenate([t.starts for t in tables]),
+            np.concatenate([t.ends for t in tables]),
+            np.concatenate([t.probs for t in tables]),
+            np.concatenate(seg_offsets).astype(np.uint32),
+            b"".join(t.text for t in tables),
+            np.concatenate(text_offsets).astype(np.uint32)
+        )
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    @property
+    def segment_count(self) -> int:
+        return len(self.seg_offsets) - 1
+
+    def shifted(self, seconds: float) -> "WordTable":
+        delta = round(seconds * 1000)
+        return WordTable(self.starts + delta, self.ends + delta, self.probs, self.seg_offsets, self.text, self.text_offsets)
+
+    def select(self, segment_indices) -> "WordTable":
+        """Table holding only the given segments, in the given order."""
+        return WordTable.from_segment_words(self.words_for(i) for i in segment_indices)
+
+    def words_for(self, segment_index: int) -> list:
+        first, last = int(self.seg_offsets[segment_index]), int(self.seg_offsets[segment_index + 1])
+        offsets = self.text_offsets
+        return [
+            {
+                "start": int(self.starts[i]) / 1000,
+                "end": int(self.ends[i]) / 1000,
+                "word": self.text[offsets[i]:offsets[i + 1]].decode("utf-8"),
+                "probability": round(float(self.probs[i]), 4)
+            }
+            for i in range(first, last)
+        ]
+
+    def to_bytes(self) -> bytes:
+        header = struct.pack("<II", len(self), self.segment_count)
+        return b"".join((
+            header,
+            self.starts.astype("<i4").tobytes(),
+            self.ends.astype("<i4").tobytes(),
+            self.probs.astype("<f4").tobytes(),
+            self.seg_offsets.astype("<u4").tobytes(),
+            self.text_offsets.astype("<u4").tobytes(),
+            self.text
+        ))
+
+    @classmethod
+    def from_bytes(cls, data) -> "WordTable":
+        words, segments = struct.unpack_from("<II", data, 0)
+        offset = 8
+
+        def take(dtype, count):
+            nonlocal offset
+            values = np.frombuffer(data, dtype=dtype, count=count, offset=offset)
+            offset += values.nbytes
+            return values
+
+        starts = take("<i4", words)
+        ends = take("<i4", words)
+        probs = take("<f4", words)
+        seg_offsets = take("<u4", segments + 1)
+        text_offsets = take("<u4", words + 1)
+        return cls(starts, ends, probs, seg_offsets, bytes(data[offset:offset + int(text_offsets[-1])]), text_offsets)
+
+class WordTableBuilder:
+    """Appends words segment by segment into flat arrays, so no per-word objects are kept."""
+
+    def __init__(self):
+        self.starts = array("i")
+        self.ends = array("i")
+        self.probs = array("f")
+        self.seg_offsets = array("I", [0])
+        self.text = bytearray()
+        self.text_offsets = array("I", [0])
+
+    def add_segment(self, words):
+        for w in words or ():
+            if isinstance(w, dict):
+                start, end, word, probability = w["start"], w["end"], w["word"], w["probability"]
+            else:
+                start, end, word, probability = w.start, w.end, w.word, w.probability
+            self.starts.append(round(start * 1000))
+            self.ends.append(round(end * 1000))
+            self.probs.append(probability)
+            self.text += word.encode("utf-8")
+            self.text_offsets.append(len(self.text))
+        self.seg_offsets.append(len(self.starts))
+
+    def build(self) -> WordTable:
+        return WordTable(
+            np.frombuffer(self.starts, dtype=np.int32).copy(),
+            np.frombuffer(self.ends, dtype=np.int32).copy(),
+            np.frombuffer(self.probs, dtype=np.float32).copy(),
+            np.frombuffer(self.seg_offsets, dtype=np.uint32).copy(),
+            bytes(self.text),
+            np.frombuffer(self.text_offsets, dtype=np.uint32).copy()
+        )
+
+def to_columnar(result: dict) -> dict:
+    """Moves per-segment word lists of a result dict into a WordTable under "words"."""
+    if "words" in result:
+        return result
+    segments = result["segments"]
+    has_words = any(seg.get("words") for seg in segments)
+    columnar = dict(result, segments=[{k: v for k, v in seg.items() if k != "words"} for seg in segments])
+    columnar["words"] = WordTable.from_segment_words(seg.get("words") for seg in segments) if has_words else None
+    return columnar
+
+def materialize(result: dict) -> dict:
+    """Inverse of to_columnar: the nested form the API and JSON outputs use."""
+    if "words" not in result:
+        return result
+    table = result["words"]
+    segments = [dict(seg, words=table.words_for(i) if table else None) for i, seg in enumerate(result["segments"])]
+    return {k: v for k, v in result.items() if k != "words"} | {"segments": segments}
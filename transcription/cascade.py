@@ -0,0 +1,91 @@
+from storage.words import WordTable
+
+# Escalation thresholds when transcription.cascade leaves them out; the same as the config defaults
+MIN_AVG_LOGPROB = -0.6
+MAX_NO_SPEECH_PROB = 0.6
+MAX_COMPRESSION_RATIO = 2.4
+
+def is_weak(quality, cascade: dict) -> bool:
+    """Whether a segment's (avg_logprob, no_speech_prob, compression_ratio) calls for the larger model.
+
+    Low average log-probability means the model was unsure of the text; a
+    high no-speech probability on a segment that still has text, or a high
+    compression ratio (repetitive output), are typical of hallucinations.
+    """
+    avg_logprob, no_speech_prob, compression_ratio = quality
+    return (
+        avg_logprob < cascade.get("min_avg_logprob", MIN_AVG_LOGPROB)
+        or no_speech_prob > cascade.get("max_no_speech_prob", MAX_NO_SPEECH_PROB)
+        or compression_ratio > cascade.get("max_compression_ratio", MAX_COMPRESSION_RATIO)
+    )
+
+def plan_regions(segments: list, weak: list, duration: float, padding: float = 0.5) -> list:
+    """Groups runs of consecutive weak segments into (start, end, first, last) regions to re-transcribe.
+
+    first/last are segment indices. Regions are padded by up to padding
+    seconds into the silence around them, never into a neighbouring segment
+    that is kept, so its words are not transcribed twice.
+    """
+    regions = []
+    i = 0
+    while i < len(segments):
+        if not weak[i]:
+            i += 1
+            continue
+        first = i
+        while i + 1 < len(segments) and weak[i + 1]:
+            i += 1
+        last = i
+        lower = segments[first - 1]["end"] if first > 0 else 0.0
+        upper = segments[last + 1]["start"] if last + 1 < len(segments) else duration
+        start = max(min(lower, segments[first]["start"]), segments[first]["start"] - padding)
+        end = min(max(upper, segments[last]["end"]), segments[last]["end"] + padding)
+        regions.append((start, end, first, last))
+        i += 1
+    return regions
+
+def merge_regions(result: dict, regions: list, region_results: list) -> dict:
+    """Replaces each region's segments (and words) with what the larger model produced for that region.
+
+    region_results are in the columnar form with times relative to the
+    region start; the merged result keeps the order and form of result.
+    """
+    segments = result["segments"]
+    table = result.get("words")
+    merged = []
+    tables = []
+    kept = []
+
+    def flush_kept():
+        if kept and table is not None:
+            tables.append(table.select(kept))
+        kept.clear()
+
+    position = 0
+    for (start, end, first, last), region_result in zip(regions, region_results):
+        for i in range(position, first):
+            merged.append(segments[i])
+            kept.append(i)
+        flush_kept()
+
+        region_table = region_result.get("words")
+        chosen = []
+        for j, seg in enumerate(region_result["segments"]):
+            if not seg["text"].strip():
+                continue
+            merged.append(dict(seg, start=min(end, seg["start"] + start), end=min(end, seg["end"] + start)))
+            chosen.append(j)
+        if table is not None:
+            if region_table is not None:
+                region_table = region_table.shifted(start)
+                tables.append(region_table if len(chosen) == region_table.segment_count else region_table.select(chosen))
+            else:
+                tables.append(WordTable.from_segment_words([] for _ in chosen))
+        position = last + 1
+
+    for i in range(position, len(segments)):
+        merged.append(segments[i])
+        kept.append(i)
+    flush_kept()
+
+    return dict(result, segments=merged, words=WordTable.concat(tables) if table is not None else None)
@@ -0,0 +1,89 @@
+from storage.words import WordTable
+
+SAMPLING_RATE = 16000
+
+def plan_chunks(audio, chunk_seconds: float, min_silence_ms: int = 500):
+    """Splits decoded 16 kHz audio into contiguous (start, end) sample ranges of roughly chunk_seconds.
+
+    Cuts are only placed in the middle of a VAD silence gap, so no speech is
+    split between two chunks and each chunk can be decoded independently.
+    """
+    from faster_whisper.vad import VadOptions, get_speech_timestamps
+
+    total = len(audio)
+    speech = get_speech_timestamps(
+        audio,
+        # Long uninterrupted speech is split at its quietest point so chunks stay near the target
+        VadOptions(min_silence_duration_ms=min_silence_ms, max_speech_duration_s=chunk_seconds),
+        sampling_rate=SAMPLING_RATE
+    )
+    if not speech:
+        return [(0, total)]
+
+    target = int(chunk_seconds * SAMPLING_RATE)
+    chunks = []
+    chunk_start = 0
+    for current, following in zip(speech, speech[1:]):
+        # Cut before the next speech region would push this chunk past the target
+        if following["end"] - chunk_start > target:
+            cut = (current["end"] + following["start"]) // 2
+            chunks.append((chunk_start, cut))
+            chunk_start = cut
+    chunks.append((chunk_start, total))
+    return chunks
+
+class SegmentStitcher:
+    """Merges per-chunk transcription results, in chunk order, into one result with global timestamps."""
+
+    def __init__(self):
+        self.segments = []
+        self._words = []
+        self._quality = None
+        self._languages = {}
+
+    def add(self, chunk, result: dict) -> list:
+        """Adds the result for one (start, end) chunk and returns the segments it contributed.
+
+        result is in the columnar form (see storage.words); returned segments
+        carry their words so they can be streamed.
+        """
+        offset = chunk[0] / SAMPLING_RATE
+        if result.get("language"):
+            self._languages[result["language"]] = self._languages.get(result["language"], 0) + 1
+        table = result.get("words")
+
+        added = []
+        kept = []
+        for i, seg in enumerate(result["segments"]):
+            seg = dict(seg, start=seg["start"] + offset, end=seg["end"] + offset)
+
+            # Whisper can repeat the last sentence of a chunk at the start of the next one
+            if self.segments and seg["start"] < self.segments[-1]["end"] and seg["text"].strip() == self.segments[-1]["text"].strip():
+                continue
+            self.segments.append(seg)
+            kept.append(i)
+            added.append(seg)
+
+        if "quality" in result:
+            if self._quality is None:
+                self._quality = []
+            self._quality.extend(result["quality"][i] for i in kept)
+
+        if table is not None:
+            table = table.shifted(offset)
+            if len(kept) < table.segment_count:
+                table = table.select(kept)
+            self._words.append(table)
+            added = [dict(seg, words=table.words_for(i)) for i, seg in enumerate(added)]
+        return added
+
+    def result(self, duration: float) -> dict:
+        result = {
+            "segments": self.segments,
+            "language": max(self._languages, key=self._languages.get) if self._languages else None,
+            "duration": duration,
+            "words": WordTable.concat(self._words) if self._words else None
+        }
+        if self._quality is not None:
+            result["quality"] = self._quality
+        return result
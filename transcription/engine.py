@@ -1,69 +1,390 @@
-from faster_whisper import WhisperModel
+from concurrent.futures import ThreadPoolExecutor
 from config.manager import config
+from transcription.cascade import is_weak, merge_regions, plan_regions
+from transcription.chunking import SAMPLING_RATE, SegmentStitcher, plan_chunks
+from transcription.models import ModelCache
+from transcription.prefetch import PrefetchedAudio
+from transcription.replicas import ReplicaPool, model_signature, run_transcription
+from utils.files import probe_duration
+from utils.lazy import Lazy
 from utils.logger import app_logger
+from utils.metrics import CASCADE_AUDIO_SECONDS, MODEL_LOAD_SECONDS, StageTimer
 import os
 
+# Share of a cascade job's progress given to the first pass; escalated regions fill the rest
+CASCADE_FIRST_PASS_PROGRESS = 0.8
+
+# Threads per chunk when chunking.parallel and worker.cpu_threads are both left at 0
+CHUNK_CPU_THREADS = 4
+
+def thread_budget():
+    """Splits the host cores between the configured number of concurrent workers.
+
+    Returns (cpu_threads, num_workers) for WhisperModel so that N parallel jobs
+    each get their own slice of cores instead of oversubscribing all of them.
+    With chunking enabled there are at least transcription.chunking.parallel
+    slices, so the chunks of one long file run side by side even with a single
+    worker. live.max_streams more slots are reserved for live captions, which
+    share the model with file jobs. In process mode the split is across model
+    replicas instead.
+    """
+    worker_config = config.get("worker", {})
+    cpu_threads = int(worker_config.get("cpu_threads", 0))
+    if worker_config.get("mode", "thread") == "process":
+        num_workers = max(1, int(worker_config.get("replicas", 0) or worker_config.get("concurrency", 1)))
+    else:
+        num_workers = max(1, int(worker_config.get("concurrency", 1)))
+        chunking = config.get("transcription", {}).get("chunking", {})
+        if chunking.get("enabled", False):
+            parallel = int(chunking.get("parallel", 0))
+            if parallel <= 0:
+                parallel = max(1, (os.cpu_count() or 1) // (cpu_threads if cpu_threads > 0 else CHUNK_CPU_THREADS))
+            num_workers = max(num_workers, parallel)
+        num_workers += live_slots()
+    if cpu_threads <= 0:
+        cpu_threads = max(1, (os.cpu_count() or 1) // num_workers)
+    return cpu_threads, num_workers
+
+def live_slots() -> int:
+    """Model slots thread_budget() reserves for live captions."""
+    return max(0, int(config.get("live", {}).get("max_streams", 2)))
+
 class TranscriptionEngine:
     def __init__(self):
-        self._model = None
-        self._current_config = {}
-        self.reload_model()
+        self._pool = None
+        self._models = None
+        self._serving = None  # (model_config, model) that handled the last job in thread mode
+        cache_bytes = config.get("model_cache", {}).get("max_bytes", 4294967296)
+        cpu_threads, workers = thread_budget()
+
+        if config.get("worker", {}).get("mode", "thread") == "process":
+            # Replicas load their models lazily inside the worker processes
+            self._pool = ReplicaPool(workers, cpu_threads, cache_bytes)
+        else:
+            # Nothing is loaded until the first transcribe() or preload() call, so
+            # importing the engine (e.g. from a benchmark with its own engine) loads nothing
+            self._models = ModelCache(cache_bytes, cpu_threads=cpu_threads, num_workers=workers)
 
-    def reload_model(self):
-        """Loads or reloads the Whisper model based on current config."""
+    def preload(self, model_config: dict = None):
+        """Starts loading a model (default: the configured one) in the background.
+
+        In process mode every replica is asked to load it; this is best effort,
+        as the pool decides which process runs each request.
+        """
+        configured = model_config is None
+        model_config = dict(model_config or config.get("model", {}))
+        cascade = config.get("transcription", {}).get("cascade", {})
+        if configured and cascade.get("enabled"):
+            # Cascade jobs need the first-pass model as well; it is small, so it goes first
+            self._preload(dict(model_config, name=cascade.get("model", "base")))
+        self._preload(model_config)
+
+    def _preload(self, model_config: dict):
+        if self._pool:
+            self._pool.preload(model_config)
+        else:
+            self._models.load_async(model_config)
+
+    def models_status(self) -> dict:
+        if self._pool:
+            return {"mode": "process", "replicas": self._pool.replicas}
+        status = self._models.status()
+        status["serving"] = model_signature(self._serving[0]) if self._serving else None
+        return status
+
+    def readiness(self) -> dict:
+        """Whether a job can start without waiting for a model load, and the configured model's load state."""
         model_config = config.get("model", {})
-        model_name = model_config.get("name", "base")
-        device = model_config.get("device", "cpu")
-        compute_type = model_config.get("compute_type", "int8")
-
-        # Check if config actually changed to avoid unnecessary reloads
-        new_config_sig = f"{model_name}-{device}-{compute_type}"
-        current_config_sig = f"{self._current_config.get('name')}-{self._current_config.get('device')}-{self._current_config.get('compute_type')}"
-        
-        if self._model and new_config_sig == current_config_sig:
-            return
-
-        app_logger.info(f"Loading Whisper model: {model_name} on {device} ({compute_type})...")
-        try:
-            self._model = WhisperModel(model_name, device=device, compute_type=compute_type)
-            self._current_config = model_config
-            app_logger.info("Model loaded successfully.")
-        except Exception as e:
-            app_logger.error(f"Failed to load model: {e}")
-            raise
-
-    def transcribe(self, audio_path: str):
-        if not self._model:
-            self.reload_model()
-        
-        trans_config = config.get("transcription", {})
-        # word_timestamps = trans_config.get("timestamp_granularity") == "word"
-        
-        segments, info = self._model.transcribe(
-            audio_path, 
-            beam_size=trans_config.get("beam_size", 5),
-            language=trans_config.get("language"),
-            # word_timestamps=word_timestamps 
-            # Note: faster-whisper usage for word-level timestamps might need checking docs, 
-            # usually word_timestamps=True returns words in segments.
-            word_timestamps=True if trans_config.get("timestamp_granularity") == "word" else False
+        if self._pool:
+            state, error = self._pool.state(model_config)
+            ready = state == "loaded"
+        else:
+            state, error = self._models.state(model_config)
+            # While a switch is loading, the previous model keeps serving jobs
+            ready = state == "loaded" or (
+                self._serving is not None and config.get("model_cache", {}).get("serve_previous_while_loading", True)
+            )
+        return {"ready": ready, "model": model_signature(model_config), "state": state, "error": error}
+
+    def _model_for(self, model_config: dict, exact: bool = False):
+        """(model_config, model) to run a job with.
+
+        If the requested model is still loading in the background and
+        model_cache.serve_previous_while_loading is on, the model of the
+        previous job keeps serving instead of the job waiting for the load.
+        With exact=True the caller waits for this very model and the serving
+        model is left alone (the cascade runs two models per job).
+        """
+        if exact:
+            return dict(model_config), self._models.load(model_config)
+        model = self._models.get(model_config)
+        if model is None:
+            future = self._models.load_async(model_config)
+            serving = self._serving
+            if serving and not future.done() and config.get("model_cache", {}).get("serve_previous_while_loading", True):
+                app_logger.info(f"Model {model_signature(model_config)} is still loading; "
+                                f"serving with {model_signature(serving[0])} meanwhile.")
+                return serving
+            model = future.result()
+        self._serving = (dict(model_config), model)
+        return self._serving
+
+    def transcribe(self, audio_path: str, on_segment=None, on_progress=None, prefetched: PrefetchedAudio = None,
+                   model_config: dict = None, trans_config: dict = None, resume: dict = None, on_start=None,
+                   exact: bool = False):
+        """Transcribes a file; on_segment/on_progress stream results while decoding runs.
+
+        prefetched is the file's audio already decoded by the prefetch stage; it is
+        used instead of decoding audio_path again. model_config and trans_config
+        default to the configured model and transcription settings;
+        result["model"] is the signature of the model that actually produced
+        the transcript, which on_start(signature, language) also reports before
+        the first segment. With exact=True the job waits for model_config
+        instead of being served by the previous model while it loads. resume
+        is a checkpoint (a columnar result with an "offset" in seconds): only
+        the audio after offset is transcribed, with the checkpoint's model and
+        language, and the result starts with the checkpointed segments.
+        """
+        trans_config = trans_config or config.get("transcription", {})
+        model_config = dict(model_config or config.get("model", {}))
+        audio = prefetched or audio_path
+
+        if resume and resume.get("offset"):
+            return self._transcribe_resumed(audio, model_config, trans_config, resume, on_segment, on_progress, on_start)
+
+        cascade = trans_config.get("cascade", {})
+        if cascade.get("enabled"):
+            return self._transcribe_cascade(audio, model_config, trans_config, cascade, on_segment, on_progress, on_start)
+
+        chunking = trans_config.get("chunking", {})
+        if chunking.get("enabled"):
+            if prefetched:
+                duration = prefetched.duration
+            else:
+                duration = probe_duration(audio_path) if isinstance(audio_path, str) else len(audio_path) / SAMPLING_RATE
+            if duration and duration >= chunking.get("min_duration", 1800):
+                return self._transcribe_chunked(audio, model_config, trans_config, chunking, on_segment, on_progress,
+                                                exact, on_start)
+
+        model_config, result = self._run(model_config, trans_config, audio, on_segment, on_progress, exact, on_start)
+        result["model"] = model_signature(model_config)
+        return result
+
+    def transcribe_window(self, audio, trans_config: dict, model_config: dict = None) -> dict:
+        """Transcribes a short 16 kHz float32 array, e.g. one window of a live stream.
+
+        Unlike transcribe() there is no chunking or streaming, and trans_config
+        is used as given rather than read from the configuration.
+        """
+        model_config, result = self._run(dict(model_config or config.get("model", {})), trans_config, audio)
+        result["model"] = model_signature(model_config)
+        return result
+
+    def _run(self, model_config: dict, trans_config: dict, audio, on_segment=None, on_progress=None, exact: bool = False,
+             on_start=None):
+        """One transcription on the replica pool or in this process; returns (model_config that ran, result)."""
+        if self._pool:
+            on_language = (lambda language: on_start(model_signature(model_config), language)) if on_start else None
+            result = self._pool.transcribe(model_config, trans_config, audio, on_segment, on_progress, on_language)
+            if "model_load" in result:
+                MODEL_LOAD_SECONDS.observe(result.pop("model_load"), model=model_signature(model_config))
+            return model_config, result
+        model_config, model = self._model_for(model_config, exact)
+        # Reports the model that serves the job, which is not model_config while a switch is loading
+        on_language = (lambda language: on_start(model_signature(model_config), language)) if on_start else None
+        return model_config, run_transcription(model, audio, trans_config, on_segment, on_progress, on_language)
+
+    def _run_many(self, model_config: dict, trans_config: dict, pieces: list, exact: bool = False):
+        """(model_config that ran, results): pieces of audio transcribed in parallel, results yielded in order."""
+        if self._pool:
+            def results():
+                for result in self._pool.transcribe_many(model_config, trans_config, pieces):
+                    if "model_load" in result:
+                        MODEL_LOAD_SECONDS.observe(result.pop("model_load"), model=model_signature(model_config))
+                    yield result
+            return model_config, results()
+        model_config, model = self._model_for(model_config, exact)
+        # Pieces use every slot of the model's num_workers (at least chunking.parallel) except those kept for live captions
+        _, slots = thread_budget()
+        executor = ThreadPoolExecutor(max_workers=max(1, slots - live_slots()))
+
+        def results():
+            try:
+                yield from executor.map(lambda piece: run_transcription(model, piece, trans_config), pieces)
+            finally:
+                executor.shutdown(wait=True, cancel_futures=True)
+        return model_config, results()
+
+    def _audio_array(self, audio, timings: dict):
+        """16 kHz float32 samples of a file path, PrefetchedAudio or array."""
+        if isinstance(audio, PrefetchedAudio):
+            return audio.array()
+        if isinstance(audio, str):
+            from faster_whisper.audio import decode_audio
+            with StageTimer("decode", timings):
+                return decode_audio(audio, sampling_rate=SAMPLING_RATE)
+        return audio
+
+    def _transcribe_chunked(self, audio, model_config: dict, trans_config: dict, chunking: dict,
+                            on_segment=None, on_progress=None, exact: bool = False, on_start=None):
+        """Long-file mode: split at VAD silences, decode chunks in parallel, stitch the segments."""
+        timings = {}
+        audio = self._audio_array(audio, timings)
+        chunks = plan_chunks(audio, chunking.get("chunk_seconds", 600))
+        duration = len(audio) / SAMPLING_RATE
+        app_logger.info(f"Long file ({duration:.0f}s) split into {len(chunks)} chunk(s).")
+
+        pieces = [audio[start:end] for start, end in chunks]
+        stitcher = SegmentStitcher()
+
+        model_config, results = self._run_many(model_config, trans_config, pieces, exact)
+        # Results arrive in chunk order, so segments can be streamed as soon as a chunk is stitched
+        for i, (chunk, result) in enumerate(zip(chunks, results)):
+            # Chunks run in parallel, so these add up to compute time rather than wall time
+            for stage, seconds in result.get("timings", {}).items():
+                timings[stage] = timings.get(stage, 0.0) + seconds
+            if on_start and i == 0:
+                on_start(model_signature(model_config), result.get("language"))
+            for seg in stitcher.add(chunk, result):
+                if on_segment:
+                    on_segment(seg)
+            if on_progress:
+                on_progress(chunk[1] / len(audio))
+
+        result = stitcher.result(duration)
+        result["timings"] = timings
+        result["model"] = model_signature(model_config)
+        return result
+
+    def _transcribe_resumed(self, audio, model_config: dict, trans_config: dict, checkpoint: dict,
+                            on_segment=None, on_progress=None, on_start=None):
+        """Resume mode: transcribes the audio after a checkpoint's offset and stitches it onto the checkpointed segments.
+
+        The remainder goes through transcribe() again, so it is chunked or
+        cascaded like a whole file would be, but always with model_config
+        (the model the checkpoint was taken with) and the checkpoint's
+        language. Its streamed segments and progress are shifted to the
+        timeline of the whole file.
+        """
+        timings = {}
+        audio = self._audio_array(audio, timings)
+        total = len(audio)
+        cut = min(total, int(checkpoint["offset"] * SAMPLING_RATE))
+        offset = cut / SAMPLING_RATE
+        duration = total / SAMPLING_RATE
+        app_logger.info(f"Resuming at {offset:.1f}s of {duration:.1f}s from a checkpoint.")
+
+        language = checkpoint.get("language") or trans_config.get("language")
+        stitcher = SegmentStitcher()
+        stitcher.add((0, cut), checkpoint)
+        # Less than a tenth of a second left is not worth a model call
+        if total - cut < SAMPLING_RATE // 10:
+            result = stitcher.result(duration)
+            result["language"] = result["language"] or language or ""
+            result["timings"] = timings
+            result["model"] = model_signature(model_config)
+            return result
+
+        def shifted_segment(seg):
+            words = [dict(w, start=w["start"] + offset, end=w["end"] + offset) for w in seg["words"]] if seg.get("words") else seg.get("words")
+            on_segment(dict(seg, start=seg["start"] + offset, end=seg["end"] + offset, words=words))
+
+        def shifted_progress(fraction: float):
+            on_progress((offset + fraction * (duration - offset)) / duration)
+
+        # The tail of the checkpointed text carries context across the cut, as for live windows
+        prompt = " ".join(seg["text"].strip() for seg in checkpoint["segments"][-3:])
+        rest = self.transcribe(
+            audio[cut:],
+            on_segment=shifted_segment if on_segment else None,
+            on_progress=shifted_progress if on_progress else None,
+            model_config=model_config,
+            trans_config=dict(trans_config, language=language, initial_prompt=prompt or trans_config.get("initial_prompt")),
+            on_start=on_start,
+            exact=True
         )
-        
-        # segments is a generator, so we must iterate
-        result_segments = []
-        for segment in segments:
-            result_segments.append({
-                "start": segment.start,
-                "end": segment.end,
-                "text": segment.text,
-                "words": segment.words if hasattr(segment, 'words') and segment.words else None
-            })
-            
-        return {
-            "segments": result_segments,
-            "language": info.language,
-            "duration": info.duration
+        for stage, seconds in rest.pop("timings", {}).items():
+            timings[stage] = timings.get(stage, 0.0) + seconds
+        stitcher.add((cut, total), rest)
+
+        result = stitcher.result(duration)
+        if "cascade" in rest:
+            result["cascade"] = rest["cascade"]
+        result["timings"] = timings
+        result["model"] = rest["model"]
+        return result
+
+    def _transcribe_cascade(self, audio, model_config: dict, trans_config: dict, cascade: dict,
+                            on_segment=None, on_progress=None, on_start=None):
+        """Cascade mode: a cheap model transcribes everything, the configured model only its weak regions.
+
+        Segments are streamed after the merge, so subscribers never see text
+        that is replaced later. result["cascade"] reports how much audio was
+        escalated.
+        """
+        timings = {}
+        audio = self._audio_array(audio, timings)
+        duration = len(audio) / SAMPLING_RATE
+        first_config = dict(model_config, name=cascade.get("model", "base"))
+        first_trans = dict(trans_config, segment_quality=True)
+        first_progress = (lambda fraction: on_progress(CASCADE_FIRST_PASS_PROGRESS * fraction)) if on_progress else None
+
+        chunking = trans_config.get("chunking", {})
+        if chunking.get("enabled") and duration >= chunking.get("min_duration", 1800):
+            result = self._transcribe_chunked(audio, first_config, first_trans, chunking, on_progress=first_progress, exact=True)
+        else:
+            _, result = self._run(first_config, first_trans, audio, on_progress=first_progress, exact=True)
+        for stage, seconds in result.pop("timings", {}).items():
+            timings[stage] = timings.get(stage, 0.0) + seconds
+        result.pop("model", None)
+        quality = result.pop("quality")
+
+        weak = [is_weak(q, cascade) for q in quality]
+        regions = plan_regions(result["segments"], weak, duration, cascade.get("padding", 0.5))
+        escalated_segments = sum(weak)
+        if regions:
+            # Regions are short, so the language the first pass detected is more reliable than detecting it again
+            region_trans = dict(trans_config, language=trans_config.get("language") or result["language"])
+            pieces = [audio[int(start * SAMPLING_RATE):int(end * SAMPLING_RATE)] for start, end, _, _ in regions]
+            model_config, results = self._run_many(model_config, region_trans, pieces, exact=True)
+            region_results = []
+            for region_result in results:
+                region_results.append(region_result)
+                for stage, seconds in region_result.get("timings", {}).items():
+                    timings[stage] = timings.get(stage, 0.0) + seconds
+                if on_progress:
+                    on_progress(CASCADE_FIRST_PASS_PROGRESS + (1 - CASCADE_FIRST_PASS_PROGRESS) * len(region_results) / len(regions))
+            result = merge_regions(result, regions, region_results)
+
+        escalated = sum(end - start for start, end, _, _ in regions)
+        CASCADE_AUDIO_SECONDS.inc(duration, stage="first_pass")
+        CASCADE_AUDIO_SECONDS.inc(escalated, stage="escalated")
+        result["cascade"] = {
+            "model": model_signature(first_config),
+            "segments": len(quality),
+            "escalated_segments": escalated_segments,
+            "regions": len(regions),
+            "escalated_seconds": round(escalated, 3),
+            "escalated_fraction": round(escalated / duration, 4) if duration else 0.0
         }
+        app_logger.info(f"Cascade: {escalated_segments}/{len(quality)} segment(s), {escalated:.1f}s of {duration:.1f}s "
+                        f"escalated to {model_signature(model_config)}.")
+
+        if on_start:
+            on_start(model_signature(model_config), result["language"])
+        if on_segment:
+            table = result.get("words")
+            for i, seg in enumerate(result["segments"]):
+                on_segment(dict(seg, words=table.words_for(i) if table is not None else None))
+        result["timings"] = timings
+        result["model"] = model_signature(model_config)
+        return result
+
+    def shutdown(self, wait: bool = True):
+        if self._pool:
+            self._pool.shutdown(wait=wait)
+        else:
+            self._models.shutdown()
 
-# Global engine instance
-engine = TranscriptionEngine()
+# Global engine instance, created on first use
+engine = Lazy(TranscriptionEngine)
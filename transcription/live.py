@@ -0,0 +1,293 @@
+import asyncio
+import os
+import threading
+import time
+import uuid
+import wave
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import numpy as np
+from config.manager import config
+from storage.db import db
+from storage.models import Job, JobStatus, TranscriptResult
+from transcription.chunking import SAMPLING_RATE
+from transcription.engine import engine
+from transcription.utils import TranscriptWriter, save_transcript
+from utils.files import hash_file
+from utils.lazy import Lazy
+from utils.logger import app_logger
+from utils.metrics import AUDIO_SECONDS_TOTAL, JOBS_TOTAL, metrics
+
+SAMPLE_FORMATS = {"s16le": (np.int16, 32768.0), "f32le": (np.float32, 1.0)}
+
+class LiveTranscriber:
+    """Sliding-window transcription of one live 16 kHz mono PCM stream.
+
+    feed() only queues bytes and is cheap enough for the event loop; advance()
+    and finish() record the audio, run the model and write outputs, so they
+    belong on a worker thread. Each advance() transcribes the audio since
+    the last finalized segment (at most window_seconds). Every segment but the
+    last is finalized and the window moves past it; the last one is reported
+    as a partial until a later window settles it. A window that fills up
+    without a segment boundary is finalized whole.
+    """
+
+    def __init__(self, session_id: str, filepath: str, output_dir: str, formats: list, trans_config: dict,
+                 sample_format: str = "s16le", window_seconds: float = 15.0, step_seconds: float = 1.0,
+                 max_buffer_seconds: float = 30.0):
+        self.session_id = session_id
+        self.filepath = filepath
+        self.filename = os.path.basename(filepath)
+        self.output_dir = output_dir
+        self.formats = formats
+        self.trans_config = trans_config
+        self.dtype, self.scale = SAMPLE_FORMATS[sample_format]
+        self.window_samples = int(window_seconds * SAMPLING_RATE)
+        self.step_samples = int(step_seconds * SAMPLING_RATE)
+        self.max_pending_bytes = int(max_buffer_seconds * SAMPLING_RATE) * np.dtype(self.dtype).itemsize
+        self.started_at = datetime.now()
+
+        self.segments = []  # finalized, absolute times
+        self.language = trans_config.get("language")
+        self.model = None
+        self._pending = bytearray()  # received, not yet recorded or transcribed
+        self._lock = threading.Lock()
+        # Held by advance(), finish() and abort(), which may be queued on different threads
+        self._running = threading.Lock()
+        self._window = np.zeros(0, dtype=np.float32)
+        self._window_start = 0  # sample index of the window in the stream
+        self._samples = 0  # samples recorded so far
+
+        os.makedirs(os.path.dirname(filepath), exist_ok=True)
+        self._wav = wave.open(filepath, "wb")
+        self._wav.setnchannels(1)
+        self._wav.setsampwidth(2)
+        self._wav.setframerate(SAMPLING_RATE)
+        # Finalized segments go to "<stem>.<fmt>.partial" as they settle
+        self._writer = TranscriptWriter(output_dir, os.path.splitext(self.filename)[0], formats)
+
+    @property
+    def duration(self) -> float:
+        return self._samples / SAMPLING_RATE
+
+    def feed(self, data: bytes) -> bool:
+        """Queues received PCM; False once max_buffer_seconds of it is waiting (stop reading until it drains)."""
+        with self._lock:
+            self._pending += data
+            return len(self._pending) < self.max_pending_bytes
+
+    def has_step(self) -> bool:
+        with self._lock:
+            return len(self._pending) >= self.step_samples * np.dtype(self.dtype).itemsize
+
+    def _take_pending(self) -> np.ndarray:
+        with self._lock:
+            itemsize = np.dtype(self.dtype).itemsize
+            usable = len(self._pending) - len(self._pending) % itemsize
+            data = bytes(self._pending[:usable])
+            del self._pending[:usable]
+        samples = np.frombuffer(data, dtype=self.dtype)
+        audio = samples.astype(np.float32) / self.scale if self.dtype is not np.float32 else samples
+        pcm = samples if self.dtype is np.int16 else (np.clip(samples, -1.0, 1.0) * 32767).astype(np.int16)
+        self._wav.writeframes(pcm.tobytes())
+        self._samples += len(samples)
+        return audio
+
+    def advance(self, final: bool = False) -> list:
+        """Transcribes the new audio; returns the events to send ("segment"s, then one "partial")."""
+        with self._running:
+            return self._advance(final)
+
+    def _advance(self, final: bool) -> list:
+        audio = self._take_pending()
+        if len(audio):
+            self._window = np.concatenate([self._window, audio])
+        elif not final:
+            return []
+        events = []
+        while len(self._window):
+            # False while inference is catching up on a backlog longer than one window
+            covers_all = len(self._window) <= self.window_samples
+            window = self._window[:self.window_samples]
+            segments = self._transcribe(window)
+            if final and covers_all:
+                settled, cut = segments, len(window)
+            elif len(segments) > 1:
+                settled = segments[:-1]
+                cut = max(1, int(settled[-1]["end"] * SAMPLING_RATE))
+            elif len(window) == self.window_samples:
+                # A full window without a boundary to cut at is finalized whole
+                settled, cut = segments, len(window)
+            else:
+                settled, cut = [], 0
+            for seg in settled:
+                events.append(self._finalize(seg))
+            if covers_all and not final:
+                unsettled = segments[len(settled):]
+                partial = self._absolute(unsettled[-1]) if unsettled else {"start": None, "end": None, "text": ""}
+                events.append(dict(partial, type="partial"))
+            self._window = self._window[cut:]
+            self._window_start += cut
+            if covers_all:
+                break
+        return events
+
+    def _transcribe(self, window: np.ndarray) -> list:
+        trans_config = dict(self.trans_config, language=self.language)
+        if self.segments:
+            # The tail of the finalized text keeps wording and casing consistent across windows
+            trans_config["initial_prompt"] = " ".join(seg["text"].strip() for seg in self.segments[-3:])
+        result = engine.transcribe_window(window, trans_config)
+        self.model = result.get("model")
+        if not self.language:
+            # Detected once, then fixed so windows do not flip between languages
+            self.language = result.get("language")
+        return [seg for seg in result["segments"] if seg["text"].strip()]
+
+    def _absolute(self, seg: dict) -> dict:
+        offset = self._window_start / SAMPLING_RATE
+        return {"start": round(seg["start"] + offset, 3), "end": round(seg["end"] + offset, 3), "text": seg["text"]}
+
+    def _finalize(self, seg: dict) -> dict:
+        seg = self._absolute(seg)
+        self.segments.append(seg)
+        self._writer.write_segment(seg)
+        return dict(seg, type="segment")
+
+    def finish(self) -> tuple:
+        """Transcribes what is left, closes the recording and outputs; returns (final events, result)."""
+        with self._running:
+            events = self._advance(final=True)
+            self._wav.close()
+            self._writer.close()
+        result = {"segments": self.segments, "language": self.language, "duration": self.duration, "words": None}
+        # JSON and other whole-document formats are written once the transcript is complete
+        formats = [fmt for fmt in self.formats if fmt not in TranscriptWriter.STREAMING_FORMATS]
+        save_transcript(result, self.output_dir, os.path.splitext(self.filename)[0], formats)
+        return events, result
+
+    def abort(self):
+        with self._running:
+            self._wav.close()
+            self._writer.abort()
+        try:
+            os.remove(self.filepath)
+        except OSError:
+            pass
+
+    def status(self) -> dict:
+        return {
+            "session": self.session_id,
+            "filename": self.filename,
+            "started_at": self.started_at.isoformat(),
+            "duration": round(self.duration, 3),
+            "segments": len(self.segments),
+            "language": self.language
+        }
+
+class LiveStreams:
+    """Admission and execution for live sessions.
+
+    At most max_streams sessions run at once, and their inference runs on a
+    pool of that many threads. In thread mode the model is loaded with
+    max_streams slots on top of the file workers' (see
+    transcription.engine.thread_budget), so captions never wait behind file
+    jobs. max_streams 0 turns live captions off.
+    """
+
+    def __init__(self):
+        live_config = config.get("live", {})
+        self.max_streams = max(0, int(live_config.get("max_streams", 2)))
+        self._sessions = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max(1, self.max_streams), thread_name_prefix="live")
+
+    def open(self, sample_format: str = "s16le", language: str = None):
+        """A new LiveTranscriber, or None if max_streams sessions are already running."""
+        live_config = config.get("live", {})
+        with self._lock:
+            if len(self._sessions) >= self.max_streams:
+                return None
+            session_id = uuid.uuid4().hex
+            stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+            session = LiveTranscriber(
+                session_id,
+                os.path.join(live_config.get("dir", "/workspace/live"), f"live-{stamp}-{session_id[:8]}.wav"),
+                config.get("output", {}).get("output_dir", "/workspace/transcripts"),
+                live_config.get("formats", ["srt", "vtt"]),
+                {
+                    "language": language or config.get("transcription", {}).get("language"),
+                    "beam_size": live_config.get("beam_size", 1),
+                    "mode": "sequential"
+                },
+                sample_format=sample_format,
+                window_seconds=live_config.get("window_seconds", 15),
+                step_seconds=live_config.get("step_seconds", 1.0),
+                max_buffer_seconds=live_config.get("max_buffer_seconds", 30)
+            )
+            self._sessions[session_id] = session
+        app_logger.info(f"Live session {session_id} started ({session.filename}).")
+        return session
+
+    def run(self, fn, *args):
+        """Runs blocking session work on the live thread pool; returns an awaitable."""
+        return asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    def complete(self, session: LiveTranscriber) -> tuple:
+        """Finishes a session and records it as a completed job; returns (final events, Job)."""
+        start_time = time.time()
+        try:
+            events, result = session.finish()
+        finally:
+            self._release(session)
+        job = Job(
+            id=str(uuid.uuid4()),
+            filename=session.filename,
+            filepath=session.filepath,
+            created_at=session.started_at,
+            status=JobStatus.COMPLETED,
+            model_used=session.model,
+            media_hash=hash_file(session.filepath),
+            media_duration=session.duration,
+            source="live"
+        )
+        db.add_job(job)
+        job.result = TranscriptResult(**result)
+        # Processing time covers only the final flush; the rest overlapped the stream
+        job.processing_time = time.time() - start_time
+        db.update_job_status(job.id, JobStatus.COMPLETED, result=result, processing_time=job.processing_time,
+                             model_used=session.model)
+        db.update_job_progress(job.id, 1.0)
+        JOBS_TOTAL.inc(status=JobStatus.COMPLETED.value)
+        if session.model and session.duration:
+            AUDIO_SECONDS_TOTAL.inc(session.duration, model=session.model)
+        app_logger.info(f"Live session {session.session_id} saved as job {job.id} ({session.duration:.1f}s).")
+        return events, job
+
+    def discard(self, session: LiveTranscriber):
+        try:
+            session.abort()
+        finally:
+            self._release(session)
+        app_logger.info(f"Live session {session.session_id} discarded.")
+
+    def _release(self, session: LiveTranscriber):
+        with self._lock:
+            self._sessions.pop(session.session_id, None)
+
+    def active(self) -> int:
+        return len(self._sessions)
+
+    def status(self) -> dict:
+        with self._lock:
+            sessions = list(self._sessions.values())
+        return {"max_streams": self.max_streams, "sessions": [s.status() for s in sessions]}
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+# Global live session registry, created on first use
+live_streams = Lazy(LiveStreams)
+
+metrics.gauge("whisperwatch_live_streams", "Live transcription sessions in progress.",
+              callback=lambda: live_streams.active() if live_streams.created else 0)
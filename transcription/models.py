@@ -0,0 +1,156 @@
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Optional
+from transcription.replicas import load_model, model_signature
+from utils.logger import app_logger
+from utils.lru import LRUCache
+from utils.metrics import MODEL_LOAD_SECONDS
+
+# Approximate parameter counts of the standard checkpoints (".en" variants are the same size)
+MODEL_PARAMETERS = {
+    "tiny": 39_000_000,
+    "base": 74_000_000,
+    "small": 244_000_000,
+    "medium": 769_000_000,
+    "large-v1": 1_550_000_000,
+    "large-v2": 1_550_000_000,
+    "large-v3": 1_550_000_000,
+    "large": 1_550_000_000,
+    "large-v3-turbo": 809_000_000,
+    "turbo": 809_000_000,
+    "distil-small": 166_000_000,
+    "distil-medium": 394_000_000,
+    "distil-large-v2": 756_000_000,
+    "distil-large-v3": 756_000_000,
+}
+BYTES_PER_PARAMETER = {"int8": 1, "int8_float16": 1, "int8_float32": 1, "int8_bfloat16": 1, "float16": 2, "bfloat16": 2, "float32": 4}
+
+def estimate_model_bytes(model_config: dict) -> Optional[int]:
+    """Resident size of a model from its name and compute type, or None for unknown checkpoints."""
+    name = str(model_config.get("name", "base"))
+    if name.endswith(".en"):
+        name = name[:-3]
+    params = MODEL_PARAMETERS.get(name)
+    if params is None:
+        return None
+    return params * BYTES_PER_PARAMETER.get(model_config.get("compute_type", "int8"), 2)
+
+def _rss_bytes() -> Optional[int]:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+class ModelCache:
+    """Loaded Whisper models keyed by signature, bounded by a memory budget.
+
+    Models are loaded one at a time on a background thread, so a load never
+    runs on a worker that could keep serving jobs with a resident model. The
+    least recently used models are dropped once their estimated sizes exceed
+    max_bytes; a model larger than the whole budget is still served, it just
+    is not kept once another model is used.
+    """
+
+    def __init__(self, max_bytes: int, cpu_threads: int = 0, num_workers: int = 1):
+        self.cpu_threads = cpu_threads
+        self.num_workers = num_workers
+        self._models = LRUCache(max_bytes, on_evict=self._on_evict)
+        self._sizes = {}
+        self._loading = {}  # signature -> Future
+        self._errors = {}  # signature -> last load error
+        self._oversized = None  # (signature, model) that did not fit the budget
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="model-loader")
+
+    def get(self, model_config: dict):
+        """The model if it is resident, else None (no load is started)."""
+        sig = model_signature(model_config)
+        model = self._models.get(sig)
+        if model is None and self._oversized and self._oversized[0] == sig:
+            model = self._oversized[1]
+        return model
+
+    def load_async(self, model_config: dict) -> Future:
+        """Starts loading a model in the background unless it is resident or already loading."""
+        sig = model_signature(model_config)
+        with self._lock:
+            model = self.get(model_config)
+            if model is not None:
+                future = Future()
+                future.set_result(model)
+                return future
+            future = self._loading.get(sig)
+            if future is None:
+                future = self._loading[sig] = self._executor.submit(self._load, dict(model_config))
+            return future
+
+    def load(self, model_config: dict):
+        """Returns the model, waiting for it to load if necessary."""
+        return self.load_async(model_config).result()
+
+    def _load(self, model_config: dict):
+        sig = model_signature(model_config)
+        app_logger.info(f"Loading Whisper model: {sig}, {self.num_workers} worker(s) x {self.cpu_threads} thread(s)...")
+        rss_before = _rss_bytes()
+        start = time.perf_counter()
+        try:
+            model = load_model(model_config, cpu_threads=self.cpu_threads, num_workers=self.num_workers)
+        except Exception as e:
+            app_logger.error(f"Failed to load model {sig}: {e}")
+            with self._lock:
+                self._errors[sig] = str(e)
+                self._loading.pop(sig, None)
+            raise
+        load_seconds = time.perf_counter() - start
+        MODEL_LOAD_SECONDS.observe(load_seconds, model=sig)
+
+        size = estimate_model_bytes(model_config)
+        if size is None:
+            rss_after = _rss_bytes()
+            size = max(0, rss_after - rss_before) if rss_before is not None and rss_after is not None else 0
+        with self._lock:
+            self._sizes[sig] = size
+            self._errors.pop(sig, None)
+            if not self._models.put(sig, model, size):
+                app_logger.warning(f"Model {sig} (~{size / 2**20:.0f} MiB) exceeds the model cache budget; it will not stay resident.")
+                self._oversized = (sig, model)
+            elif self._oversized:
+                self._oversized = None
+            self._loading.pop(sig, None)
+        app_logger.info(f"Model {sig} loaded in {load_seconds:.1f}s.")
+        return model
+
+    def state(self, model_config: dict):
+        """("loaded" | "loading" | "failed" | "not_loaded", last load error or None) of one model."""
+        sig = model_signature(model_config)
+        with self._lock:
+            if self.get(model_config) is not None:
+                return "loaded", None
+            if sig in self._loading:
+                return "loading", None
+            if sig in self._errors:
+                return "failed", self._errors[sig]
+            return "not_loaded", None
+
+    def _on_evict(self, sig, model):
+        app_logger.info(f"Model {sig} evicted from the model cache.")
+
+    def status(self) -> dict:
+        with self._lock:
+            # Most recently used first
+            resident = list(reversed(self._models.keys()))
+            if self._oversized:
+                resident.append(self._oversized[0])
+            return {
+                "max_bytes": self._models.max_bytes,
+                "bytes": self._models.stats()["bytes"],
+                "resident": [{"model": sig, "bytes": self._sizes.get(sig)} for sig in resident],
+                "loading": list(self._loading),
+                "errors": dict(self._errors)
+            }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
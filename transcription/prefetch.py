@@ -0,0 +1,36 @@
+import os
+import numpy as np
+from transcription.chunking import SAMPLING_RATE
+
+BYTES_PER_SECOND = SAMPLING_RATE * np.dtype(np.float32).itemsize
+
+class PrefetchedAudio:
+    """16 kHz mono float32 PCM of one job, decoded into a raw scratch file.
+
+    Only the path travels between processes; array() maps the file read-only,
+    so the engine and replica processes read the samples without copying them.
+    """
+
+    def __init__(self, path: str, samples: int):
+        self.path = path
+        self.samples = samples
+
+    @property
+    def duration(self) -> float:
+        return self.samples / SAMPLING_RATE
+
+    def array(self) -> np.ndarray:
+        if not self.samples:
+            # mmap cannot map an empty file
+            return np.zeros(0, dtype=np.float32)
+        return np.memmap(self.path, dtype=np.float32, mode="r", shape=(self.samples,))
+
+def decode_to_scratch(filepath: str, scratch_path: str) -> int:
+    """Runs in a decoder process: decode + resample, then write the samples to scratch_path."""
+    from faster_whisper.audio import decode_audio
+
+    audio = decode_audio(filepath, sampling_rate=SAMPLING_RATE)
+    tmp_path = f"{scratch_path}.tmp"
+    audio.astype(np.float32, copy=False).tofile(tmp_path)
+    os.replace(tmp_path, scratch_path)
+    return len(audio)
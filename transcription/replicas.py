@@ -0,0 +1,266 @@
+import multiprocessing
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor
+import time
+from transcription.chunking import SAMPLING_RATE
+from storage.words import WordTableBuilder
+from transcription.prefetch import PrefetchedAudio
+from utils.logger import app_logger
+from utils.metrics import MODEL_LOAD_SECONDS, StageTimer
+
+# faster_whisper (ctranslate2, PyAV, tokenizers) is imported inside the functions
+# that use it, so importing the service does not pay for it before the first job.
+
+# Model replicas held by this process (a transcription.models.ModelCache).
+# In the API process this stays None; replica worker processes create it in _init_replica.
+_replicas = None
+
+def model_signature(model_config: dict) -> str:
+    return f"{model_config.get('name')}-{model_config.get('device')}-{model_config.get('compute_type')}"
+
+def load_model(model_config: dict, cpu_threads: int = 0, num_workers: int = 1):
+    from faster_whisper import WhisperModel
+
+    return WhisperModel(
+        model_config.get("name", "base"),
+        device=model_config.get("device", "cpu"),
+        compute_type=model_config.get("compute_type", "int8"),
+        cpu_threads=cpu_threads,
+        num_workers=num_workers
+    )
+
+def run_transcription(model, audio, trans_config: dict, on_segment=None, on_progress=None, on_language=None) -> dict:
+    """Runs one transcription and materializes the segment generator into plain dicts.
+
+    audio is a file path, a 16 kHz float32 array (one chunk of a long file) or
+    PrefetchedAudio, which is memory-mapped here.
+    on_segment(seg) and on_progress(fraction) are called as the generator is consumed;
+    on_language(language) once before them, when the language is known.
+    The result is in the columnar form of storage.words: segments without
+    words, plus a WordTable (or None) under "words".
+    In "batched" mode the audio is split at VAD boundaries and up to batch_size
+    windows go through the encoder/decoder together; segments come out in the
+    same format either way.
+
+    The result carries per-stage "timings" (decode, language_detection,
+    inference) for the worker to record; callbacks are not counted.
+    With trans_config["segment_quality"] it also carries "quality": one
+    (avg_logprob, no_speech_prob, compression_ratio) per segment, for the
+    model cascade.
+    """
+    from faster_whisper import BatchedInferencePipeline
+    from faster_whisper.audio import decode_audio
+
+    timings = {}
+    if isinstance(audio, PrefetchedAudio):
+        audio = audio.array()
+    elif isinstance(audio, str):
+        # Decoded here rather than inside transcribe() so decode time is measured on its own
+        with StageTimer("decode", timings):
+            audio = decode_audio(audio, sampling_rate=SAMPLING_RATE)
+
+    options = dict(
+        beam_size=trans_config.get("beam_size", 5),
+        language=trans_config.get("language"),
+        # Live windows pass the tail of the text finalized so far
+        initial_prompt=trans_config.get("initial_prompt"),
+        # word_timestamps=True returns words in segments
+        word_timestamps=True if trans_config.get("timestamp_granularity") == "word" else False
+    )
+    # transcribe() computes features and detects the language before returning the generator
+    with StageTimer("language_detection" if options["language"] is None else "inference", timings):
+        if trans_config.get("mode", "sequential") == "batched":
+            # The pipeline only wraps the model, so building one per call is cheap
+            segments, info = BatchedInferencePipeline(model).transcribe(
+                audio, batch_size=trans_config.get("batch_size", 8), **options
+            )
+        else:
+            segments, info = model.transcribe(audio, **options)
+    if on_language:
+        on_language(info.language)
+
+    # segments is a generator, so we must iterate
+    result_segments = []
+    # Word timestamps go straight into flat arrays instead of a dict per word
+    words = WordTableBuilder() if options["word_timestamps"] else None
+    quality = [] if trans_config.get("segment_quality") else None
+    segments = iter(segments)
+    while True:
+        with StageTimer("inference", timings):
+            segment = next(segments, None)
+        if segment is None:
+            break
+        seg = {"start": segment.start, "end": segment.end, "text": segment.text}
+        result_segments.append(seg)
+        if words is not None:
+            words.add_segment(getattr(segment, 'words', None))
+        if quality is not None:
+            quality.append((segment.avg_logprob, segment.no_speech_prob, segment.compression_ratio))
+        if on_segment:
+            # Streamed segments carry their words; only this one is materialized
+            on_segment(dict(seg, words=[
+                {"start": w.start, "end": w.end, "word": w.word, "probability": w.probability}
+                for w in segment.words
+            ] if getattr(segment, 'words', None) else None))
+        if on_progress and info.duration:
+            on_progress(min(1.0, segment.end / info.duration))
+
+    result = {
+        "segments": result_segments,
+        "language": info.language,
+        "duration": info.duration,
+        "words": words.build() if words is not None else None,
+        "timings": timings
+    }
+    if quality is not None:
+        result["quality"] = quality
+    return result
+
+def _init_replica(cpu_threads: int, cache_bytes: int):
+    global _replicas
+    # Imported here: transcription.models itself imports this module
+    from transcription.models import ModelCache
+    _replicas = ModelCache(cache_bytes, cpu_threads=cpu_threads)
+
+def _replica_model(model_config: dict):
+    """(model, load seconds or None if it was resident) from this process's model cache."""
+    model = _replicas.get(model_config)
+    if model is not None:
+        return model, None
+    start = time.perf_counter()
+    model = _replicas.load(model_config)
+    return model, time.perf_counter() - start
+
+def _replica_preload(model_config: dict) -> float:
+    _, load_seconds = _replica_model(model_config)
+    return load_seconds
+
+def _replica_transcribe(model_config: dict, trans_config: dict, audio, events=None) -> dict:
+    """Entry point executed inside a replica process.
+
+    events is an optional manager queue used to relay segments and progress to the parent.
+    """
+    model, load_seconds = _replica_model(model_config)
+
+    if events is None:
+        result = run_transcription(model, audio, trans_config)
+    else:
+        result = run_transcription(
+            model, audio, trans_config,
+            on_segment=lambda seg: events.put(("segment", seg)),
+            on_progress=lambda fraction: events.put(("progress", fraction)),
+            on_language=lambda language: events.put(("language", language))
+        )
+    if load_seconds is not None:
+        # Metrics live in the parent process; hand the load time back with the result
+        result["model_load"] = load_seconds
+    return result
+
+class ReplicaPool:
+    """K model replicas, each living in its own worker process.
+
+    Segment decoding, dict building and result assembly happen outside the API
+    process, so transcription no longer competes with the event loop for the GIL.
+    Processes load a model lazily on the first job for its signature and keep
+    up to cache_bytes of models resident (see transcription.models.ModelCache).
+    """
+
+    def __init__(self, replicas: int, cpu_threads: int, cache_bytes: int):
+        self.replicas = max(1, replicas)
+        self._manager = None
+        self._manager_lock = threading.Lock()
+        # Signatures some replica has loaded (a replica may since have evicted it), and preload state
+        self._loaded = set()
+        self._preloading = set()
+        self._errors = {}
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.replicas,
+            # spawn: a forked copy of a process running uvicorn/watchdog threads is not safe
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_replica,
+            initargs=(cpu_threads, cache_bytes)
+        )
+        app_logger.info(f"Replica pool created with {self.replicas} process(es) x {cpu_threads} thread(s).")
+
+    def transcribe(self, model_config: dict, trans_config: dict, audio_path, on_segment=None, on_progress=None,
+                   on_language=None) -> dict:
+        if on_segment is None and on_progress is None and on_language is None:
+            future = self._executor.submit(_replica_transcribe, dict(model_config), dict(trans_config), audio_path)
+            result = future.result()
+            self._loaded.add(model_signature(model_config))
+            return result
+
+        with self._manager_lock:
+            if self._manager is None:
+                self._manager = multiprocessing.get_context("spawn").Manager()
+        events = self._manager.Queue()
+        future = self._executor.submit(_replica_transcribe, dict(model_config), dict(trans_config), audio_path, events)
+
+        # Relay events on the calling worker thread until the replica is done and the queue is drained
+        while True:
+            try:
+                kind, payload = events.get(timeout=0.2)
+            except queue.Empty:
+                if future.done():
+                    break
+                continue
+            if kind == "segment" and on_segment:
+                on_segment(payload)
+            elif kind == "progress" and on_progress:
+                on_progress(payload)
+            elif kind == "language" and on_language:
+                on_language(payload)
+        result = future.result()
+        self._loaded.add(model_signature(model_config))
+        return result
+
+    def preload(self, model_config: dict):
+        """Asks each replica to load a model ahead of the jobs that need it.
+
+        Best effort: the executor picks the process for each request, so a
+        replica that finishes quickly may take two while another takes none.
+        """
+        sig = model_signature(model_config)
+        self._preloading.add(sig)
+        for _ in range(self.replicas):
+            future = self._executor.submit(_replica_preload, dict(model_config))
+            future.add_done_callback(lambda f: self._preloaded(sig, f))
+
+    def _preloaded(self, sig: str, future):
+        self._preloading.discard(sig)
+        if future.cancelled():
+            return
+        if future.exception():
+            app_logger.error(f"Replica preload of {sig} failed: {future.exception()}")
+            self._errors[sig] = str(future.exception())
+            return
+        self._loaded.add(sig)
+        self._errors.pop(sig, None)
+        if future.result() is not None:
+            MODEL_LOAD_SECONDS.observe(future.result(), model=sig)
+
+    def state(self, model_config: dict):
+        """Like ModelCache.state(), across replicas: "loaded" once any replica has loaded the model."""
+        sig = model_signature(model_config)
+        if sig in self._loaded:
+            return "loaded", None
+        if sig in self._preloading:
+            return "loading", None
+        if sig in self._errors:
+            return "failed", self._errors[sig]
+        return "not_loaded", None
+
+    def transcribe_many(self, model_config: dict, trans_config: dict, chunks: list):
+        """Fans chunks out across all replicas; yields results in input order as they complete."""
+        futures = [
+            self._executor.submit(_replica_transcribe, dict(model_config), dict(trans_config), chunk)
+            for chunk in chunks
+        ]
+        for f in futures:
+            yield f.result()
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+        if self._manager is not None:
+            self._manager.shutdown()
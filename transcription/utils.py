@@ -1,5 +1,7 @@
 import os
 import json
+import tempfile
+from storage.words import materialize
 
 def format_timestamp(seconds: float) -> str:
     """Formats seconds into HH:MM:SS,mmm for SRT"""
@@ -19,31 +21,124 @@ def format_timestamp_vtt(seconds: float) -> str:
     seconds = int(seconds % 60)
     return f"{hours:02}:{minutes:02}:{seconds:02}.{milliseconds:03}"
 
+def format_txt_line(seg) -> str:
+    return f"[{format_timestamp(seg['start'])} --> {format_timestamp(seg['end'])}] {seg['text'].strip()}\n"
+
+def format_srt_block(index: int, seg) -> str:
+    return f"{index}\n{format_timestamp(seg['start'])} --> {format_timestamp(seg['end'])}\n{seg['text'].strip()}\n\n"
+
+def format_vtt_block(seg) -> str:
+    return f"{format_timestamp_vtt(seg['start'])} --> {format_timestamp_vtt(seg['end'])}\n{seg['text'].strip()}\n\n"
+
+def format_jsonl_line(seg) -> str:
+    return json.dumps(seg, ensure_ascii=False) + "\n"
+
+RENDER_FORMATS = ("json", "jsonl", "txt", "srt", "vtt")
+
+def _segments_with_words(result_data):
+    """Segments with their word lists, built one at a time from a columnar result."""
+    table = result_data.get("words")
+    if "words" not in result_data:
+        return result_data["segments"]
+    return (dict(seg, words=table.words_for(i) if table else None) for i, seg in enumerate(result_data["segments"]))
+
+def render_transcript(result_data, fmt: str) -> str:
+    """Renders a transcript (dict with segments, language, duration) in one output format.
+
+    Columnar results (see storage.words) are accepted; word dicts are only
+    built for the json/jsonl formats, which include them.
+    """
+    segments = result_data["segments"]
+    if fmt == "json":
+        return json.dumps(materialize(result_data), ensure_ascii=False, separators=(",", ":"))
+    if fmt == "jsonl":
+        return "".join(format_jsonl_line(seg) for seg in _segments_with_words(result_data))
+    if fmt == "txt":
+        return "".join(format_txt_line(seg) for seg in segments)
+    if fmt == "srt":
+        return "".join(format_srt_block(i, seg) for i, seg in enumerate(segments, 1))
+    if fmt == "vtt":
+        return "WEBVTT\n\n" + "".join(format_vtt_block(seg) for seg in segments)
+    raise ValueError(f"Unknown transcript format: {fmt}")
+
+def write_atomic(path: str, content: str):
+    """Writes a file under a hidden temporary name and renames it into place.
+
+    Readers (and tools watching output_dir) only ever see complete files.
+    """
+    directory, name = os.path.split(path)
+    fd, tmp_path = tempfile.mkstemp(dir=directory or ".", prefix=f".{name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
 def save_transcript(result_data, output_dir, file_stem, formats):
+    """Writes the eagerly emitted formats; every format is also rendered on demand by the API."""
+    if not formats:
+        return
     if not os.path.exists(output_dir):
-        os.makedirs(output_dir)
+        os.makedirs(output_dir, exist_ok=True)
 
-    segments = result_data["segments"]
+    for fmt in RENDER_FORMATS:
+        if fmt in formats:
+            write_atomic(os.path.join(output_dir, f"{file_stem}.{fmt}"), render_transcript(result_data, fmt))
+
+class TranscriptWriter:
+    """Appends segments to TXT/SRT/VTT/JSONL outputs as they are produced.
+
+    Used in streaming mode so partial transcripts are readable while a long file
+    is still being decoded. Segments go to "<stem>.<fmt>.partial", which close()
+    renames to the final name, so the final path never holds a half-written
+    file; abort() removes the partial files of a failed job. JSON needs the
+    complete result and is written by save_transcript once transcription finishes.
+    """
+    STREAMING_FORMATS = ("txt", "srt", "vtt", "jsonl")
+
+    def __init__(self, output_dir, file_stem, formats):
+        if not os.path.exists(output_dir):
+            os.makedirs(output_dir)
+        self._files = {}
+        self._paths = {}
+        self._count = 0
+        for fmt in self.STREAMING_FORMATS:
+            if fmt in formats:
+                self._paths[fmt] = os.path.join(output_dir, f"{file_stem}.{fmt}")
+                self._files[fmt] = open(f"{self._paths[fmt]}.partial", 'w', encoding='utf-8')
+        if "vtt" in self._files:
+            self._files["vtt"].write("WEBVTT\n\n")
+
+    def write_segment(self, seg):
+        self._count += 1
+        for fmt, f in self._files.items():
+            if fmt == "txt":
+                f.write(format_txt_line(seg))
+            elif fmt == "srt":
+                f.write(format_srt_block(self._count, seg))
+            elif fmt == "vtt":
+                f.write(format_vtt_block(seg))
+            elif fmt == "jsonl":
+                f.write(format_jsonl_line(seg))
+            # Flush per segment so readers tailing the file see it immediately
+            f.flush()
+
+    def close(self):
+        for fmt, f in self._files.items():
+            f.close()
+            os.replace(f"{self._paths[fmt]}.partial", self._paths[fmt])
+        self._files = {}
 
-    if "json" in formats:
-        with open(os.path.join(output_dir, f"{file_stem}.json"), 'w', encoding='utf-8') as f:
-            json.dump(result_data, f, indent=2, ensure_ascii=False)
-
-    if "txt" in formats:
-        with open(os.path.join(output_dir, f"{file_stem}.txt"), 'w', encoding='utf-8') as f:
-            for seg in segments:
-                f.write(f"[{format_timestamp(seg['start'])} --> {format_timestamp(seg['end'])}] {seg['text'].strip()}\n")
-
-    if "srt" in formats:
-        with open(os.path.join(output_dir, f"{file_stem}.srt"), 'w', encoding='utf-8') as f:
-            for i, seg in enumerate(segments, 1):
-                f.write(f"{i}\n")
-                f.write(f"{format_timestamp(seg['start'])} --> {format_timestamp(seg['end'])}\n")
-                f.write(f"{seg['text'].strip()}\n\n")
-
-    if "vtt" in formats:
-        with open(os.path.join(output_dir, f"{file_stem}.vtt"), 'w', encoding='utf-8') as f:
-            f.write("WEBVTT\n\n")
-            for seg in segments:
-                f.write(f"{format_timestamp_vtt(seg['start'])} --> {format_timestamp_vtt(seg['end'])}\n")
-                f.write(f"{seg['text'].strip()}\n\n")
+    def abort(self):
+        for fmt, f in self._files.items():
+            f.close()
+            try:
+                os.remove(f"{self._paths[fmt]}.partial")
+            except OSError:
+                pass
+        self._files = {}
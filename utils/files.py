@@ -1,19 +1,6 @@
+import hashlib
 import os
-import time
-
-def is_file_stable(filepath: str, wait_time: int = 2) -> bool:
-    """Checks if a file size is constant over a short period."""
-    if not os.path.exists(filepath):
-        return False
-        
-    initial_size = os.path.getsize(filepath)
-    time.sleep(wait_time)
-    
-    if not os.path.exists(filepath):
-        return False
-        
-    final_size = os.path.getsize(filepath)
-    return initial_size == final_size and final_size > 0
+from typing import Optional
 
 def get_mime_group(filepath: str) -> str:
     ext = os.path.splitext(filepath)[1].lower()
@@ -22,3 +9,27 @@ def get_mime_group(filepath: str) -> str:
     if ext in ['.mp3', '.wav', '.aac', '.flac', '.m4a', '.ogg', '.opus']:
         return 'audio'
     return 'unknown'
+
+def probe_duration(filepath: str) -> Optional[float]:
+    """Returns the media duration in seconds from the container header, or None if unknown."""
+    try:
+        import av
+        with av.open(filepath) as container:
+            if container.duration is None:
+                return None
+            return container.duration / av.time_base
+    except Exception:
+        return None
+
+def hash_file(filepath: str, chunk_size: int = 1024 * 1024) -> str:
+    """SHA-256 of the file contents, read in fixed-size chunks so memory use stays flat."""
+    digest = hashlib.sha256()
+    buffer = bytearray(chunk_size)
+    view = memoryview(buffer)
+    with open(filepath, 'rb') as f:
+        while True:
+            n = f.readinto(buffer)
+            if not n:
+                break
+            digest.update(view[:n])
+    return digest.hexdigest()
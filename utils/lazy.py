@@ -0,0 +1,41 @@
+import threading
+
+class Lazy:
+    """Stands in for a module-level singleton that is created on first use.
+
+    Modules keep importing globals like `from storage.db import db`, but the
+    work behind them (reading config, opening the database, creating pools)
+    happens when the object is first used, or when service.bootstrap wires the
+    application up, instead of at import time. Attribute reads and writes go
+    to the real object.
+    """
+
+    __slots__ = ("_factory", "_instance", "_lock")
+
+    def __init__(self, factory):
+        object.__setattr__(self, "_factory", factory)
+        object.__setattr__(self, "_instance", None)
+        object.__setattr__(self, "_lock", threading.Lock())
+
+    def resolve(self):
+        """Creates the object if needed and returns it."""
+        instance = self._instance
+        if instance is None:
+            with self._lock:
+                if self._instance is None:
+                    object.__setattr__(self, "_instance", self._factory())
+                instance = self._instance
+        return instance
+
+    @property
+    def created(self) -> bool:
+        return self._instance is not None
+
+    def __getattr__(self, name):
+        return getattr(self.resolve(), name)
+
+    def __setattr__(self, name, value):
+        setattr(self.resolve(), name, value)
+
+    def __repr__(self):
+        return f"<Lazy {self._instance!r}>" if self.created else f"<Lazy {self._factory!r} (not created)>"
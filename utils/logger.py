@@ -1,6 +1,7 @@
 import logging
 import logging.handlers
 import os
+from utils.lazy import Lazy
 
 def setup_logger(name: str, log_file: str, level=logging.INFO):
     """Function to setup as many loggers as you want"""
@@ -25,5 +26,5 @@ def setup_logger(name: str, log_file: str, level=logging.INFO):
 
     return logger
 
-# Global application logger
-app_logger = setup_logger('whisperwatch', 'logs/app.log')
+# Global application logger; logs/ and its handlers are set up on the first log call
+app_logger = Lazy(lambda: setup_logger('whisperwatch', 'logs/app.log'))
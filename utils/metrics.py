@@ -0,0 +1,176 @@
+import bisect
+import threading
+import time
+
+# Default buckets: stage latencies from milliseconds (DB updates) up to an hour (inference on long files)
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800, 3600)
+RTF_BUCKETS = (0.01, 0.02, 0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1, 1.5, 2, 5)
+
+def _format_labels(names, values, extra=None) -> str:
+    pairs = list(zip(names, values)) + (extra or [])
+    if not pairs:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"') for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+def _format_value(value) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labels=()):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(labels.get(name, "") for name in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        return [(self.name, _format_labels(self.labels, key), value) for key, value in items]
+
+class Gauge(Counter):
+    """A value that goes up and down; either set() directly or computed by a callback at scrape time."""
+    kind = "gauge"
+
+    def __init__(self, name: str, help_text: str, labels=(), callback=None):
+        super().__init__(name, help_text, labels)
+        # callback() returns a number, or {label tuple: number} for labelled gauges
+        self.callback = callback
+
+    def set(self, value: float, **labels):
+        key = tuple(labels.get(name, "") for name in self.labels)
+        with self._lock:
+            self._values[key] = value
+
+    def samples(self):
+        if self.callback is None:
+            return super().samples()
+        value = self.callback()
+        if not isinstance(value, dict):
+            value = {(): value}
+        return [(self.name, _format_labels(self.labels, key), v) for key, v in sorted(value.items())]
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labels=(), buckets=SECONDS_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self._series = {}  # label values -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(labels.get(name, "") for name in self.labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+            series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def samples(self):
+        with self._lock:
+            items = sorted((key, list(series)) for key, series in self._series.items())
+        samples = []
+        for key, series in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series):
+                cumulative += count
+                samples.append((f"{self.name}_bucket", _format_labels(self.labels, key, [("le", _format_value(float(bound)))]), cumulative))
+            samples.append((f"{self.name}_sum", _format_labels(self.labels, key), series[-2]))
+            samples.append((f"{self.name}_count", _format_labels(self.labels, key), series[-1]))
+        return samples
+
+class MetricsRegistry:
+    """In-process metrics rendered in the Prometheus text exposition format."""
+
+    def __init__(self):
+        self.started_at = time.time()
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, help_text, labels=()):
+        return self.register(Counter(name, help_text, labels))
+
+    def gauge(self, name, help_text, labels=(), callback=None):
+        return self.register(Gauge(name, help_text, labels, callback))
+
+    def histogram(self, name, help_text, labels=(), buckets=SECONDS_BUCKETS):
+        return self.register(Histogram(name, help_text, labels, buckets))
+
+    def uptime(self) -> float:
+        return time.time() - self.started_at
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{labels} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+class StageTimer:
+    """Adds the time spent in the with-block to timings[stage].
+
+    Timings are collected in plain dicts so they can travel back from replica
+    processes with the result; the worker observes them via observe_stages().
+    """
+
+    def __init__(self, stage: str, timings: dict):
+        self.stage = stage
+        self.timings = timings
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.timings[self.stage] = self.timings.get(self.stage, 0.0) + time.perf_counter() - self.start
+        return False
+
+def observe_stages(timings: dict):
+    for stage, seconds in timings.items():
+        STAGE_SECONDS.observe(seconds, stage=stage)
+
+# Global registry and the pipeline's metrics
+metrics = MetricsRegistry()
+
+STAGE_SECONDS = metrics.histogram(
+    "whisperwatch_stage_seconds",
+    "Time spent per job in each pipeline stage (queue_wait, decode, language_detection, inference, output, db_update).",
+    labels=("stage",)
+)
+JOBS_TOTAL = metrics.counter("whisperwatch_jobs_total", "Jobs finished, by outcome.", labels=("status",))
+AUDIO_SECONDS_TOTAL = metrics.counter("whisperwatch_audio_seconds_total", "Seconds of media transcribed.", labels=("model",))
+REAL_TIME_FACTOR = metrics.histogram(
+    "whisperwatch_real_time_factor",
+    "Processing time divided by media duration, per model signature.",
+    labels=("model",),
+    buckets=RTF_BUCKETS
+)
+CASCADE_AUDIO_SECONDS = metrics.counter(
+    "whisperwatch_cascade_audio_seconds_total", "Seconds of media per model cascade stage (first_pass or escalated).", labels=("stage",)
+)
+RESUMED_AUDIO_SECONDS = metrics.counter(
+    "whisperwatch_resumed_audio_seconds_total", "Seconds of media taken from job checkpoints instead of being transcribed again."
+)
+MODEL_LOAD_SECONDS = metrics.histogram("whisperwatch_model_load_seconds", "Time to load a Whisper model.", labels=("model",))
+metrics.gauge("whisperwatch_uptime_seconds", "Seconds since the service started.", callback=lambda: round(metrics.uptime(), 3))
@@ -1,16 +1,34 @@
-import time
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
 from jobs.queue import job_manager
-from utils.files import is_file_stable
+from storage.db import db
+from watcher.stability import StabilityTracker
 from config.manager import config
 from utils.logger import app_logger
+from utils.lru import LRUCache
+
+# Recent file signatures kept for deduping watch events; far more than are ever in flight at once
+MAX_PROCESSED = 10000
 
 class MediaHandler(FileSystemEventHandler):
     def __init__(self):
-        self.processed = set()
+        # (path, size, mtime) of the files most recently queued; a re-export under the
+        # same name changes size/mtime and is queued again. Bounded so a long-running
+        # watcher over a busy directory does not grow without limit
+        self.processed = LRUCache(MAX_PROCESSED, max_entries=MAX_PROCESSED)
+        self._processed_lock = threading.Lock()
         self.watch_config = config.get("watchKey", {})
+        self.tracker = StabilityTracker(
+            self._on_stable,
+            stable_seconds=self.watch_config.get("stability_check_seconds", 2)
+        )
+        # create_job hashes and probes the file; that runs here so the tracker thread keeps checking other files
+        self._ingest = ThreadPoolExecutor(
+            max_workers=max(1, self.watch_config.get("ingest_workers", 2)), thread_name_prefix="ingest"
+        )
 
     def on_created(self, event):
         if event.is_directory:
@@ -22,22 +40,41 @@ class MediaHandler(FileSystemEventHandler):
             return
         self._process_event(event.dest_path)
 
+    def is_media(self, filepath) -> bool:
+        ext = os.path.splitext(filepath)[1].lower()
+        return ext in self.watch_config.get("extensions", [])
+
     def _process_event(self, filepath):
-        filename = os.path.basename(filepath)
-        ext = os.path.splitext(filename)[1].lower()
-        
-        allowed_exts = self.watch_config.get("extensions", [])
-        if ext not in allowed_exts:
+        if not self.is_media(filepath):
+            return
+
+        app_logger.info(f"New file detected: {os.path.basename(filepath)}")
+        # Debounce / Stability check happens on the tracker thread, not here
+        self.tracker.add(filepath)
+
+    def _on_stable(self, filepath):
+        try:
+            st = os.stat(filepath)
+        except OSError:
             return
+        signature = (filepath, st.st_size, st.st_mtime)
+        with self._processed_lock:
+            if self.processed.get(signature):
+                return
+            self.processed.put(signature, True, 1)
+        self._ingest.submit(self._create_job, filepath, signature)
+
+    def _create_job(self, filepath, signature):
+        try:
+            job_manager.create_job(filepath, source=os.path.normpath(os.path.dirname(filepath)))
+        except Exception as e:
+            with self._processed_lock:
+                self.processed.pop(signature)
+            app_logger.error(f"Failed to create job for {os.path.basename(filepath)}: {e}")
 
-        app_logger.info(f"New file detected: {filename}")
-        
-        # Debounce / Stability check
-        wait_time = self.watch_config.get("stability_check_seconds", 2)
-        if is_file_stable(filepath, wait_time):
-             job_manager.create_job(filepath)
-        else:
-             app_logger.warning(f"File {filename} unstable or disappeared, skipping.")
+    def shutdown(self):
+        # Files not yet started are left to the reconciliation scan of the next start
+        self._ingest.shutdown(wait=True, cancel_futures=True)
 
 class WatcherService:
     def __init__(self):
@@ -50,12 +87,40 @@ class WatcherService:
             if not os.path.exists(path):
                 os.makedirs(path)
                 app_logger.info(f"Created watch directory: {path}")
-            
+
             self.observer.schedule(self.handler, path, recursive=False)
             app_logger.info(f"Watching directory: {path}")
-        
+
+        self.handler.tracker.start()
         self.observer.start()
+        # Scan after the observer is live so files arriving during the scan are not missed;
+        # the tracker dedupes anything seen by both
+        self.reconcile(paths)
+
+    def reconcile(self, paths):
+        """Queues media already sitting in the watch paths that has no job yet.
+
+        Covers files dropped while the service was down. Files go through the
+        same stability check, since they may still be mid-copy.
+        """
+        candidates = []
+        for path in paths:
+            try:
+                with os.scandir(path) as entries:
+                    for entry in entries:
+                        if entry.is_file() and self.handler.is_media(entry.path):
+                            candidates.append(entry.path)
+            except OSError as e:
+                app_logger.error(f"Reconciliation scan of {path} failed: {e}")
+
+        known = db.filepaths_with_jobs(candidates)
+        missing = [filepath for filepath in candidates if filepath not in known]
+        for filepath in missing:
+            self.handler.tracker.add(filepath)
+        app_logger.info(f"Reconciliation: {len(candidates)} media file(s) in watch paths, {len(missing)} without a job.")
 
     def stop(self):
         self.observer.stop()
         self.observer.join()
+        self.handler.tracker.stop()
+        self.handler.shutdown()
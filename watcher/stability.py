@@ -0,0 +1,78 @@
+import os
+import threading
+import time
+from utils.logger import app_logger
+
+class StabilityTracker:
+    """Tracks files that are still being written and reports them once they settle.
+
+    A single background thread re-stats every pending file each interval, so
+    a thousand files arriving together are checked in parallel instead of one
+    sleep at a time inside the watchdog dispatch thread. A file is stable once
+    its size and mtime have not changed for stable_seconds and it is non-empty.
+    """
+
+    def __init__(self, on_stable, stable_seconds: float = 2, interval: float = 0.5):
+        self.on_stable = on_stable
+        self.stable_seconds = stable_seconds
+        self.interval = interval
+        self._pending = {}  # path -> (size, mtime, unchanged_since)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def add(self, filepath: str):
+        with self._lock:
+            # Re-adding a pending file (e.g. created + moved events) restarts nothing
+            if filepath not in self._pending:
+                self._pending[filepath] = (None, None, time.monotonic())
+
+    def pending_count(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="stability-tracker", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            for filepath in self._check():
+                try:
+                    self.on_stable(filepath)
+                except Exception as e:
+                    app_logger.error(f"Failed to handle stable file {filepath}: {e}")
+
+    def _check(self):
+        now = time.monotonic()
+        with self._lock:
+            pending = list(self._pending.items())
+
+        stable, gone, updated = [], [], {}
+        for filepath, (size, mtime, since) in pending:
+            try:
+                st = os.stat(filepath)
+            except OSError:
+                gone.append(filepath)
+                continue
+            if (st.st_size, st.st_mtime) != (size, mtime):
+                updated[filepath] = (st.st_size, st.st_mtime, now)
+            elif st.st_size > 0 and now - since >= self.stable_seconds:
+                stable.append(filepath)
+
+        with self._lock:
+            for filepath in gone + stable:
+                self._pending.pop(filepath, None)
+            for filepath, state in updated.items():
+                if filepath in self._pending:
+                    self._pending[filepath] = state
+
+        for filepath in gone:
+            app_logger.warning(f"File {os.path.basename(filepath)} disappeared before it was stable, skipping.")
+        return stable